@@ -0,0 +1,523 @@
+"""
+Benchmarks del generador de mazmorras.
+
+Uso:
+    python benchmark.py lote [--mapas 200] [--workers 1,2,4]
+    python benchmark.py memoria [--habitaciones 1000000] [--backend dict,compacto]
+    python benchmark.py caminos [--habitaciones 10000,100000] [--consultas 200]
+    python benchmark.py render [--lados 100,500,1000,2000] [--backend compacto]
+    python benchmark.py simulacion [--partidas 20000] [--habitaciones 18,300] [--combate muestreo]
+    python benchmark.py suite [--habitaciones 100,1000,10000] [--seeds 1,2,3] [--json actual.json]
+                              [--comparar base.json] [--umbral 0.25]
+    python benchmark.py conectividad [--habitaciones 10000,100000] [--ediciones 100]
+    python benchmark.py densidad [--lados 100,200,400] [--relleno 0.5,0.9,0.99,1.0]
+    python benchmark.py adyacencia [--habitaciones 10000,100000] [--backend dict,compacto]
+    python benchmark.py estrategias [--habitaciones 10000,100000] [--backend dict,compacto]
+    python benchmark.py perfil [--habitaciones 10000] [--json perfil.json] [--trace traza.json]
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from dungeon_generator import generar_lote
+from dungeon_generator import perfil
+from dungeon_generator.mapa import Mapa
+from dungeon_generator.explorador import Explorador
+from dungeon_generator.contenido import Monstruo
+from dungeon_generator.serializacion import guardar_partida, cargar_partida
+from dungeon_generator.texto import escribir_mapa
+from dungeon_generator.simulacion import MapaSimulacion, MODOS_COMBATE, POLITICAS, simular_lote, resumir
+try:
+    from rich.console import Console
+    from dungeon_generator import visualizador as visualizador_mod
+    from dungeon_generator.visualizador import Visualizador
+    HAS_VIS = True
+except Exception:
+    HAS_VIS = False
+
+
+def bench_lote(n_mapas: int, workers_list, params=None) -> list:
+    """Mapas/segundo de generar_lote para distintos números de workers."""
+    params = params or {"ancho": 30, "alto": 30, "n_habitaciones": 300}
+    resultados = []
+    referencia = None
+    for workers in workers_list:
+        t0 = time.perf_counter()
+        salida = dict(generar_lote(params, range(n_mapas), workers=workers))
+        dt = time.perf_counter() - t0
+        if referencia is None:
+            referencia = salida
+        elif salida != referencia:
+            raise RuntimeError(f"generar_lote no es determinista con workers={workers}")
+        resultados.append({"workers": workers, "mapas": n_mapas, "segundos": dt, "mapas_por_s": n_mapas / dt})
+        print(f"workers={workers:2d}  {n_mapas} mapas en {dt:.2f}s  ->  {n_mapas / dt:.1f} mapas/s")
+    return resultados
+
+
+def _mapa_para(n_habitaciones: int, seed: int = 1, **kwargs) -> Mapa:
+    lado = math.isqrt(int(n_habitaciones * 1.6)) + 1
+    mapa = Mapa(lado, lado, seed=seed, **kwargs)
+    mapa.generar_estructura(n_habitaciones)
+    return mapa
+
+
+def bench_memoria(n_habitaciones: int, backends) -> list:
+    """Bytes por habitación de un mapa vivo (estructura + contenido) medidos con tracemalloc."""
+    resultados = []
+    for backend in backends:
+        tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+        mapa = _mapa_para(n_habitaciones, backend=backend)
+        mapa.colocar_contenido()
+        actual, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        por_hab = (actual - base) / n_habitaciones
+        resultados.append({"backend": backend, "habitaciones": n_habitaciones, "bytes_por_habitacion": por_hab})
+        print(f"{backend:9s} {n_habitaciones} habitaciones ({mapa.ancho}x{mapa.alto})  ->  {por_hab:.0f} bytes/habitación")
+        del mapa
+    return resultados
+
+
+def bench_caminos(tamanos, n_consultas: int, radio: int = 10) -> list:
+    """
+    Nodos expandidos y tiempo por consulta de cada estrategia de camino.
+    Las consultas van a un destino cercano (distancia manhattan <= radio), el caso típico
+    de 'ir x,y'. El BFS se mide sin caché (para al llegar), igual que el original.
+    """
+    resultados = []
+    for n in tamanos:
+        mapa = _mapa_para(n, max_arboles_camino=0)
+        rng = random.Random(n)
+        coords = list(mapa.habitaciones)
+        pares = []
+        while len(pares) < n_consultas:
+            o = rng.choice(coords)
+            d = (o[0] + rng.randint(-radio, radio), o[1] + rng.randint(-radio, radio))
+            if d in mapa.habitaciones:
+                pares.append((o, d))
+        mapa.adyacencia()  # el índice se construye una vez por mapa; su coste se mide en 'adyacencia'
+        for estrategia in mapa.caminos.ESTRATEGIAS:
+            expandidos = 0
+            t0 = time.perf_counter()
+            for o, d in pares:
+                mapa.encontrar_camino(o, d, estrategia)
+                expandidos += mapa.caminos.ultimos_expandidos
+            dt = time.perf_counter() - t0
+            fila = {
+                "habitaciones": n,
+                "estrategia": estrategia,
+                "expandidos_medio": expandidos / n_consultas,
+                "ms_por_consulta": dt * 1000 / n_consultas,
+            }
+            resultados.append(fila)
+            print(f"{n:7d} hab  {estrategia:13s}  {fila['expandidos_medio']:9.0f} nodos  {fila['ms_por_consulta']:8.3f} ms/consulta")
+    return resultados
+
+
+def bench_render(lados, backend: str = "compacto", densidad: float = 0.25, max_celdas_ids: int = 1_000_000) -> list:
+    """
+    Tiempo de pintar el mapa completo como texto: render por símbolos (texto.py, una sola
+    escritura) frente al imprimir_ascii con ids celda a celda (solo hasta max_celdas_ids).
+    """
+    resultados = []
+    for lado in lados:
+        mapa = Mapa(lado, lado, seed=1, backend=backend)
+        mapa.generar_estructura(int(lado * lado * densidad))
+        mapa.colocar_contenido()
+        salida = io.BytesIO()
+        t0 = time.perf_counter()
+        escribir_mapa(mapa, salida)
+        dt_simbolos = time.perf_counter() - t0
+        dt_ids = None
+        if lado * lado <= max_celdas_ids:
+            t0 = time.perf_counter()
+            io.StringIO().write(mapa.imprimir_ascii(ids=True))
+            dt_ids = time.perf_counter() - t0
+        fila = {"lado": lado, "backend": backend, "habitaciones": len(mapa.habitaciones),
+                "ms_simbolos": dt_simbolos * 1000, "ms_ids": dt_ids * 1000 if dt_ids is not None else None}
+        resultados.append(fila)
+        ids_txt = f"{fila['ms_ids']:9.1f} ms" if dt_ids is not None else "        -   "
+        print(f"{lado:5d}x{lado:<5d} {backend:9s} símbolos {fila['ms_simbolos']:8.1f} ms   ids {ids_txt}")
+    return resultados
+
+
+def bench_simulacion(n_partidas: int, tamanos, vida: int = 5, combate: str = "turnos") -> list:
+    """Partidas simuladas por minuto de cada política (simulacion.py) y sus medias."""
+    resultados = []
+    for n in tamanos:
+        mapa = _mapa_para(n, seed=42)
+        mapa.colocar_contenido(seed=42)
+        ms = MapaSimulacion(mapa)
+        for politica in POLITICAS:
+            t0 = time.perf_counter()
+            lote = simular_lote(ms, n_partidas, politica, seed=1, vida=vida, combate=combate)
+            dt = time.perf_counter() - t0
+            fila = {"habitaciones": n, "politica": politica, "partidas_por_min": n_partidas / dt * 60, **resumir(lote)}
+            resultados.append(fila)
+            print(f"{n:6d} hab  {politica:9s}  {fila['partidas_por_min']:12,.0f} partidas/min  "
+                  f"supervivencia {fila['supervivencia']:.3f}  turnos {fila['turnos']:.1f}  botín {fila['valor_botin']:.1f}")
+    return resultados
+
+
+def _cronometrar(funcion, repeticiones: int, preparar=None) -> float:
+    """Mejor tiempo (ms) de 'repeticiones' llamadas; preparar() crea la entrada fuera del cronómetro."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        entrada = preparar() if preparar is not None else None
+        t0 = time.perf_counter()
+        funcion(entrada)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor * 1000
+
+
+def _casos_mapa(n: int, seed: int, repeticiones: int, directorio: str) -> dict:
+    """ms de cada operación sobre un mapa de n habitaciones generado con 'seed'."""
+    lado = math.isqrt(int(n * 1.6)) + 1
+
+    def nuevo_mapa(_=None):
+        mapa = Mapa(lado, lado, seed=seed)
+        mapa.generar_estructura(n)
+        return mapa
+
+    casos = {
+        "generar_estructura": _cronometrar(nuevo_mapa, repeticiones),
+        "colocar_contenido": _cronometrar(lambda m: m.colocar_contenido(seed=seed), repeticiones, nuevo_mapa),
+    }
+    mapa = nuevo_mapa()
+    mapa.colocar_contenido(seed=seed)
+    casos["es_todo_accesible"] = _cronometrar(lambda _: mapa.es_todo_accesible(), repeticiones)
+
+    # 50 caminos entre habitaciones al azar (la caché de caminos se vacía en cada repetición)
+    rng = random.Random(seed)
+    coords = list(mapa.habitaciones)
+    pares = [(rng.choice(coords), rng.choice(coords)) for _ in range(50)]
+    explorador = Explorador(mapa)
+
+    def caminos(_):
+        for origen, destino in pares:
+            explorador.posicion_actual = origen
+            explorador.encontrar_camino(destino)
+    casos["encontrar_camino_x50"] = _cronometrar(caminos, repeticiones, lambda: mapa.caminos.invalidar())
+    explorador.posicion_actual = mapa.habitacion_inicial.pos
+
+    for formato in ("json", "bin"):
+        ruta = os.path.join(directorio, f"suite_{n}_{seed}.{formato}")
+        casos[f"guardar_{formato}"] = _cronometrar(
+            lambda _: guardar_partida(mapa, explorador, ruta, formato=formato), repeticiones)
+        casos[f"cargar_{formato}"] = _cronometrar(lambda _: cargar_partida(ruta, formato=formato), repeticiones)
+
+    if HAS_VIS:
+        visualizador_mod.console = Console(file=io.StringIO(), width=200, force_terminal=True)
+        vis = Visualizador(mapa)
+        casos["visualizador_mapa"] = _cronometrar(lambda _: vis.mostrar_mapa_completo(), repeticiones)
+        casos["visualizador_minimapa"] = _cronometrar(lambda _: vis.mostrar_minimapa(explorador), repeticiones)
+    return casos
+
+
+def _caso_combate(seed: int, repeticiones: int, combates: int = 2000) -> float:
+    """ms de 'combates' Monstruo.interactuar contra un explorador que no muere."""
+    mapa = Mapa(4, 4, seed=seed)
+    mapa.generar_estructura(4)
+    explorador = Explorador(mapa, vida=10**9, rng=random.Random(seed))
+
+    def combatir(_):
+        for _ in range(combates):
+            Monstruo("Orco", 12, 3).interactuar(explorador)
+    return _cronometrar(combatir, repeticiones)
+
+
+def bench_suite(tamanos, seeds, repeticiones: int = 3) -> dict:
+    """
+    Suite reproducible: cada operación se mide por tamaño y seed (mejor de 'repeticiones')
+    y se resume con la mediana entre seeds. Devuelve un dict listo para volcar a JSON.
+    """
+    muestras: dict = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for n in tamanos:
+            for seed in seeds:
+                for caso, ms in _casos_mapa(n, seed, repeticiones, directorio).items():
+                    muestras.setdefault(f"{caso}/{n}", []).append(ms)
+    for seed in seeds:
+        muestras.setdefault("combate_x2000", []).append(_caso_combate(seed, repeticiones))
+    resultados = {caso: {"ms": statistics.median(v), "ms_por_seed": v} for caso, v in muestras.items()}
+    for caso, r in resultados.items():
+        print(f"{caso:32s} {r['ms']:10.3f} ms")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "habitaciones": list(tamanos),
+            "seeds": list(seeds),
+            "repeticiones": repeticiones,
+            "visualizador": HAS_VIS,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar_suite(actual: dict, base: dict, umbral: float = 0.25, minimo_ms: float = 0.05) -> list:
+    """
+    Casos más lentos que la base en más de 'umbral' (0.25 = +25%). Los casos por debajo
+    de minimo_ms en la base se ignoran (ruido del reloj).
+    """
+    regresiones = []
+    for caso, r in actual["resultados"].items():
+        previo = base.get("resultados", {}).get(caso)
+        if previo is None or previo["ms"] < minimo_ms:
+            continue
+        ratio = r["ms"] / previo["ms"]
+        marca = "REGRESIÓN" if ratio > 1 + umbral else ""
+        print(f"{caso:32s} {previo['ms']:10.3f} -> {r['ms']:10.3f} ms  x{ratio:5.2f}  {marca}")
+        if marca:
+            regresiones.append({"caso": caso, "base_ms": previo["ms"], "ms": r["ms"], "ratio": ratio})
+    return regresiones
+
+
+def bench_conectividad(tamanos, n_ediciones: int) -> list:
+    """
+    Ediciones de pasillos (desconectar uno al azar y, a veces, volver a conectarlo) con una
+    consulta de conectividad tras cada una: BFS completo (es_todo_accesible sin comprobador)
+    frente al comprobador incremental de Mapa.conectividad().
+    """
+    resultados = []
+    for n in tamanos:
+        tiempos = {}
+        for modo in ("bfs", "incremental"):
+            mapa = _mapa_para(n, seed=3)
+            rng = random.Random(n)
+            coords = list(mapa.habitaciones)
+            if modo == "incremental":
+                mapa.conectividad()
+            conexos = 0
+            t0 = time.perf_counter()
+            for _ in range(n_ediciones):
+                hab = mapa.habitaciones[rng.choice(coords)]
+                if not hab.conexiones:
+                    continue
+                direccion = rng.choice(list(hab.conexiones))
+                otra = hab.conexiones[direccion]
+                hab.desconectar(direccion)
+                conexos += mapa.es_todo_accesible()
+                if rng.random() < 0.5:
+                    hab.conectar(direccion, otra)
+                    conexos += mapa.es_todo_accesible()
+            tiempos[modo] = (time.perf_counter() - t0, conexos)
+        if tiempos["bfs"][1] != tiempos["incremental"][1]:
+            raise RuntimeError("El comprobador incremental no coincide con el BFS")
+        fila = {"habitaciones": n, "ediciones": n_ediciones,
+                "ms_bfs": tiempos["bfs"][0] * 1000, "ms_incremental": tiempos["incremental"][0] * 1000}
+        resultados.append(fila)
+        print(f"{n:7d} hab  {n_ediciones} ediciones  BFS {fila['ms_bfs']:9.1f} ms   incremental {fila['ms_incremental']:9.1f} ms")
+    return resultados
+
+
+def bench_densidad(lados, rellenos, repeticiones: int = 3) -> list:
+    """
+    generar_estructura en mapas cuadrados con distintas proporciones de celdas ocupadas.
+    Con coste lineal, las habitaciones/s no deben caer al acercarse al mapa lleno.
+    """
+    resultados = []
+    for lado in lados:
+        for relleno in rellenos:
+            n = max(1, int(lado * lado * relleno))
+            ms = _cronometrar(lambda _: Mapa(lado, lado, seed=1).generar_estructura(n), repeticiones)
+            fila = {"lado": lado, "relleno": relleno, "habitaciones": n, "ms": ms, "hab_s": n / ms * 1000}
+            resultados.append(fila)
+            print(f"{lado:5d}x{lado:<5d} {relleno:5.0%}  {n:8d} hab  {ms:9.1f} ms  {fila['hab_s'] / 1000:7.1f} k hab/s")
+    return resultados
+
+
+def _bfs_habitaciones(mapa, origen) -> int:
+    """BFS recorriendo las Habitacion (conexiones, pos, 'in habitaciones'), como antes del índice CSR."""
+    habitaciones = mapa.habitaciones
+    visitados = {origen}
+    pendientes = [origen]
+    for coord in pendientes:
+        for otra in habitaciones[coord].conexiones.values():
+            c = tuple(otra.pos)
+            if c not in visitados and c in habitaciones:
+                visitados.add(c)
+                pendientes.append(c)
+    return len(visitados)
+
+
+def bench_adyacencia(tamanos, backends, repeticiones: int = 3) -> list:
+    """
+    Habitaciones por segundo de un BFS completo desde el inicio: recorriendo las Habitacion
+    frente al índice CSR de Mapa.adyacencia(); también el coste de construir el índice.
+    """
+    resultados = []
+    for backend in backends:
+        for n in tamanos:
+            mapa = _mapa_para(n, backend=backend)
+            origen = mapa.habitacion_inicial.pos
+            ms_objetos = _cronometrar(lambda _: _bfs_habitaciones(mapa, origen), repeticiones)
+            ms_indice = _cronometrar(lambda _: Mapa.adyacencia(mapa), repeticiones,
+                                     lambda: setattr(mapa, "_adyacencia", None))
+            ady = mapa.adyacencia()
+            o = ady.indice_de(origen)
+            ms_csr = _cronometrar(lambda _: ady.bfs(o), repeticiones)
+            if len(ady.bfs(o)[0]) != _bfs_habitaciones(mapa, origen):
+                raise RuntimeError("El BFS sobre el índice no coincide con el de las habitaciones")
+            fila = {"backend": backend, "habitaciones": n, "ms_indice": ms_indice,
+                    "hab_s_objetos": n / ms_objetos * 1000, "hab_s_csr": n / ms_csr * 1000}
+            resultados.append(fila)
+            print(f"{backend:9s} {n:8d} hab  índice {ms_indice:8.1f} ms   BFS habitaciones "
+                  f"{fila['hab_s_objetos'] / 1e6:6.2f} M hab/s   BFS CSR {fila['hab_s_csr'] / 1e6:6.2f} M hab/s")
+    return resultados
+
+
+def bench_estrategias(tamanos, backends, repeticiones: int = 3) -> list:
+    """Habitaciones por segundo de generar_estructura con cada estrategia de Mapa.ESTRATEGIAS."""
+    resultados = []
+    for backend in backends:
+        for n in tamanos:
+            lado = math.isqrt(int(n * 1.6)) + 1
+            for estrategia in Mapa.ESTRATEGIAS:
+                ms = _cronometrar(
+                    lambda _: Mapa(lado, lado, seed=1, backend=backend).generar_estructura(n, estrategia),
+                    repeticiones)
+                fila = {"backend": backend, "habitaciones": n, "estrategia": estrategia, "ms": ms,
+                        "hab_s": n / ms * 1000}
+                resultados.append(fila)
+                print(f"{backend:9s} {n:8d} hab  {estrategia:12s} {ms:9.1f} ms  {fila['hab_s'] / 1000:7.1f} k hab/s")
+    return resultados
+
+
+def bench_perfil(n_habitaciones: int, seed: int = 1, consultas: int = 50, combates: int = 200) -> "perfil.Perfil":
+    """Una partida instrumentada (perfil.py): generación, contenido, caminos, combates y render."""
+    p = perfil.activar()
+    try:
+        mapa = _mapa_para(n_habitaciones, seed=seed)
+        mapa.colocar_contenido(seed=seed)
+        explorador = Explorador(mapa, vida=10**9, rng=random.Random(seed))
+        rng = random.Random(seed)
+        coords = list(mapa.habitaciones)
+        for _ in range(consultas):
+            explorador.posicion_actual = rng.choice(coords)
+            explorador.encontrar_camino(rng.choice(coords))
+        for _ in range(combates):
+            Monstruo("Orco", 12, 3).interactuar(explorador, narrar=False)
+        if HAS_VIS:
+            visualizador_mod.console = Console(file=io.StringIO(), width=200, force_terminal=True)
+            vis = Visualizador(mapa)
+            vis.mostrar_mapa_completo()
+            vis.mostrar_minimapa(explorador)
+    finally:
+        perfil.desactivar()
+    informe = p.informe()
+    for nombre, t in informe["tiempos"].items():
+        print(f"{nombre:28s} {t['llamadas']:6d} llamadas  {t['total_ms']:10.3f} ms")
+    for nombre, valor in informe["contadores"].items():
+        print(f"{nombre:28s} {valor:12d}")
+    return p
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de dungeon_generator")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p_lote = sub.add_parser("lote", help="throughput de generar_lote vs workers")
+    p_lote.add_argument("--mapas", type=int, default=200)
+    p_lote.add_argument("--workers", default="1,2,4")
+
+    p_mem = sub.add_parser("memoria", help="bytes por habitación de un mapa generado")
+    p_mem.add_argument("--habitaciones", type=int, default=1_000_000)
+    p_mem.add_argument("--backend", default="dict,compacto")
+
+    p_cam = sub.add_parser("caminos", help="BFS vs A* vs bidireccional")
+    p_cam.add_argument("--habitaciones", default="10000,100000")
+    p_cam.add_argument("--consultas", type=int, default=200)
+
+    p_ren = sub.add_parser("render", help="render de texto del mapa completo")
+    p_ren.add_argument("--lados", default="100,500,1000,2000")
+    p_ren.add_argument("--backend", default="compacto")
+
+    p_sim = sub.add_parser("simulacion", help="partidas simuladas por minuto")
+    p_sim.add_argument("--partidas", type=int, default=20000)
+    p_sim.add_argument("--habitaciones", default="18,300")
+    p_sim.add_argument("--vida", type=int, default=5)
+    p_sim.add_argument("--combate", choices=MODOS_COMBATE, default="turnos")
+
+    p_suite = sub.add_parser("suite", help="suite completa con salida JSON y umbrales de regresión")
+    p_suite.add_argument("--habitaciones", default="100,1000,10000")
+    p_suite.add_argument("--seeds", default="1,2,3")
+    p_suite.add_argument("--repeticiones", type=int, default=3)
+    p_suite.add_argument("--json", help="fichero donde guardar los resultados")
+    p_suite.add_argument("--comparar", help="JSON de una ejecución anterior (base)")
+    p_suite.add_argument("--umbral", type=float, default=0.25, help="regresión tolerada (0.25 = +25%%)")
+
+    p_con = sub.add_parser("conectividad", help="consultas de conectividad tras editar pasillos")
+    p_con.add_argument("--habitaciones", default="10000,100000")
+    p_con.add_argument("--ediciones", type=int, default=100)
+
+    p_den = sub.add_parser("densidad", help="generación en mapas casi llenos (habitaciones/s por relleno)")
+    p_den.add_argument("--lados", default="100,200,400")
+    p_den.add_argument("--relleno", default="0.5,0.9,0.99,1.0")
+
+    p_ady = sub.add_parser("adyacencia", help="BFS en habitaciones/s: Habitacion vs índice CSR")
+    p_ady.add_argument("--habitaciones", default="10000,100000")
+    p_ady.add_argument("--backend", default="dict,compacto")
+
+    p_est = sub.add_parser("estrategias", help="habitaciones/s de cada estrategia de generación")
+    p_est.add_argument("--habitaciones", default="10000,100000")
+    p_est.add_argument("--backend", default="dict,compacto")
+
+    p_perfil = sub.add_parser("perfil", help="partida instrumentada con informe JSON / trace de Chrome")
+    p_perfil.add_argument("--habitaciones", type=int, default=10000)
+    p_perfil.add_argument("--json", help="informe de tiempos y contadores")
+    p_perfil.add_argument("--trace", help="fichero de trace events (chrome://tracing, Perfetto)")
+
+    args = parser.parse_args()
+    if args.bench == "lote":
+        bench_lote(args.mapas, [int(w) for w in args.workers.split(",")])
+    elif args.bench == "memoria":
+        bench_memoria(args.habitaciones, args.backend.split(","))
+    elif args.bench == "caminos":
+        bench_caminos([int(n) for n in args.habitaciones.split(",")], args.consultas)
+    elif args.bench == "render":
+        for backend in args.backend.split(","):
+            bench_render([int(l) for l in args.lados.split(",")], backend)
+    elif args.bench == "simulacion":
+        bench_simulacion(args.partidas, [int(n) for n in args.habitaciones.split(",")], args.vida, args.combate)
+    elif args.bench == "conectividad":
+        bench_conectividad([int(n) for n in args.habitaciones.split(",")], args.ediciones)
+    elif args.bench == "densidad":
+        bench_densidad([int(l) for l in args.lados.split(",")], [float(r) for r in args.relleno.split(",")])
+    elif args.bench == "adyacencia":
+        bench_adyacencia([int(n) for n in args.habitaciones.split(",")], args.backend.split(","))
+    elif args.bench == "estrategias":
+        bench_estrategias([int(n) for n in args.habitaciones.split(",")], args.backend.split(","))
+    elif args.bench == "perfil":
+        p = bench_perfil(args.habitaciones)
+        if args.json:
+            p.exportar_json(args.json)
+        if args.trace:
+            p.exportar_chrome(args.trace)
+    elif args.bench == "suite":
+        informe = bench_suite([int(n) for n in args.habitaciones.split(",")],
+                              [int(s) for s in args.seeds.split(",")], args.repeticiones)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(informe, f, indent=2)
+        if args.comparar:
+            with open(args.comparar, encoding="utf-8") as f:
+                base = json.load(f)
+            regresiones = comparar_suite(informe, base, args.umbral)
+            if regresiones:
+                print(f"{len(regresiones)} regresiones por encima de +{args.umbral:.0%}")
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,5 +7,8 @@ __all__ = [
     "visualizador",
     "eventos",
     "utils",
+    "lote",
 ]
 __modules__ = __all__  
+
+from .lote import generar_lote
@@ -0,0 +1,171 @@
+from __future__ import annotations
+from array import array
+from functools import lru_cache
+from itertools import accumulate, chain, compress
+from typing import List, Tuple
+from .habitacion import DIRECCIONES
+from .rejilla import DIR_BITS, HabitacionesCompactas
+
+# Índices de vecinos precalculados para los recorridos del grafo:
+# - vecinos_rejilla(ancho, alto): vecino de cada celda en cada dirección, sin comprobar bordes
+# - IndiceAdyacencia: habitaciones numeradas 0..n-1 con sus vecinos en formato CSR
+# Los algoritmos trabajan con enteros y arrays en lugar de tuplas, Habitacion y dicts.
+
+Coord = Tuple[int, int]
+
+
+@lru_cache(maxsize=8)
+def vecinos_rejilla(ancho: int, alto: int) -> Tuple[array, ...]:
+    """
+    Una tabla por dirección (orden de DIRECCIONES): tabla[celda] es el índice y*ancho+x del
+    vecino en esa dirección, o un valor negativo si cae fuera del mapa. Compartida entre
+    mapas del mismo tamaño; no se debe modificar.
+    """
+    n = ancho * alto
+    norte = array("i", range(-ancho, n - ancho))  # la primera fila ya queda negativa
+    sur = array("i", range(ancho, n))
+    sur.extend(array("i", [-1]) * min(ancho, n))
+    este = array("i", range(1, n + 1))
+    este[ancho - 1::ancho] = array("i", [-1]) * alto
+    oeste = array("i", range(-1, n - 1))
+    oeste[0::ancho] = array("i", [-1]) * alto
+    return (norte, sur, este, oeste)
+
+
+class IndiceAdyacencia:
+    """
+    Grafo de un Mapa en formato CSR, construido una vez (Mapa.adyacencia()) y reutilizado
+    hasta el siguiente cambio de estructura:
+    - coords[i]: coord de la habitación i (orden de iteración de mapa.habitaciones)
+    - indice[celda]: número de la habitación en la celda y*ancho+x, -1 si no hay
+    - vecinos[inicio[i]:inicio[i+1]]: habitaciones conectadas a i, en el orden de sus conexiones
+    - direcciones[k]: código (DIRECCIONES) del pasillo vecinos[k]
+    - adyacentes[i]: los mismos vecinos como tupla; iterar tuplas es lo más rápido en Python
+      y es lo que usan los recorridos
+    Solo cuentan los pasillos hacia habitaciones que están en el mapa.
+    """
+
+    __slots__ = ("ancho", "alto", "coords", "indice", "inicio", "vecinos", "direcciones", "adyacentes")
+
+    def __init__(self, mapa):
+        self.ancho = ancho = mapa.ancho
+        self.alto = alto = mapa.alto
+        habitaciones = mapa.habitaciones
+        indice = array("i", [-1]) * (ancho * alto)
+        adyacentes: List[Tuple[int, ...]] = []
+        codigos = bytearray()
+        if isinstance(habitaciones, HabitacionesCompactas):
+            celdas = list(compress(range(ancho * alto), habitaciones.existe))
+            self.coords: List[Coord] = [(c % ancho, c // ancho) for c in celdas]
+            for i, c in enumerate(celdas):
+                indice[c] = i
+            # por cada máscara posible: (tabla de vecinos, código) de sus bits
+            tablas = vecinos_rejilla(ancho, alto)
+            por_mascara = [tuple((tablas[k], k) for k, bit in enumerate(DIR_BITS.values()) if m & bit)
+                           for m in range(16)]
+            mascaras = habitaciones.conexiones
+            for c in celdas:
+                fila = []
+                for tabla, codigo in por_mascara[mascaras[c]]:
+                    vecino = tabla[c]
+                    if vecino >= 0 and indice[vecino] >= 0:
+                        fila.append(indice[vecino])
+                        codigos.append(codigo)
+                adyacentes.append(tuple(fila))
+        else:
+            self.coords = list(habitaciones)
+            numero = {c: i for i, c in enumerate(self.coords)}
+            for i, (x, y) in enumerate(self.coords):
+                indice[y * ancho + x] = i
+            codigo_de = {d: k for k, d in enumerate(DIRECCIONES)}
+            for actual in habitaciones.values():
+                fila = []
+                for direccion, hab in actual.conexiones.items():
+                    otra = numero.get(hab.pos, -1)
+                    if otra >= 0:
+                        fila.append(otra)
+                        codigos.append(codigo_de[direccion])
+                adyacentes.append(tuple(fila))
+        self.indice = indice
+        self.adyacentes = adyacentes
+        self.vecinos = array("i", chain.from_iterable(adyacentes))
+        self.inicio = array("i", accumulate(map(len, adyacentes), initial=0))
+        self.direcciones = bytes(codigos)
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def indice_de(self, coord) -> int:
+        """Número de la habitación en 'coord' o -1."""
+        x, y = coord
+        if 0 <= x < self.ancho and 0 <= y < self.alto:
+            return self.indice[y * self.ancho + x]
+        return -1
+
+    def direccion(self, i: int, j: int) -> str:
+        """Dirección del pasillo de la habitación i a su vecina j."""
+        return DIRECCIONES[self.direcciones[self.inicio[i] + self.adyacentes[i].index(j)]]
+
+    def bfs(self, origen: int, destino: int = -1):
+        """
+        Recorrido en anchura desde la habitación 'origen'. Devuelve (orden, padre):
+        - orden: habitaciones visitadas en orden BFS
+        - padre[i]: habitación desde la que se llegó a i (-1 en el origen)
+        Sin destino, padre es una lista de todo el mapa (-2 = no visitada). Con destino, la
+        búsqueda termina al descubrirlo y padre es un dict solo con lo visitado, para no
+        pagar una lista del tamaño del mapa en cada consulta local.
+        """
+        orden = [origen]
+        agregar = orden.append
+        adyacentes = self.adyacentes
+        if destino >= 0:
+            visitado = {origen: -1}
+            for actual in orden:
+                for otra in adyacentes[actual]:
+                    if otra not in visitado:
+                        visitado[otra] = actual
+                        agregar(otra)
+                        if otra == destino:
+                            return orden, visitado
+            return orden, visitado
+        padre = [-2] * len(self.coords)
+        padre[origen] = -1
+        for actual in orden:
+            for otra in adyacentes[actual]:
+                if padre[otra] == -2:
+                    padre[otra] = actual
+                    agregar(otra)
+        return orden, padre
+
+    def alcanzables(self, origen: int) -> int:
+        """Cuántas habitaciones se alcanzan desde 'origen' (incluida)."""
+        if origen < 0:
+            return 0
+        visto = bytearray(len(self.coords))
+        visto[origen] = 1
+        orden = [origen]
+        agregar = orden.append
+        adyacentes = self.adyacentes
+        for actual in orden:
+            for otra in adyacentes[actual]:
+                if not visto[otra]:
+                    visto[otra] = 1
+                    agregar(otra)
+        return len(orden)
+
+    def distancias_celda(self, origen: int) -> array:
+        """Pasos desde 'origen' hasta cada celda (array y*ancho+x); -1 sin habitación o inalcanzable."""
+        ancho = self.ancho
+        dist = array("i", [-1]) * (ancho * self.alto)
+        if origen < 0:
+            return dist
+        orden, padre = self.bfs(origen)
+        coords = self.coords
+        pasos = [0] * len(coords)
+        for i in orden:
+            p = padre[i]
+            d = pasos[p] + 1 if p >= 0 else 0
+            pasos[i] = d
+            x, y = coords[i]
+            dist[y * ancho + x] = d
+        return dist
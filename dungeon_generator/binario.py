@@ -0,0 +1,201 @@
+from __future__ import annotations
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Tuple
+from .mapa import Mapa
+from .explorador import Explorador
+from .contenido import ContenidoHabitacion, contenido_from_dict
+from .rejilla import HabitacionesCompactas, DIR_BITS, codigo_de_contenido
+from .serializacion import _explorador_a_dict, _explorador_desde_dict
+
+# Formato binario de partida (versión 1). Tras la cabecera van secciones alineadas a 8 bytes,
+# cada una con un valor por celda (indice y*ancho+x), en el mismo orden que los buffers de
+# HabitacionesCompactas para poder mapearlas sin copiar:
+#   existe[u8] visitadas[u8] conexiones[u8] tipos[u8] ids[i32] refs_contenido[i32]
+#   offsets_contenido[i64 * (n_contenidos+1)]  blob_contenido  explorador(JSON)
+# El contenido es una tabla lateral de JSON deduplicado: refs_contenido apunta a su entrada
+# (-1 = sin contenido) y solo se decodifica al acceder a la habitación.
+
+MAGIC = b"DGNB"
+VERSION = 1
+_CABECERA = struct.Struct("<4sHBxiiiiiiQQ")
+_ORDEN = {"little": 0, "big": 1}
+
+
+def _alinear(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class _ContenidosPerezosos(MutableMapping):
+    """
+    Tabla {indice: contenido} que decodifica cada contenido del blob la primera vez que se pide.
+    Lo decodificado o asignado se queda en memoria ('_vivos'), así los cambios (vida de un
+    monstruo, tesoro recogido) persisten durante la partida sin tocar el archivo.
+    """
+
+    def __init__(self, refs, offsets, blob):
+        self._refs = refs
+        self._offsets = offsets
+        self._blob = blob
+        self._vivos: Dict[int, ContenidoHabitacion] = {}
+        self._borrados = set()
+
+    def __getitem__(self, idx: int) -> ContenidoHabitacion:
+        contenido = self._vivos.get(idx)
+        if contenido is not None:
+            return contenido
+        ref = self._refs[idx]
+        if ref < 0 or idx in self._borrados:
+            raise KeyError(idx)
+        crudo = bytes(self._blob[self._offsets[ref]:self._offsets[ref + 1]])
+        contenido = contenido_from_dict(json.loads(crudo))
+        self._vivos[idx] = contenido
+        return contenido
+
+    def __setitem__(self, idx: int, contenido: ContenidoHabitacion):
+        self._vivos[idx] = contenido
+        self._borrados.discard(idx)
+
+    def __delitem__(self, idx: int):
+        if idx in self._vivos:
+            del self._vivos[idx]
+        elif self._refs[idx] < 0 or idx in self._borrados:
+            raise KeyError(idx)
+        if self._refs[idx] >= 0:
+            self._borrados.add(idx)
+
+    def __iter__(self) -> Iterator[int]:
+        for idx in range(len(self._refs)):
+            if idx in self._vivos or (self._refs[idx] >= 0 and idx not in self._borrados):
+                yield idx
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def _planos_de(mapa: Mapa):
+    """(existe, visitadas, conexiones, tipos, ids, inicio, n) como buffers por celda."""
+    habitaciones = mapa.habitaciones
+    if isinstance(habitaciones, HabitacionesCompactas):
+        return (habitaciones.existe, habitaciones.visitadas, habitaciones.conexiones, habitaciones.tipos,
+                habitaciones.ids, habitaciones.inicio, len(habitaciones))
+    celdas = mapa.ancho * mapa.alto
+    existe = bytearray(celdas)
+    visitadas = bytearray(celdas)
+    conexiones = bytearray(celdas)
+    tipos = bytearray(celdas)
+    ids = array("i", [-1]) * celdas
+    inicio = -1
+    for (x, y), hab in habitaciones.items():
+        idx = y * mapa.ancho + x
+        existe[idx] = 1
+        visitadas[idx] = 1 if hab.visitada else 0
+        mask = 0
+        for direccion in hab.conexiones:
+            mask |= DIR_BITS[direccion]
+        conexiones[idx] = mask
+        tipos[idx] = codigo_de_contenido(hab.contenido)
+        ids[idx] = hab.id
+        if hab.inicial:
+            inicio = idx
+    return existe, visitadas, conexiones, tipos, ids, inicio, len(habitaciones)
+
+
+def guardar_partida_binaria(mapa: Mapa, explorador: Explorador, archivo: str) -> None:
+    """
+    Guarda la partida en el formato binario versionado descrito arriba.
+    Solo admite conexiones entre celdas adyacentes (las que genera Mapa).
+    Se escribe en un temporal y se reemplaza el archivo al final: un mapa cargado de
+    'archivo' sigue leyendo de su mmap, así que no se puede truncar mientras se guarda.
+    """
+    existe, visitadas, conexiones, tipos, ids, inicio, n = _planos_de(mapa)
+    celdas = mapa.ancho * mapa.alto
+
+    refs = array("i", [-1]) * celdas
+    offsets = array("q", [0])
+    blob = bytearray()
+    vistos: Dict[bytes, int] = {}
+    for (x, y), hab in mapa.habitaciones.items():
+        if hab.contenido is None:
+            continue
+        crudo = json.dumps(hab.contenido.to_dict(), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ref = vistos.get(crudo)
+        if ref is None:
+            ref = len(offsets) - 1
+            vistos[crudo] = ref
+            blob += crudo
+            offsets.append(len(blob))
+        refs[y * mapa.ancho + x] = ref
+
+    explorador_json = json.dumps(_explorador_a_dict(explorador), separators=(",", ":")).encode("utf-8")
+    cabecera = _CABECERA.pack(
+        MAGIC, VERSION, _ORDEN[sys.byteorder], mapa.ancho, mapa.alto, n, inicio,
+        mapa._next_id, len(offsets) - 1, len(blob), len(explorador_json),
+    )
+    tmp = f"{archivo}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            for seccion in (cabecera, existe, visitadas, conexiones, tipos, ids, refs, offsets, blob, explorador_json):
+                datos = memoryview(seccion).cast("B")
+                f.write(datos)
+                f.write(b"\0" * (_alinear(datos.nbytes) - datos.nbytes))
+        os.replace(tmp, archivo)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def cargar_partida_binaria(archivo: str) -> Tuple[Mapa, Explorador]:
+    """
+    Abre una partida binaria con mmap (copia privada: los cambios no tocan el archivo).
+    No decodifica habitaciones: el Mapa resultante usa el backend compacto apoyado
+    directamente en las secciones del archivo, y el contenido se lee al accederlo.
+    """
+    with open(archivo, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    (magic, version, orden, ancho, alto, n, inicio, next_id,
+     n_contenidos, blob_len, explorador_len) = _CABECERA.unpack_from(mm, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{archivo} no es una partida binaria")
+    if version > VERSION:
+        raise ValueError(f"Versión de partida no soportada: {version}")
+    if orden != _ORDEN[sys.byteorder]:
+        raise ValueError("La partida se guardó con otro orden de bytes")
+
+    vista = memoryview(mm)
+    pos = _alinear(_CABECERA.size)
+    celdas = ancho * alto
+
+    def seccion(tam: int, formato: str = "B"):
+        nonlocal pos
+        trozo = vista[pos:pos + tam]
+        pos = _alinear(pos + tam)
+        return trozo.cast(formato) if formato != "B" else trozo
+
+    existe = seccion(celdas)
+    visitadas = seccion(celdas)
+    conexiones = seccion(celdas)
+    tipos = seccion(celdas)
+    ids = seccion(celdas * 4, "i")
+    refs = seccion(celdas * 4, "i")
+    offsets = seccion((n_contenidos + 1) * 8, "q")
+    blob = seccion(blob_len)
+    explorador_data = json.loads(bytes(seccion(explorador_len)))
+
+    mapa = Mapa(ancho, alto, backend="compacto")
+    mapa.habitaciones = HabitacionesCompactas.desde_buffers(
+        ancho, alto, existe=existe, visitadas=visitadas, conexiones=conexiones, tipos=tipos, ids=ids,
+        contenidos=_ContenidosPerezosos(refs, offsets, blob), inicio=inicio, n=n, mapa=mapa, respaldo=mm,
+    )
+    mapa._next_id = next_id
+    mapa.recontar_estadisticas(perezoso=True)
+    if inicio >= 0:
+        mapa.habitacion_inicial = mapa.habitaciones.vista(inicio)
+    explorador = _explorador_desde_dict(mapa, explorador_data)
+    return mapa, explorador
@@ -0,0 +1,40 @@
+from __future__ import annotations
+from typing import List, Tuple
+
+
+class SeguimientoCambios:
+    """
+    Conjunto de habitaciones "sucias" de un Mapa: un byte por celda (y*ancho+x) para
+    no repetir y una lista con el orden de marcado, así extraer() es O(cambios).
+    Cada consumidor (guardado, render, ...) puede tener el suyo con Mapa.nuevo_seguimiento().
+    """
+
+    __slots__ = ("ancho", "_marcas", "_orden")
+
+    def __init__(self, ancho: int, alto: int):
+        self.ancho = ancho
+        self._marcas = bytearray(ancho * alto)
+        self._orden: List[int] = []
+
+    def marcar(self, idx: int):
+        if not self._marcas[idx]:
+            self._marcas[idx] = 1
+            self._orden.append(idx)
+
+    def __len__(self) -> int:
+        return len(self._orden)
+
+    def __contains__(self, coord) -> bool:
+        x, y = coord
+        return bool(self._marcas[y * self.ancho + x])
+
+    def extraer(self) -> List[Tuple[int, int]]:
+        """Devuelve las coords marcadas (en orden de marcado) y vacía el conjunto."""
+        ancho = self.ancho
+        marcas = self._marcas
+        coords = []
+        for idx in self._orden:
+            marcas[idx] = 0
+            coords.append((idx % ancho, idx // ancho))
+        self._orden = []
+        return coords
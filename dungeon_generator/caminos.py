@@ -0,0 +1,207 @@
+from __future__ import annotations
+import heapq
+from collections import OrderedDict
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+from .habitacion import DIRECCIONES, DIR_OPUESTA
+from . import perfil
+
+Coord = Tuple[int, int]
+# predecesor de cada coord alcanzable en el árbol BFS: (coord_padre, dirección usada) o None en el origen
+ArbolBFS = Dict[Coord, Optional[Tuple[Coord, str]]]
+
+
+class CacheCaminos:
+    """
+    Servicio de consultas de camino sobre un Mapa.
+    Guarda el árbol BFS completo de los últimos 'max_arboles' orígenes (LRU); una consulta
+    repetida desde el mismo origen solo recorre el camino hacia atrás (O(longitud)).
+    El Mapa llama a invalidar() cuando cambia alguna conexión.
+
+    Estrategias de camino():
+    - "bfs": árbol BFS cacheado (con max_arboles=0, BFS que para al llegar al destino)
+    - "a_estrella": A* con la heurística manhattan de mapa.py
+    - "bidireccional": BFS simultáneo desde origen y destino
+    Todas devuelven un camino más corto; 'ultimos_expandidos' cuenta los nodos expandidos
+    por la última consulta.
+    """
+
+    ESTRATEGIAS = ("bfs", "a_estrella", "bidireccional")
+
+    def __init__(self, mapa, max_arboles: int = 8):
+        self.mapa = mapa
+        self.max_arboles = max(0, int(max_arboles))
+        self._arboles: "OrderedDict[Coord, ArbolBFS]" = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.ultimos_expandidos = 0
+
+    def invalidar(self):
+        self._arboles.clear()
+
+    def arbol_desde(self, origen: Coord) -> ArbolBFS:
+        arbol = self._arboles.get(origen)
+        if arbol is not None:
+            self._arboles.move_to_end(origen)
+            self.aciertos += 1
+            self.ultimos_expandidos = 0
+            return arbol
+        self.fallos += 1
+        arbol = self._bfs(origen)
+        if self.max_arboles > 0:
+            self._arboles[origen] = arbol
+            if len(self._arboles) > self.max_arboles:
+                self._arboles.popitem(last=False)
+        return arbol
+
+    def _bfs(self, origen: Coord, destino: Optional[Coord] = None) -> ArbolBFS:
+        """Árbol BFS desde origen; si se da destino, para en cuanto lo descubre."""
+        ady = self.mapa.adyacencia()
+        prev: ArbolBFS = {origen: None}
+        o = ady.indice_de(origen)
+        if o < 0:
+            self.ultimos_expandidos = 0
+            return prev
+        d = ady.indice_de(destino) if destino is not None else -1
+        orden, padre = ady.bfs(o, d)
+        coords, adyacentes, inicio, direcciones = ady.coords, ady.adyacentes, ady.inicio, ady.direcciones
+        for i in orden[1:]:
+            p = padre[i]
+            # ady.direccion(p, i) sin la llamada
+            prev[coords[i]] = (coords[p], DIRECCIONES[direcciones[inicio[p] + adyacentes[p].index(i)]])
+        # con destino, el recorrido se corta al descubrirlo: lo expandido es lo anterior a él
+        if d >= 0 and orden[-1] == d:
+            self.ultimos_expandidos = orden.index(padre[d]) + 1
+        else:
+            self.ultimos_expandidos = len(orden)
+        return prev
+
+    def camino(self, origen: Coord, destino: Coord, estrategia: str = "bfs") -> List[Tuple[str, Coord]]:
+        """Lista de (direccion, coord) de origen a destino; [] si son iguales o no hay camino."""
+        origen = tuple(origen)
+        destino = tuple(destino)
+        if origen == destino:
+            self.ultimos_expandidos = 0
+            return []
+        if estrategia == "bfs":
+            prev = self.arbol_desde(origen) if self.max_arboles > 0 else self._bfs(origen, destino)
+        elif estrategia == "a_estrella":
+            prev = self._a_estrella(origen, destino)
+        elif estrategia == "bidireccional":
+            camino = self._bidireccional(origen, destino)
+            perfil.contar("bfs/nodos_expandidos", self.ultimos_expandidos)
+            return camino
+        else:
+            raise ValueError(f"Estrategia de camino desconocida: {estrategia}")
+        perfil.contar("bfs/nodos_expandidos", self.ultimos_expandidos)
+        if destino not in prev:
+            return []
+        return _reconstruir(prev, destino)
+
+    def _a_estrella(self, origen: Coord, destino: Coord) -> ArbolBFS:
+        ady = self.mapa.adyacencia()
+        prev: ArbolBFS = {origen: None}
+        o, d = ady.indice_de(origen), ady.indice_de(destino)
+        if o < 0 or d < 0:
+            self.ultimos_expandidos = 0
+            return prev
+        coords = ady.coords
+        adyacentes = ady.adyacentes
+        dx, dy = destino
+        # búsquedas locales: dicts por número de habitación en lugar de arrays del tamaño del mapa
+        g = {o: 0}
+        padre = {}
+        cerrados = set()
+        expandidos = 0
+        desempate = count()
+        abiertos = [(abs(origen[0] - dx) + abs(origen[1] - dy), next(desempate), o)]
+        while abiertos:
+            _, _, cur = heapq.heappop(abiertos)
+            if cur in cerrados:
+                continue
+            if cur == d:
+                break
+            cerrados.add(cur)
+            expandidos += 1
+            g_vecino = g[cur] + 1
+            for otra in adyacentes[cur]:
+                if otra in cerrados:
+                    continue
+                if g_vecino < g.get(otra, g_vecino + 1):
+                    g[otra] = g_vecino
+                    padre[otra] = cur
+                    x, y = coords[otra]
+                    heapq.heappush(abiertos, (g_vecino + abs(x - dx) + abs(y - dy), next(desempate), otra))
+        for i, p in padre.items():
+            prev[coords[i]] = (coords[p], ady.direccion(p, i))
+        self.ultimos_expandidos = expandidos
+        return prev
+
+    def _bidireccional(self, origen: Coord, destino: Coord) -> List[Tuple[str, Coord]]:
+        ady = self.mapa.adyacencia()
+        self.ultimos_expandidos = 0
+        o, d = ady.indice_de(origen), ady.indice_de(destino)
+        if o < 0 or d < 0:
+            return []
+        coords = ady.coords
+        adyacentes = ady.adyacentes
+        # por lado: padre (la raíz apunta a sí misma) y distancia, por número de habitación
+        padre_ida = {o: o}
+        padre_vuelta = {d: d}
+        dist_ida = {o: 0}
+        dist_vuelta = {d: 0}
+        nivel_ida = [o]
+        nivel_vuelta = [d]
+        expandidos = 0
+        while nivel_ida and nivel_vuelta:
+            adelante = len(nivel_ida) <= len(nivel_vuelta)
+            nivel = nivel_ida if adelante else nivel_vuelta
+            padre, padre_otro = (padre_ida, padre_vuelta) if adelante else (padre_vuelta, padre_ida)
+            dist_propio, dist_otro = (dist_ida, dist_vuelta) if adelante else (dist_vuelta, dist_ida)
+            siguiente = []
+            mejor = None
+            for cur in nivel:
+                expandidos += 1
+                for otra in adyacentes[cur]:
+                    if otra in padre:
+                        continue
+                    padre[otra] = cur
+                    dist_propio[otra] = dist_propio[cur] + 1
+                    if otra in padre_otro:
+                        total = dist_propio[otra] + dist_otro[otra]
+                        if mejor is None or total < mejor[0]:
+                            mejor = (total, otra)
+                    siguiente.append(otra)
+            if mejor is not None:
+                self.ultimos_expandidos = expandidos
+                encuentro = mejor[1]
+                path = []
+                node = encuentro
+                while node != o:
+                    path.append((ady.direccion(padre_ida[node], node), coords[node]))
+                    node = padre_ida[node]
+                path.reverse()
+                node = encuentro
+                while node != d:
+                    # el lado de vuelta se descubrió desde el destino: se recorre el pasillo al revés
+                    siguiente_nodo = padre_vuelta[node]
+                    path.append((DIR_OPUESTA[ady.direccion(siguiente_nodo, node)], coords[siguiente_nodo]))
+                    node = siguiente_nodo
+                return path
+            if adelante:
+                nivel_ida = siguiente
+            else:
+                nivel_vuelta = siguiente
+        self.ultimos_expandidos = expandidos
+        return []
+
+
+def _reconstruir(prev: ArbolBFS, destino: Coord) -> List[Tuple[str, Coord]]:
+    path = []
+    node = destino
+    while prev[node] is not None:
+        pcoord, pdirection = prev[node]
+        path.append((pdirection, node))
+        node = pcoord
+    path.reverse()
+    return path
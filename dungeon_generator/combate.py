@@ -0,0 +1,182 @@
+from __future__ import annotations
+import random
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+from .contenido import Jefe, Monstruo, _rng_para
+
+# Resolución de combates por distribución exacta en lugar de turno a turno.
+# Las reglas son las de Monstruo.interactuar / Jefe.interactuar:
+# - quién empieza: 50% el jugador (monstruo), 35% el jugador (jefe)
+# - daño del jugador uniforme en [max(1, ataque-1), ataque+1] (jefe: [1, 2 + ataque_jefe//2])
+# - daño del enemigo uniforme en [1, ataque_enemigo]
+# Un resultado es (vida final del jugador, vida final del enemigo); uno de los dos es 0.
+
+PRIMERO_MONSTRUO = 0.5
+PRIMERO_JEFE = 0.35
+
+
+class DistribucionCombate:
+    """
+    Resultados posibles de un combate con su probabilidad exacta, más una tabla de alias
+    (método de Walker/Vose) para muestrear un resultado en O(1) con un solo random().
+    """
+
+    __slots__ = ("vida_inicial", "resultados", "probabilidades", "prob_victoria", "perdida_esperada",
+                 "_umbral", "_alias")
+
+    def __init__(self, vida_inicial: int, resultados: List[Tuple[int, int]], probabilidades: List[float]):
+        self.vida_inicial = vida_inicial
+        self.resultados = resultados
+        self.probabilidades = probabilidades
+        self.prob_victoria = sum(p for (_, enemigo), p in zip(resultados, probabilidades) if enemigo <= 0)
+        self.perdida_esperada = sum(p * (vida_inicial - vida)
+                                    for (vida, _), p in zip(resultados, probabilidades))
+        self._umbral, self._alias = _tabla_alias(probabilidades)
+
+    def muestrear(self, aleatorio: Callable[[], float]) -> Tuple[int, int]:
+        u = aleatorio() * len(self.resultados)
+        i = int(u)
+        if u - i < self._umbral[i]:
+            return self.resultados[i]
+        return self.resultados[self._alias[i]]
+
+    def __repr__(self) -> str:
+        return (f"DistribucionCombate(resultados={len(self.resultados)}, "
+                f"victoria={self.prob_victoria:.4f}, perdida={self.perdida_esperada:.3f})")
+
+
+def _tabla_alias(probabilidades: List[float]) -> Tuple[List[float], List[int]]:
+    n = len(probabilidades)
+    escaladas = [p * n for p in probabilidades]
+    umbral = [1.0] * n
+    alias = list(range(n))
+    pequenas = [i for i, p in enumerate(escaladas) if p < 1.0]
+    grandes = [i for i, p in enumerate(escaladas) if p >= 1.0]
+    while pequenas and grandes:
+        s = pequenas.pop()
+        g = grandes[-1]
+        umbral[s] = escaladas[s]
+        alias[s] = g
+        escaladas[g] -= 1.0 - escaladas[s]
+        if escaladas[g] < 1.0:
+            pequenas.append(grandes.pop())
+    # lo que queda es 1.0 salvo errores de redondeo
+    return umbral, alias
+
+
+@lru_cache(maxsize=4096)
+def distribucion(vida: int, vida_enemigo: int, danio_min: int, danio_max: int,
+                 ataque_enemigo: int, prob_primero: float) -> DistribucionCombate:
+    """
+    Programación dinámica hacia delante sobre los estados (vida, vida_enemigo, turno).
+    Cada golpe baja estrictamente vida + vida_enemigo, así que se procesan los estados por
+    esa suma de mayor a menor y cada uno se visita una vez.
+    """
+    vida = max(0, int(vida))
+    vida_enemigo = max(0, int(vida_enemigo))
+    if vida <= 0 or vida_enemigo <= 0:
+        return DistribucionCombate(vida, [(vida, vida_enemigo)], [1.0])
+    ataque_enemigo = max(1, int(ataque_enemigo))
+    golpes_jugador = range(danio_min, danio_max + 1)
+    p_jugador = 1.0 / len(golpes_jugador)
+    p_enemigo = 1.0 / ataque_enemigo
+
+    # niveles[s] = {(vida, vida_enemigo, turno): probabilidad} con vida + vida_enemigo == s
+    niveles: List[dict] = [dict() for _ in range(vida + vida_enemigo + 1)]
+    niveles[-1][(vida, vida_enemigo, 0)] = prob_primero
+    niveles[-1][(vida, vida_enemigo, 1)] = 1.0 - prob_primero
+    finales: dict = {}
+    for nivel in reversed(niveles):
+        for (v, e, turno), p in nivel.items():
+            if turno == 0:
+                q = p * p_jugador
+                for d in golpes_jugador:
+                    if e - d <= 0:
+                        finales[(v, 0)] = finales.get((v, 0), 0.0) + q
+                    else:
+                        clave = (v, e - d, 1)
+                        destino = niveles[v + e - d]
+                        destino[clave] = destino.get(clave, 0.0) + q
+            else:
+                q = p * p_enemigo
+                for d in range(1, ataque_enemigo + 1):
+                    if v - d <= 0:
+                        finales[(0, e)] = finales.get((0, e), 0.0) + q
+                    else:
+                        clave = (v - d, e, 0)
+                        destino = niveles[v - d + e]
+                        destino[clave] = destino.get(clave, 0.0) + q
+    resultados = sorted(r for r, p in finales.items() if p > 0.0)
+    return DistribucionCombate(vida, resultados, [finales[r] for r in resultados])
+
+
+def distribucion_monstruo(ataque: int, vida: int, vida_monstruo: int, ataque_monstruo: int) -> DistribucionCombate:
+    """Combate de Monstruo.interactuar con el ataque actual del jugador (calcular_ataque())."""
+    return distribucion(vida, vida_monstruo, max(1, ataque - 1), ataque + 1, ataque_monstruo, PRIMERO_MONSTRUO)
+
+
+def distribucion_jefe(vida: int, vida_jefe: int, ataque_jefe: int) -> DistribucionCombate:
+    """Combate de Jefe.interactuar (el daño del jugador depende solo del ataque del jefe)."""
+    return distribucion(vida, vida_jefe, 1, 2 + int(ataque_jefe / 2), ataque_jefe, PRIMERO_JEFE)
+
+
+def distribucion_de(enemigo: Monstruo, explorador) -> DistribucionCombate:
+    if isinstance(enemigo, Jefe):
+        return distribucion_jefe(explorador.vida, enemigo.vida, enemigo.ataque)
+    return distribucion_monstruo(explorador.calcular_ataque(), explorador.vida, enemigo.vida, enemigo.ataque)
+
+
+class ResultadoCombate:
+    """Resultado de resolver_combate(); el texto solo se compone si se pide (narracion / str())."""
+
+    __slots__ = ("nombre", "jefe", "vida_antes", "vida_despues", "vida_enemigo", "recompensa")
+
+    def __init__(self, nombre: str, jefe: bool, vida_antes: int, vida_despues: int, vida_enemigo: int,
+                 recompensa=None):
+        self.nombre = nombre
+        self.jefe = jefe
+        self.vida_antes = vida_antes
+        self.vida_despues = vida_despues
+        self.vida_enemigo = vida_enemigo
+        self.recompensa = recompensa
+
+    @property
+    def victoria(self) -> bool:
+        return self.vida_enemigo <= 0 and self.vida_despues > 0
+
+    @property
+    def danio_recibido(self) -> int:
+        return self.vida_antes - self.vida_despues
+
+    @property
+    def narracion(self) -> str:
+        quien = f"el jefe {self.nombre}" if self.jefe else self.nombre
+        texto = f"Combate contra {quien}: pierdes {self.danio_recibido} PV (tus PV {self.vida_despues})."
+        if self.victoria:
+            texto += f"\nHas derrotado {'al jefe ' + self.nombre if self.jefe else 'a ' + self.nombre}."
+            if self.recompensa is not None:
+                texto += f" Obtienes {self.recompensa.nombre}!"
+        elif self.vida_despues <= 0:
+            texto += f"\nHas sido derrotado ({self.nombre} queda con {self.vida_enemigo} PV)."
+        return texto
+
+    def __str__(self) -> str:
+        return self.narracion
+
+
+def resolver_combate(enemigo: Monstruo, explorador, rng: Optional[random.Random] = None) -> ResultadoCombate:
+    """
+    Alternativa a enemigo.interactuar(): muestrea el resultado de la distribución exacta y lo
+    aplica (vida del explorador, vida del enemigo, recompensa del jefe) sin simular turnos.
+    """
+    rng = _rng_para(explorador, rng)
+    vida_antes = explorador.vida
+    vida_final, vida_enemigo = distribucion_de(enemigo, explorador).muestrear(rng.random)
+    explorador.recibir_dano(vida_antes - vida_final)
+    enemigo.vida = vida_enemigo
+    recompensa = None
+    jefe = isinstance(enemigo, Jefe)
+    if jefe and vida_enemigo <= 0 and explorador.vida > 0:
+        recompensa = enemigo.recompensa_especial
+        explorador.inventario.append(recompensa)
+    return ResultadoCombate(enemigo.nombre, jefe, vida_antes, explorador.vida, vida_enemigo, recompensa)
@@ -0,0 +1,314 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+from .habitacion import DIR_DELTAS, DIR_OPUESTA
+from .rejilla import DIR_BITS, HabitacionesCompactas
+
+Coord = Tuple[int, int]
+
+
+class UnionFind:
+    """
+    Conjuntos disjuntos sobre índices de celda (y*ancho+x): unión por tamaño y compresión
+    de caminos a medias. 'componentes' cuenta solo los elementos dados de alta con agregar().
+    """
+
+    __slots__ = ("padre", "tamano", "componentes")
+
+    def __init__(self, n: int):
+        self.padre = array("i", range(n))
+        self.tamano = array("i", [1]) * n
+        self.componentes = 0
+
+    def agregar(self, i: int):
+        self.padre[i] = i
+        self.tamano[i] = 1
+        self.componentes += 1
+
+    def buscar(self, i: int) -> int:
+        padre = self.padre
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    def unir(self, a: int, b: int) -> bool:
+        """Une los conjuntos de a y b; False si ya estaban juntos."""
+        ra, rb = self.buscar(a), self.buscar(b)
+        if ra == rb:
+            return False
+        if self.tamano[ra] < self.tamano[rb]:
+            ra, rb = rb, ra
+        self.padre[rb] = ra
+        self.tamano[ra] += self.tamano[rb]
+        self.componentes -= 1
+        return True
+
+
+class Conectividad:
+    """
+    Comprobador incremental de conectividad de un Mapa (se obtiene con Mapa.conectividad()).
+    Cada habitación lleva la etiqueta de su componente y se guarda el tamaño de cada uno,
+    así conexo()/mismo_componente() son O(1). Con los avisos del mapa compara la máscara de
+    conexiones conocida de la celda con la actual y sabe qué pasillos cambiaron:
+    - un pasillo nuevo entre componentes distintos reetiqueta el más pequeño;
+    - al quitar un pasillo se busca otro camino entre sus extremos con un BFS alterno nodo
+      a nodo: si se encuentran no cambia nada; si un lado se agota, ese lado (el pequeño)
+      pasa a ser un componente nuevo. Si los puentes están calculados y el pasillo no es
+      uno de ellos no hace falta ni buscar.
+    El coste de una edición es el del lado más pequeño, no el del mapa. Quitar habitaciones
+    (o vaciar el mapa) rehace las etiquetas en la siguiente consulta.
+    Los puentes se calculan (Tarjan, O(habitaciones)) al pedirlos y se guardan hasta el
+    siguiente cambio que pueda alterarlos. Los pasillos se interpretan por dirección: unen
+    celdas vecinas de la rejilla.
+    """
+
+    def __init__(self, mapa):
+        self.mapa = mapa
+        self.ancho = mapa.ancho
+        self.alto = mapa.alto
+        # (bit, desplazamiento de índice, bit opuesto) por dirección
+        self._dirs = [(DIR_BITS[d], dx + dy * self.ancho, DIR_BITS[DIR_OPUESTA[d]]) for d, (dx, dy) in DIR_DELTAS.items()]
+        self._mascara = bytearray(self.ancho * self.alto)
+        self._etiqueta = array("i", [-1]) * (self.ancho * self.alto)
+        self._tamanos: Optional[Dict[int, int]] = None  # etiqueta -> habitaciones; None = rehacer
+        self._siguiente = 0
+        self._puentes: Optional[Set[Tuple[int, int]]] = None
+        self.reconstrucciones = 0
+        self.reconstruir()
+
+    # --- estado a partir del mapa ---
+    def _mascara_actual(self, coord: Coord) -> int:
+        habitaciones = self.mapa.habitaciones
+        if isinstance(habitaciones, HabitacionesCompactas):
+            idx = habitaciones.indice(coord)
+            return habitaciones.conexiones[idx] if habitaciones.existe[idx] else 0
+        hab = habitaciones.get(coord)
+        if hab is None:
+            return 0
+        mascara = 0
+        for d in hab.conexiones:
+            mascara |= DIR_BITS.get(d, 0)
+        return mascara
+
+    def reconstruir(self):
+        """Máscaras y etiquetas desde cero: un BFS por componente (O(habitaciones))."""
+        self.reconstrucciones += 1
+        ancho = self.ancho
+        self._mascara = bytearray(ancho * self.alto)
+        self._etiqueta = etiqueta = array("i", [-1]) * (ancho * self.alto)
+        coords = list(self.mapa.habitaciones)
+        for coord in coords:
+            idx = coord[1] * ancho + coord[0]
+            self._mascara[idx] = self._mascara_actual(coord)
+            etiqueta[idx] = -2  # existe, sin etiquetar
+        self._tamanos = {}
+        self._siguiente = 0
+        for coord in coords:
+            idx = coord[1] * ancho + coord[0]
+            if etiqueta[idx] == -2:
+                self._etiquetar(idx, -2, self._nueva_etiqueta())
+        self._puentes = None
+
+    def _nueva_etiqueta(self) -> int:
+        self._siguiente += 1
+        return self._siguiente
+
+    def _etiquetar(self, inicio: int, vieja: int, nueva: int) -> int:
+        """Pone 'nueva' a todo lo alcanzable desde inicio que tenga la etiqueta 'vieja'."""
+        etiqueta, mascaras, dirs = self._etiqueta, self._mascara, self._dirs
+        etiqueta[inicio] = nueva
+        pila = [inicio]
+        n = 0
+        while pila:
+            cur = pila.pop()
+            n += 1
+            m = mascaras[cur]
+            for bit, desp, _ in dirs:
+                if m & bit and etiqueta[cur + desp] == vieja:
+                    etiqueta[cur + desp] = nueva
+                    pila.append(cur + desp)
+        self._tamanos[nueva] = self._tamanos.get(nueva, 0) + n
+        if vieja in self._tamanos:
+            self._tamanos[vieja] -= n
+            if self._tamanos[vieja] <= 0:
+                del self._tamanos[vieja]
+        return n
+
+    def _asegurar(self) -> Dict[int, int]:
+        if self._tamanos is None:
+            self.reconstruir()
+        return self._tamanos
+
+    # --- avisos del Mapa ---
+    def invalidar(self):
+        self._tamanos = None
+        self._puentes = None
+
+    def habitacion_agregada(self, coord: Coord):
+        if self._tamanos is None:
+            return
+        idx = coord[1] * self.ancho + coord[0]
+        nueva = self._nueva_etiqueta()
+        self._etiqueta[idx] = nueva
+        self._tamanos[nueva] = 1
+        # pasillos anotados antes de que existiera (el generador conecta y luego inserta)
+        previa = self._mascara[idx]
+        for bit, desp, _ in self._dirs:
+            if previa & bit and self._etiqueta[idx + desp] >= 0:
+                self._unir(idx, idx + desp)
+        self.conexiones_cambiadas(coord)
+
+    def _unir(self, a: int, b: int):
+        """El pasillo a-b ya está en las máscaras: junta sus componentes si eran distintos."""
+        ea, eb = self._etiqueta[a], self._etiqueta[b]
+        if ea == eb:
+            self._puentes = None  # cierra un ciclo: puede dejar de haber puentes
+            return
+        if self._tamanos[ea] < self._tamanos[eb]:
+            a, b, ea, eb = b, a, eb, ea
+        # el pequeño (el de b) se reetiqueta; el pasillo nuevo es puente y los demás no cambian
+        self._etiquetar(b, eb, ea)
+        if self._puentes is not None:
+            self._puentes.add((a, b) if a < b else (b, a))
+
+    def conexiones_cambiadas(self, coord: Coord):
+        if self._tamanos is None:
+            return
+        idx = coord[1] * self.ancho + coord[0]
+        nueva = self._mascara_actual(coord)
+        vieja = self._mascara[idx]
+        if nueva == vieja:
+            return
+        for bit, desp, bit_opuesto in self._dirs:
+            if not (nueva ^ vieja) & bit:
+                continue
+            otro = idx + desp
+            existe_otro = self._etiqueta[otro] >= 0
+            if nueva & bit:
+                self._mascara[idx] |= bit
+                self._mascara[otro] |= bit_opuesto
+                if existe_otro:
+                    self._unir(idx, otro)
+            else:
+                self._mascara[idx] &= ~bit & 0xFF
+                self._mascara[otro] &= ~bit_opuesto & 0xFF
+                if existe_otro:
+                    self._cortar(idx, otro)
+
+    def _cortar(self, a: int, b: int):
+        """El pasillo a-b ya no está en las máscaras: parte el componente si era puente."""
+        arista = (a, b) if a < b else (b, a)
+        if self._puentes is not None:
+            if arista not in self._puentes:
+                self._puentes = None  # otros pasillos pueden haberse vuelto puentes
+                return
+            self._puentes.discard(arista)  # quitar un puente no cambia los demás
+        lado = self._lado_separado(a, b)
+        if lado is not None:
+            etiqueta = self._etiqueta
+            vieja = etiqueta[lado[0]]
+            nueva = self._nueva_etiqueta()
+            for i in lado:
+                etiqueta[i] = nueva
+            self._tamanos[nueva] = len(lado)
+            self._tamanos[vieja] -= len(lado)
+        elif self._puentes is not None:
+            self._puentes = None
+
+    def _lado_separado(self, a: int, b: int) -> Optional[List[int]]:
+        """
+        BFS alterno nodo a nodo desde a y b. None si se encuentran (hay otro camino);
+        si no, las celdas del lado que se agotó primero (el más pequeño).
+        """
+        mascaras, dirs = self._mascara, self._dirs
+        vistos = ({a: None}, {b: None})
+        colas = ([a], [b])
+        cabezas = [0, 0]
+        lado = 0
+        while True:
+            cola = colas[lado]
+            if cabezas[lado] >= len(cola):
+                return list(vistos[lado])
+            cur = cola[cabezas[lado]]
+            cabezas[lado] += 1
+            propio, ajeno = vistos[lado], vistos[1 - lado]
+            m = mascaras[cur]
+            for bit, desp, _ in dirs:
+                if m & bit:
+                    otro = cur + desp
+                    if otro in ajeno:
+                        return None
+                    if otro not in propio and self._etiqueta[otro] >= 0:
+                        propio[otro] = None
+                        cola.append(otro)
+            lado = 1 - lado
+
+    # --- consultas ---
+    @property
+    def componentes(self) -> int:
+        return len(self._asegurar())
+
+    def conexo(self) -> bool:
+        """True si todas las habitaciones están en un mismo componente."""
+        return len(self._asegurar()) <= 1
+
+    def mismo_componente(self, a: Coord, b: Coord) -> bool:
+        self._asegurar()
+        ea = self._etiqueta[a[1] * self.ancho + a[0]]
+        return ea >= 0 and ea == self._etiqueta[b[1] * self.ancho + b[0]]
+
+    def es_puente(self, a: Coord, b: Coord) -> bool:
+        ia, ib = a[1] * self.ancho + a[0], b[1] * self.ancho + b[0]
+        return ((ia, ib) if ia < ib else (ib, ia)) in self._calcular_puentes()
+
+    def puentes(self) -> List[Tuple[Coord, Coord]]:
+        """Pasillos cuya eliminación desconecta el mapa (aristas de corte)."""
+        ancho = self.ancho
+        return sorted(((a % ancho, a // ancho), (b % ancho, b // ancho)) for a, b in self._calcular_puentes())
+
+    def _calcular_puentes(self) -> Set[Tuple[int, int]]:
+        """Tarjan iterativo (orden de descubrimiento y 'low') sobre las máscaras."""
+        if self._puentes is not None:
+            return self._puentes
+        self._asegurar()
+        mascaras, etiqueta, dirs = self._mascara, self._etiqueta, self._dirs
+        orden = {}
+        low = {}
+        puentes: Set[Tuple[int, int]] = set()
+        contador = 0
+        for raiz in range(len(etiqueta)):
+            if etiqueta[raiz] < 0 or raiz in orden:
+                continue
+            orden[raiz] = low[raiz] = contador
+            contador += 1
+            # pila de (nodo, padre, iterador de vecinos)
+            pila = [(raiz, -1, iter(dirs))]
+            while pila:
+                nodo, padre, vecinos = pila[-1]
+                avanzado = False
+                for bit, desp, _ in vecinos:
+                    if not mascaras[nodo] & bit:
+                        continue
+                    otro = nodo + desp
+                    if etiqueta[otro] < 0 or otro == padre:
+                        continue
+                    if otro in orden:
+                        if orden[otro] < low[nodo]:
+                            low[nodo] = orden[otro]
+                    else:
+                        orden[otro] = low[otro] = contador
+                        contador += 1
+                        pila.append((otro, nodo, iter(dirs)))
+                        avanzado = True
+                        break
+                if avanzado:
+                    continue
+                pila.pop()
+                if padre >= 0:
+                    if low[nodo] < low[padre]:
+                        low[padre] = low[nodo]
+                    if low[nodo] > orden[padre]:
+                        puentes.add((padre, nodo) if padre < nodo else (nodo, padre))
+        self._puentes = puentes
+        return puentes
@@ -1,8 +1,18 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional
 import random
 from .objetos import Objeto
+from . import perfil
+from .registro import (RegistroCombate, EV_INICIO, EV_INICIO_JEFE, EV_GOLPE_JUGADOR, EV_GOLPE_ENEMIGO,
+                       EV_VICTORIA, EV_VICTORIA_JEFE, EV_DERROTA, EV_DERROTA_JEFE)
+
+
+def _rng_para(explorador, rng: Optional[random.Random]) -> random.Random:
+    """rng explícito, o el del explorador (rng_combate de su mapa), o el módulo global como último recurso."""
+    if rng is not None:
+        return rng
+    return getattr(explorador, "rng", None) or random
 
 
 class ContenidoHabitacion(ABC):
@@ -10,6 +20,8 @@ class ContenidoHabitacion(ABC):
     Interfaz/abstracta para el contenido de una habitación.
     Las subclases deben implementar to_dict() y from_dict() estático.
     """
+    __slots__ = ()
+
     @property
     @abstractmethod
     def descripcion(self) -> str:
@@ -21,7 +33,7 @@ class ContenidoHabitacion(ABC):
         ...
 
     @abstractmethod
-    def interactuar(self, explorador) -> str:
+    def interactuar(self, explorador, rng: Optional[random.Random] = None) -> str:
         ...
 
     @abstractmethod
@@ -34,6 +46,8 @@ class ContenidoHabitacion(ABC):
         ...
 
 class Tesoro(ContenidoHabitacion):
+    __slots__ = ("recompensa",)
+
     def __init__(self, recompensa: Objeto):
         self.recompensa = recompensa
 
@@ -45,7 +59,7 @@ class Tesoro(ContenidoHabitacion):
     def tipo(self) -> str:
         return "tesoro"
 
-    def interactuar(self, explorador) -> str:
+    def interactuar(self, explorador, rng: Optional[random.Random] = None) -> str:
         explorador.inventario.append(self.recompensa)
         cat = getattr(self.recompensa, "categoria", "normal")
         if cat == "equipable":
@@ -65,6 +79,8 @@ class Tesoro(ContenidoHabitacion):
 
 
 class Monstruo(ContenidoHabitacion):
+    __slots__ = ("nombre", "vida", "ataque")
+
     def __init__(self, nombre: str, vida: int, ataque: int):
         self.nombre = nombre
         self.vida = int(vida)
@@ -78,39 +94,55 @@ class Monstruo(ContenidoHabitacion):
     def tipo(self) -> str:
         return "monstruo"
 
-    def interactuar(self, explorador) -> str:
-        log = []
+    def interactuar(self, explorador, rng: Optional[random.Random] = None, narrar: bool = True) -> RegistroCombate:
+        """
+        Combate turno a turno. Devuelve un RegistroCombate (tuplas por golpe, el texto se compone
+        al mostrarlo); con narrar=False no se anota nada.
+        """
+        rng = _rng_para(explorador, rng)
+        registro = RegistroCombate()
+        log = registro.eventos
         vida_enemigo = self.vida
         vida_jugador = explorador.vida
 
-        turno = random.choice([0, 1])
-        log.append(f"Comienza el combate contra {self.nombre} (PV enemigo: {vida_enemigo}).")
+        turno = rng.choice([0, 1])
+        if narrar:
+            log.append((EV_INICIO, self.nombre, vida_enemigo))
+        turnos = 0
         while vida_enemigo > 0 and vida_jugador > 0:
+            turnos += 1
             if turno == 0:
                 attack_val = explorador.calcular_ataque()
                 min_dmg = max(1, attack_val - 1)
                 max_dmg = attack_val + 1
-                danio = random.randint(min_dmg, max_dmg)
+                danio = rng.randint(min_dmg, max_dmg)
                 vida_enemigo -= danio
-                log.append(f"Atacas y haces {danio} de daño (enemigo {max(0, vida_enemigo)} PV).")
+                if narrar:
+                    log.append((EV_GOLPE_JUGADOR, danio, vida_enemigo))
                 turno = 1
             else:
-                danio = random.randint(1, self.ataque)
+                danio = rng.randint(1, self.ataque)
                 vida_jugador -= danio
                 explorador.recibir_dano(danio)
-                log.append(f"{self.nombre} te golpea por {danio} (tus PV {max(0, vida_jugador)}).")
+                if narrar:
+                    log.append((EV_GOLPE_ENEMIGO, self.nombre, danio, vida_jugador))
                 turno = 0
 
         self.vida = max(0, vida_enemigo)
+        if perfil.ACTIVO:
+            perfil.contar("combate/combates")
+            perfil.contar("combate/turnos", turnos)
 
         if self.vida <= 0 and explorador.vida > 0:
-            log.append(f"Has derrotado a {self.nombre}.")
-            return "\n".join(log)
+            if narrar:
+                log.append((EV_VICTORIA, self.nombre))
+            return registro
         elif explorador.vida <= 0:
-            log.append("Has sido derrotado.")
-            return "\n".join(log)
+            if narrar:
+                log.append((EV_DERROTA,))
+            return registro
         else:
-            return "\n".join(log)
+            return registro
 
 
     def to_dict(self) -> Dict[str, Any]:
@@ -122,6 +154,8 @@ class Monstruo(ContenidoHabitacion):
 
 
 class Jefe(Monstruo):
+    __slots__ = ("recompensa_especial",)
+
     def __init__(self, nombre: str, vida: int, ataque: int, recompensa_especial: Objeto):
         super().__init__(nombre, vida, ataque)
         self.recompensa_especial = recompensa_especial
@@ -130,37 +164,49 @@ class Jefe(Monstruo):
     def tipo(self) -> str:
         return "jefe"
 
-    def interactuar(self, explorador) -> str:
-        log = []
+    def interactuar(self, explorador, rng: Optional[random.Random] = None, narrar: bool = True) -> RegistroCombate:
+        rng = _rng_para(explorador, rng)
+        registro = RegistroCombate()
+        log = registro.eventos
         vida_jugador = explorador.vida
         vida_enemigo = self.vida
 
-        turno = 0 if random.random() < 0.35 else 1
-        log.append(f"Enfrentas al jefe {self.nombre} (PV: {vida_enemigo}).")
+        turno = 0 if rng.random() < 0.35 else 1
+        if narrar:
+            log.append((EV_INICIO_JEFE, self.nombre, vida_enemigo))
+        turnos = 0
         while vida_enemigo > 0 and vida_jugador > 0:
+            turnos += 1
             if turno == 0:
-                danio = random.randint(1, 2 + int(self.ataque/2))
+                danio = rng.randint(1, 2 + int(self.ataque/2))
                 vida_enemigo -= danio
-                log.append(f"Atacas y haces {danio} de daño (enemigo {max(0, vida_enemigo)} PV).")
+                if narrar:
+                    log.append((EV_GOLPE_JUGADOR, danio, vida_enemigo))
                 turno = 1
             else:
-                danio = random.randint(1, self.ataque)
+                danio = rng.randint(1, self.ataque)
                 vida_jugador -= danio
                 explorador.recibir_dano(danio)
-                log.append(f"{self.nombre} te golpea por {danio} (tus PV {max(0, vida_jugador)}).")
+                if narrar:
+                    log.append((EV_GOLPE_ENEMIGO, self.nombre, danio, vida_jugador))
                 turno = 0
 
         self.vida = max(0, vida_enemigo)
+        if perfil.ACTIVO:
+            perfil.contar("combate/combates")
+            perfil.contar("combate/turnos", turnos)
 
         if self.vida <= 0 and explorador.vida > 0:
             explorador.inventario.append(self.recompensa_especial)
-            log.append(f"Has derrotado al jefe {self.nombre} y obtienes {self.recompensa_especial.nombre}!")
-            return "\n".join(log)
+            if narrar:
+                log.append((EV_VICTORIA_JEFE, self.nombre, self.recompensa_especial))
+            return registro
         elif explorador.vida <= 0:
-            log.append("Has sido derrotado por el jefe.")
-            return "\n".join(log)
+            if narrar:
+                log.append((EV_DERROTA_JEFE,))
+            return registro
         else:
-            return "\n".join(log)
+            return registro
 
 
     def to_dict(self) -> Dict[str, Any]:
@@ -175,6 +221,8 @@ class Jefe(Monstruo):
         return Jefe(d["nombre"], int(d["vida"]), int(d["ataque"]), recompensa)
 
 class Evento(ContenidoHabitacion):
+    __slots__ = ("nombre", "_descripcion", "efecto")
+
     def __init__(self, nombre: str, descripcion: str, efecto: Dict[str, Any]):
         self.nombre = nombre
         self._descripcion = descripcion
@@ -188,7 +236,7 @@ class Evento(ContenidoHabitacion):
     def tipo(self) -> str:
         return "evento"
 
-    def interactuar(self, explorador) -> str:
+    def interactuar(self, explorador, rng: Optional[random.Random] = None) -> str:
         """
         Aplica el efecto del evento sobre el explorador.
         Efectos soportados (self.efecto es un dict):
@@ -198,6 +246,7 @@ class Evento(ContenidoHabitacion):
         - tipo: "buff_por_habitaciones", "ataque": int, "habitaciones": int
         - tipo: "modificar_ataque", "delta": int, "modo": "permanente"|"temporal_habitaciones", "habitaciones": int (si temporal)
         """
+        rng = _rng_para(explorador, rng)
         tipo = self.efecto.get("tipo")
         if tipo == "curar":
             amount = int(self.efecto.get("valor", 5))
@@ -215,7 +264,7 @@ class Evento(ContenidoHabitacion):
             choices = [c for c in coords if c != current]
             if not choices:
                 return "Portal: no hay otra habitación a la que teletransportarte."
-            dest = random.choice(choices)
+            dest = rng.choice(choices)
             explorador.posicion_actual = tuple(dest)
             explorador.mapa.habitaciones[dest].visitada = True
             msg = f"Has caido en un portal que te a llevado a {dest}."
@@ -228,7 +277,7 @@ class Evento(ContenidoHabitacion):
                     try:
                         extra = explorador.explorar_habitacion()
                         if extra:
-                            msg += "\n" + extra
+                            msg += "\n" + str(extra)
                     finally:
                         explorador._event_chain_depth = depth
             return msg
@@ -290,7 +339,18 @@ def contenido_from_dict(d: Dict[str, Any]) -> ContenidoHabitacion:
         return Evento.from_dict(d)
     else:
         raise ValueError(f"Tipo de contenido desconocido en from_dict: {tipo}")
-    
+
+
+# Código numérico por tipo de contenido (0 = vacía); lo usan el backend compacto y las estadísticas.
+TIPOS_CONTENIDO = (None, "tesoro", "monstruo", "jefe", "evento", "otro")
+CODIGO_TIPO: Dict[Optional[str], int] = {t: i for i, t in enumerate(TIPOS_CONTENIDO)}
+
+
+def codigo_de_contenido(contenido: Optional[ContenidoHabitacion]) -> int:
+    if contenido is None:
+        return 0
+    return CODIGO_TIPO.get(getattr(contenido, "tipo", None), CODIGO_TIPO["otro"])
+
 def interactuar(self, explorador) -> str:
     explorador.inventario.append(self.recompensa)
     cat = getattr(self.recompensa, "categoria", "normal")
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+from .mapa import Mapa
+from .explorador import Explorador
+from .contenido import contenido_from_dict
+from .serializacion import guardar_partida, cargar_partida, _explorador_a_dict, _explorador_desde_dict
+
+
+class DiarioPartida:
+    """
+    Guardado incremental: una instantánea completa (guardar_partida) más un diario
+    JSON Lines '<ruta>.diario' al que solo se añaden las habitaciones cambiadas y el
+    estado del explorador. Cada entrada guarda el estado absoluto de esas habitaciones,
+    así que reaplicar una entrada es idempotente.
+    Cada 'compactar_cada' entradas se escribe una instantánea nueva y se vacía el diario.
+    """
+
+    def __init__(self, ruta: str, compactar_cada: int = 500):
+        self.ruta = Path(ruta)
+        self.ruta_diario = Path(str(ruta) + ".diario")
+        self.compactar_cada = max(1, int(compactar_cada))
+        self.entradas = 0
+        self._f = None
+
+    def checkpoint(self, mapa: Mapa, explorador: Explorador) -> None:
+        """Escribe una instantánea completa (de forma atómica) y vacía el diario."""
+        self.cerrar()
+        tmp = self.ruta.with_name(self.ruta.name + ".tmp" + self.ruta.suffix)
+        guardar_partida(mapa, explorador, str(tmp))
+        os.replace(tmp, self.ruta)
+        self._f = open(self.ruta_diario, "w", encoding="utf-8")
+        self.entradas = 0
+
+    def registrar(self, mapa: Mapa, explorador: Explorador, coords: Iterable[Tuple[int, int]]) -> None:
+        """Añade una entrada con el estado actual de 'coords' y del explorador."""
+        if self._f is None:
+            self.checkpoint(mapa, explorador)
+            return
+        habitaciones = [mapa.habitaciones[c].to_dict() for c in coords if c in mapa.habitaciones]
+        entrada = {"habitaciones": habitaciones, "explorador": _explorador_a_dict(explorador)}
+        self._f.write(json.dumps(entrada, separators=(",", ":")))
+        self._f.write("\n")
+        self._f.flush()
+        self.entradas += 1
+        if self.entradas >= self.compactar_cada:
+            self.checkpoint(mapa, explorador)
+
+    def cerrar(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    @staticmethod
+    def cargar(ruta: str, backend: str = "dict") -> Tuple[Mapa, Explorador]:
+        """Carga la instantánea de 'ruta' y reaplica su diario (si existe)."""
+        mapa, explorador = cargar_partida(ruta, backend=backend)
+        ruta_diario = Path(str(ruta) + ".diario")
+        if not ruta_diario.exists():
+            return mapa, explorador
+        ultimo_explorador: Optional[dict] = None
+        with open(ruta_diario, "r", encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    entrada = json.loads(linea)
+                except ValueError:
+                    break  # última línea a medio escribir
+                for h in entrada.get("habitaciones", []):
+                    _aplicar_habitacion(mapa, h)
+                ultimo_explorador = entrada.get("explorador", ultimo_explorador)
+        if ultimo_explorador is not None:
+            explorador = _explorador_desde_dict(mapa, ultimo_explorador)
+        return mapa, explorador
+
+
+def _aplicar_habitacion(mapa: Mapa, h: dict) -> None:
+    coord = tuple(h["pos"])
+    hab = mapa.habitaciones.get(coord)
+    if hab is None:
+        return
+    hab.visitada = h.get("visitada", False)
+    cont = h.get("contenido")
+    try:
+        hab.contenido = contenido_from_dict(cont) if cont is not None else None
+    except Exception:
+        hab.contenido = None
+    conexiones = {d: tuple(c) for d, c in h.get("conexiones", {}).items()}
+    for dir_ in list(hab.conexiones):
+        if dir_ not in conexiones:
+            hab.desconectar(dir_)
+    for dir_, coord_other in conexiones.items():
+        if dir_ not in hab.conexiones and coord_other in mapa.habitaciones:
+            hab.conectar(dir_, mapa.habitaciones[coord_other])
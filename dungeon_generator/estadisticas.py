@@ -0,0 +1,53 @@
+from __future__ import annotations
+from typing import Iterable, List
+from .contenido import TIPOS_CONTENIDO, codigo_de_contenido
+
+
+class ContadoresMapa:
+    """
+    Contadores de Mapa.obtener_estadisticas_mapa: habitaciones por código de contenido
+    (ver TIPOS_CONTENIDO) y suma de len(conexiones). El Mapa los actualiza en cada aviso
+    de sus habitaciones, así leer las estadísticas es O(1).
+    """
+
+    __slots__ = ("por_tipo", "conexiones")
+
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.por_tipo: List[int] = [0] * len(TIPOS_CONTENIDO)
+        self.conexiones = 0
+
+    def sumar(self, codigo: int, n_conexiones: int, signo: int = 1):
+        self.por_tipo[codigo] += signo
+        self.conexiones += signo * n_conexiones
+
+    def resumen(self, total: int) -> dict:
+        por_tipo = self.por_tipo
+        promedio = (self.conexiones / total) if total > 0 else 0.0
+        return {
+            "Total de habitaciones": total,
+            "vacios": por_tipo[0] + por_tipo[5],
+            "tesoros": por_tipo[1],
+            "monstruos": por_tipo[2],
+            "jefes": por_tipo[3],
+            "eventos": por_tipo[4],
+            "promedio_conexiones": round(promedio, 2),
+        }
+
+    def __eq__(self, otro) -> bool:
+        if not isinstance(otro, ContadoresMapa):
+            return NotImplemented
+        return self.por_tipo == otro.por_tipo and self.conexiones == otro.conexiones
+
+    def __repr__(self):
+        return f"ContadoresMapa(por_tipo={self.por_tipo}, conexiones={self.conexiones})"
+
+
+def contar_por_recorrido(habitaciones: Iterable) -> ContadoresMapa:
+    """Los mismos contadores calculados recorriendo todas las habitaciones (O(n))."""
+    contadores = ContadoresMapa()
+    for hab in habitaciones:
+        contadores.sumar(codigo_de_contenido(hab.contenido), len(hab.conexiones))
+    return contadores
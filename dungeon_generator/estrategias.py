@@ -0,0 +1,277 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+from .adyacencia import vecinos_rejilla
+from .conectividad import UnionFind
+from .habitacion import Habitacion, DIRECCIONES
+from .rejilla import DIR_BITS, HabitacionesCompactas
+
+# Estrategias alternativas de Mapa.generar_estructura (registradas en Mapa.ESTRATEGIAS).
+# Cada una traza un plano de pasillos entre celdas (índices y*ancho+x) y _construir() lo
+# convierte en habitaciones: toma n celdas en orden BFS desde una celda del borde (el spawn)
+# y, si el plano se queda corto, crece desde las habitaciones que aún tienen vecinos libres.
+
+# plano: celda -> [(código de dirección en DIRECCIONES, celda vecina), ...]
+Plano = Dict[int, List[Tuple[int, int]]]
+
+_NORTE, _SUR, _ESTE, _OESTE = range(4)
+_OPUESTO = (_SUR, _NORTE, _OESTE, _ESTE)
+_BITS = tuple(DIR_BITS[d] for d in DIRECCIONES)
+
+
+def _pasillo(plano: Plano, a: int, codigo: int, b: int):
+    plano.setdefault(a, []).append((codigo, b))
+    plano.setdefault(b, []).append((_OPUESTO[codigo], a))
+
+
+def _en_borde(celda: int, ancho: int, alto: int) -> bool:
+    x, y = celda % ancho, celda // ancho
+    return x == 0 or y == 0 or x == ancho - 1 or y == alto - 1
+
+
+def _inicio_en_borde(mapa, plano: Plano, rng) -> int:
+    """Celda del plano en el borde; si no hay, un pasillo recto desde la celda más cercana al borde."""
+    ancho, alto = mapa.ancho, mapa.alto
+    if not plano:
+        x, y = rng.choice(mapa._coords_en_borde())
+        celda = y * ancho + x
+        plano[celda] = []
+        return celda
+    en_borde = [c for c in plano if _en_borde(c, ancho, alto)]
+    if en_borde:
+        return rng.choice(en_borde)
+
+    def hueco(c):
+        x, y = c % ancho, c // ancho
+        return min((y, _NORTE), (alto - 1 - y, _SUR), (ancho - 1 - x, _ESTE), (x, _OESTE))
+
+    celda = min(plano, key=hueco)
+    pasos, codigo = hueco(celda)
+    tabla = vecinos_rejilla(ancho, alto)[codigo]
+    for _ in range(pasos):
+        siguiente = tabla[celda]
+        _pasillo(plano, celda, codigo, siguiente)
+        celda = siguiente
+    return celda
+
+
+def _construir(mapa, n_habitaciones: int, plano: Plano, inicio: Optional[int] = None):
+    """Crea en el mapa n_habitaciones conectadas a partir del plano (ver comentario del módulo)."""
+    rng = mapa.rng_estructura
+    ancho, alto = mapa.ancho, mapa.alto
+    tablas = vecinos_rejilla(ancho, alto)
+    if inicio is None:
+        inicio = _inicio_en_borde(mapa, plano, rng)
+
+    # n primeras celdas del plano en orden BFS; se guarda el pasillo por el que se llegó
+    elegidas = bytearray(ancho * alto)
+    elegidas[inicio] = 1
+    orden = [inicio]
+    pasillos: List[Tuple[int, int, int]] = []
+    faltan = n_habitaciones - 1
+    for a in orden:
+        if not faltan:
+            break
+        for codigo, b in plano.get(a, ()):
+            if not elegidas[b]:
+                elegidas[b] = 1
+                orden.append(b)
+                pasillos.append((a, codigo, b))
+                faltan -= 1
+                if not faltan:
+                    break
+    # el resto de pasillos del plano entre celdas elegidas (ciclos); cada uno una vez
+    for a in orden:
+        for codigo, b in plano.get(a, ()):
+            if a < b and elegidas[b]:
+                pasillos.append((a, codigo, b))
+
+    # plano insuficiente: crecer desde una elegida al azar que tenga vecinos libres
+    crecer = list(orden) if faltan else []
+    while faltan:
+        i = rng.randrange(len(crecer))
+        a = crecer[i]
+        for codigo, tabla in enumerate(tablas):
+            b = tabla[a]
+            if b >= 0 and not elegidas[b]:
+                elegidas[b] = 1
+                orden.append(b)
+                crecer.append(b)
+                pasillos.append((a, codigo, b))
+                faltan -= 1
+                break
+        else:
+            crecer[i] = crecer[-1]
+            crecer.pop()
+
+    # volcado de golpe: los avisos al mapa son por habitación, no por pasillo
+    mapa._next_id = len(orden)
+    habitaciones = mapa.habitaciones
+    if isinstance(habitaciones, HabitacionesCompactas):
+        mascaras = bytearray(ancho * alto)
+        for a, codigo, b in pasillos:
+            mascaras[a] |= _BITS[codigo]
+            mascaras[b] |= _BITS[_OPUESTO[codigo]]
+        habitaciones.poblar(orden, mascaras)
+        mapa.habitacion_inicial = habitaciones.vista(inicio)
+        return
+    # backend dict: se conectan antes de entrar en el mapa, cuando aún no avisan a nadie
+    habitaciones.clear()
+    habs = {celda: Habitacion(i, (celda % ancho, celda // ancho), inicial=(i == 0))
+            for i, celda in enumerate(orden)}
+    opuestas = [DIRECCIONES[k] for k in _OPUESTO]
+    for a, codigo, b in pasillos:
+        habs[a].conexiones[DIRECCIONES[codigo]] = habs[b]
+        habs[b].conexiones[opuestas[codigo]] = habs[a]
+    for hab in habs.values():
+        habitaciones[hab.pos] = hab
+    mapa.habitacion_inicial = habs[inicio]
+
+
+def generar_kruskal(mapa, n_habitaciones: int):
+    """
+    Laberinto: árbol de expansión aleatorio (Kruskal con union-find) sobre una región de
+    n celdas alrededor del spawn. Sin ciclos: un único camino entre cada par de habitaciones.
+    """
+    rng = mapa.rng_estructura
+    ancho, alto = mapa.ancho, mapa.alto
+    tablas = vecinos_rejilla(ancho, alto)
+    x, y = rng.choice(mapa._coords_en_borde())
+    inicio = y * ancho + x
+    # región: las n celdas más cercanas al spawn en la rejilla
+    region = bytearray(ancho * alto)
+    region[inicio] = 1
+    orden = [inicio]
+    faltan = n_habitaciones - 1
+    for a in orden:
+        if not faltan:
+            break
+        for tabla in tablas:
+            b = tabla[a]
+            if b >= 0 and not region[b]:
+                region[b] = 1
+                orden.append(b)
+                faltan -= 1
+                if not faltan:
+                    break
+    # cada pasillo posible de la región una vez (hacia el sur y hacia el este), en orden aleatorio
+    sur, este = tablas[_SUR], tablas[_ESTE]
+    candidatos = [(a, _SUR, sur[a]) for a in orden if sur[a] >= 0 and region[sur[a]]]
+    candidatos += [(a, _ESTE, este[a]) for a in orden if este[a] >= 0 and region[este[a]]]
+    rng.shuffle(candidatos)
+    componentes = UnionFind(ancho * alto)
+    plano: Plano = {}
+    faltan = len(orden) - 1
+    for a, codigo, b in candidatos:
+        if not faltan:
+            break
+        if componentes.unir(a, b):
+            _pasillo(plano, a, codigo, b)
+            faltan -= 1
+    _construir(mapa, n_habitaciones, plano, inicio)
+
+
+def generar_bsp(mapa, n_habitaciones: int, min_hoja: int = 6):
+    """
+    Salas y pasillos: partición binaria del espacio (BSP) en hojas de al menos min_hoja de
+    lado, una sala rectangular por hoja (todas sus celdas conectadas entre sí) y un pasillo
+    en L entre cada par de subárboles hermanos.
+    """
+    rng = mapa.rng_estructura
+    ancho, alto = mapa.ancho, mapa.alto
+    plano: Plano = {}
+
+    def sala(x0, y0, w, h) -> int:
+        sw = rng.randint(max(1, w // 2), max(1, w - 1)) if w > 2 else w
+        sh = rng.randint(max(1, h // 2), max(1, h - 1)) if h > 2 else h
+        sx = x0 + rng.randint(0, w - sw)
+        sy = y0 + rng.randint(0, h - sh)
+        for y in range(sy, sy + sh):
+            for x in range(sx, sx + sw):
+                celda = y * ancho + x
+                plano.setdefault(celda, [])
+                if x + 1 < sx + sw:
+                    _pasillo(plano, celda, _ESTE, celda + 1)
+                if y + 1 < sy + sh:
+                    _pasillo(plano, celda, _SUR, celda + ancho)
+        return (sy + rng.randrange(sh)) * ancho + sx + rng.randrange(sw)
+
+    def pasillo_en_l(a: int, b: int):
+        ax, ay, bx, by = a % ancho, a // ancho, b % ancho, b // ancho
+        paso, codigo = (1, _ESTE) if bx > ax else (-1, _OESTE)
+        for x in range(ax, bx, paso):
+            _pasillo(plano, ay * ancho + x, codigo, ay * ancho + x + paso)
+        paso, codigo = (ancho, _SUR) if by > ay else (-ancho, _NORTE)
+        for celda in range(ay * ancho + bx, by * ancho + bx, paso):
+            _pasillo(plano, celda, codigo, celda + paso)
+
+    def partir(x0, y0, w, h) -> int:
+        """Devuelve una celda de alguna sala del subárbol, para unirla con su hermano."""
+        if w >= 2 * min_hoja and (w >= h or h < 2 * min_hoja):
+            corte = rng.randint(min_hoja, w - min_hoja)
+            a, b = partir(x0, y0, corte, h), partir(x0 + corte, y0, w - corte, h)
+        elif h >= 2 * min_hoja:
+            corte = rng.randint(min_hoja, h - min_hoja)
+            a, b = partir(x0, y0, w, corte), partir(x0, y0 + corte, w, h - corte)
+        else:
+            return sala(x0, y0, w, h)
+        pasillo_en_l(a, b)
+        return rng.choice((a, b))
+
+    partir(0, 0, ancho, alto)
+    _construir(mapa, n_habitaciones, plano)
+
+
+def _suavizar(suelo: bytearray, ancho: int, alto: int) -> bytearray:
+    """Un paso del autómata: suelo si hay al menos 5 celdas de suelo en su 3x3 (fuera = pared)."""
+    horizontales = []
+    for y in range(alto):
+        fila = b"\0" + bytes(suelo[y * ancho:(y + 1) * ancho]) + b"\0"
+        horizontales.append([a + b + c for a, b, c in zip(fila, fila[1:], fila[2:])])
+    ceros = [0] * ancho
+    nuevo = bytearray()
+    for y in range(alto):
+        arriba = horizontales[y - 1] if y > 0 else ceros
+        abajo = horizontales[y + 1] if y + 1 < alto else ceros
+        nuevo.extend(1 if a + b + c >= 5 else 0 for a, b, c in zip(arriba, horizontales[y], abajo))
+    return nuevo
+
+
+def generar_cuevas(mapa, n_habitaciones: int, pasos: int = 4):
+    """
+    Cuevas con un autómata celular: suelo aleatorio (más denso cuanto más lleno debe quedar
+    el mapa), 'pasos' suavizados y pasillos entre todas las celdas de suelo vecinas. Se parte
+    de la cueva más grande.
+    """
+    rng = mapa.rng_estructura
+    ancho, alto = mapa.ancho, mapa.alto
+    n = ancho * alto
+    p_suelo = min(0.9, max(0.55, n_habitaciones / n + 0.15))
+    aleatorio = rng.random
+    suelo = bytearray(1 if aleatorio() < p_suelo else 0 for _ in range(n))
+    for _ in range(pasos):
+        suelo = _suavizar(suelo, ancho, alto)
+
+    tablas = vecinos_rejilla(ancho, alto)
+    sur, este = tablas[_SUR], tablas[_ESTE]
+    componentes = UnionFind(n)
+    plano: Plano = {}
+    for celda in range(n):
+        if not suelo[celda]:
+            continue
+        plano.setdefault(celda, [])
+        b = este[celda]
+        if b >= 0 and suelo[b]:
+            _pasillo(plano, celda, _ESTE, b)
+            componentes.unir(celda, b)
+        b = sur[celda]
+        if b >= 0 and suelo[b]:
+            _pasillo(plano, celda, _SUR, b)
+            componentes.unir(celda, b)
+    if plano:
+        tamanos: Dict[int, int] = {}
+        for celda in plano:
+            raiz = componentes.buscar(celda)
+            tamanos[raiz] = tamanos.get(raiz, 0) + 1
+        mayor = max(tamanos, key=tamanos.get)
+        plano = {c: v for c, v in plano.items() if componentes.buscar(c) == mayor}
+    _construir(mapa, n_habitaciones, plano)
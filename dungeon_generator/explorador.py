@@ -1,14 +1,18 @@
 from __future__ import annotations
-from typing import Tuple, List, Optional, Dict
-from collections import deque
+from typing import Tuple, List, Optional, Dict, Union
 from .mapa import Mapa
 from .habitacion import Habitacion
 from .contenido import Tesoro, Monstruo, Jefe, Evento
+from .registro import RegistroCombate
 import random
 
 class Explorador:
-    def __init__(self, mapa: Mapa, posicion: Optional[Tuple[int,int]] = None, vida: int = 5, ataque_base: int = 1):
+    def __init__(self, mapa: Mapa, posicion: Optional[Tuple[int,int]] = None, vida: int = 5, ataque_base: int = 1,
+                 rng: Optional[random.Random] = None):
         self.mapa = mapa
+        self._sucio = True  # estado cambiado desde el último extraer_sucio()
+        # generador de combates/eventos; por defecto el substream de combate del mapa
+        self.rng = rng if rng is not None else getattr(mapa, "rng_combate", None) or random.Random()
         if posicion is None:
             inicio = mapa.habitacion_inicial
             if inicio is None:
@@ -22,6 +26,30 @@ class Explorador:
         self.equipado: Dict[str, Optional[object]] = {}  
         self.buffs: List[dict] = []  
 
+    @property
+    def vida(self) -> int:
+        return self._vida
+
+    @vida.setter
+    def vida(self, valor: int):
+        self._vida = valor
+        self._sucio = True
+
+    @property
+    def posicion_actual(self) -> Tuple[int, int]:
+        return self._posicion_actual
+
+    @posicion_actual.setter
+    def posicion_actual(self, valor: Tuple[int, int]):
+        self._posicion_actual = valor
+        self._sucio = True
+
+    def extraer_sucio(self) -> bool:
+        """True si el estado del explorador cambió desde la última llamada (y limpia la marca)."""
+        sucio = self._sucio
+        self._sucio = False
+        return sucio
+
     @property
     def esta_vivo(self) -> bool:
         return self.vida > 0
@@ -45,6 +73,7 @@ class Explorador:
             return "Ese objeto no es equipable."
         eff = getattr(objeto, "efecto", {}) or {}
         slot = eff.get("slot", "ring")
+        self._sucio = True
         prev = self.equipado.get(slot)
         self.equipado[slot] = objeto
         if objeto in self.inventario:
@@ -61,6 +90,7 @@ class Explorador:
             return "Ese objeto no es consumible."
         eff = getattr(objeto, "efecto", {}) or {}
         modo = eff.get("modo", "permanente")
+        self._sucio = True
         if "ataque" in eff:
             val = int(eff.get("ataque", 0))
             if modo == "permanente":
@@ -101,9 +131,10 @@ class Explorador:
             if b["restante_habitaciones"] > 0:
                 nuevos.append(b)
         self.buffs = nuevos
+        self._sucio = True
         return True
 
-    def explorar_habitacion(self) -> str:
+    def explorar_habitacion(self) -> Union[str, RegistroCombate]:
         hab = self.mapa.habitaciones.get(tuple(self.posicion_actual))
         if not hab:
             return "No hay habitación en tu posición."
@@ -113,7 +144,10 @@ class Explorador:
             hab.visitada = True
             return "La habitación está vacía."
         contenido = hab.contenido
-        resultado = contenido.interactuar(self)
+        resultado = contenido.interactuar(self, self.rng)
+        # el contenido cambia en el sitio (vida del monstruo, inventario, stats)
+        self._sucio = True
+        self.mapa._marcar_sucia(hab.pos)
         if isinstance(contenido, Tesoro):
             hab.contenido = None
         elif isinstance(contenido, Evento):
@@ -125,33 +159,12 @@ class Explorador:
         hab.visitada = True
         return resultado
 
-    def encontrar_camino(self, destino: Tuple[int,int]) -> list:
-        start = tuple(self.posicion_actual)
-        if start == destino:
-            return []
-        q = deque([start])
-        prev = {start: None}
-        while q:
-            cur = q.popleft()
-            hab = self.mapa.habitaciones[cur]
-            for dir_name, otra in hab.conexiones.items():
-                coord = tuple(otra.pos)
-                if coord not in prev:
-                    prev[coord] = (cur, dir_name)
-                    if coord == destino:
-                        path = []
-                        node = coord
-                        while prev[node] is not None:
-                            pcoord, pdirection = prev[node]
-                            path.append((pdirection, node))
-                            node = pcoord
-                        path.reverse()
-                        return path
-                    q.append(coord)
-        return []
-
-    def mover_hasta(self, destino: Tuple[int,int]) -> bool:
-        path = self.encontrar_camino(destino)
+    def encontrar_camino(self, destino: Tuple[int,int], estrategia: str = "bfs") -> list:
+        """Camino más corto desde la posición actual; lo resuelve la caché de caminos del mapa."""
+        return self.mapa.encontrar_camino(tuple(self.posicion_actual), tuple(destino), estrategia)
+
+    def mover_hasta(self, destino: Tuple[int,int], estrategia: str = "bfs") -> bool:
+        path = self.encontrar_camino(destino, estrategia)
         if not path:
             return False
         for direccion, coord in path:
@@ -1,16 +1,51 @@
 from __future__ import annotations
+import sys
 from typing import Dict, Optional, Tuple
-from .contenido import ContenidoHabitacion  
+from .contenido import ContenidoHabitacion, codigo_de_contenido
+
+# Tablas de direcciones compartidas por todo el paquete. Las claves de 'conexiones'
+# siempre son estas mismas cadenas internadas, aunque la dirección venga de JSON o input.
+DIRECCIONES: Tuple[str, ...] = tuple(sys.intern(d) for d in ("norte", "sur", "este", "oeste"))
+NORTE, SUR, ESTE, OESTE = DIRECCIONES
+DIR_CANONICA: Dict[str, str] = {d: d for d in DIRECCIONES}
+DIR_OPUESTA: Dict[str, str] = {NORTE: SUR, SUR: NORTE, ESTE: OESTE, OESTE: ESTE}
+DIR_DELTAS: Dict[str, Tuple[int, int]] = {NORTE: (0, -1), SUR: (0, 1), ESTE: (1, 0), OESTE: (-1, 0)}
 
 
 class Habitacion:
+    __slots__ = ("id", "pos", "inicial", "_contenido", "conexiones", "_visitada", "_mapa")
+
     def __init__(self, id: int, pos: Tuple[int, int], inicial: bool = False):
+        self._mapa = None  # lo asigna el Mapa al guardar la habitación; recibe avisos de cambios
         self.id: int = id
         self.pos: Tuple[int, int] = (int(pos[0]), int(pos[1]))
         self.inicial: bool = inicial
-        self.contenido: Optional[ContenidoHabitacion] = None
+        self._contenido: Optional[ContenidoHabitacion] = None
         self.conexiones: Dict[str, "Habitacion"] = {}
-        self.visitada: bool = False
+        self._visitada: bool = False
+
+    @property
+    def contenido(self) -> Optional[ContenidoHabitacion]:
+        return self._contenido
+
+    @contenido.setter
+    def contenido(self, valor: Optional[ContenidoHabitacion]):
+        antes = self._contenido
+        if valor is not antes:
+            self._contenido = valor
+            mapa = self._mapa
+            if mapa is not None:
+                mapa._contenido_cambiado(self.pos, codigo_de_contenido(antes), codigo_de_contenido(valor))
+
+    @property
+    def visitada(self) -> bool:
+        return self._visitada
+
+    @visitada.setter
+    def visitada(self, valor: bool):
+        if valor != self._visitada:
+            self._visitada = valor
+            self._avisar_cambio()
 
     @property
     def x(self) -> int:
@@ -21,28 +56,41 @@ class Habitacion:
         return self.pos[1]
 
     def conectar(self, direccion: str, otra: "Habitacion"):
-        opuestos = {"norte": "sur", "sur": "norte", "este": "oeste", "oeste": "este"}
-        if direccion not in opuestos:
+        canonica = DIR_CANONICA.get(direccion)
+        if canonica is None:
             raise ValueError(f"Dirección inválida: {direccion}")
-        self.conexiones[direccion] = otra
-        otra.conexiones[opuestos[direccion]] = self
+        antes, antes_otra = len(self.conexiones), len(otra.conexiones)
+        self.conexiones[canonica] = otra
+        otra.conexiones[DIR_OPUESTA[canonica]] = self
+        self._avisar_cambio_conexiones(len(self.conexiones) - antes)
+        otra._avisar_cambio_conexiones(len(otra.conexiones) - antes_otra)
 
     def desconectar(self, direccion: str):
-        opuestos = {"norte": "sur", "sur": "norte", "este": "oeste", "oeste": "este"}
         if direccion in self.conexiones:
-            otra = self.conexiones.pop(direccion)
-            opp = opuestos[direccion]
+            otra = self.conexiones[direccion]
+            antes, antes_otra = len(self.conexiones), len(otra.conexiones)
+            self.conexiones.pop(direccion)
+            opp = DIR_OPUESTA[direccion]
             if opp in otra.conexiones and otra.conexiones[opp] is self:
                 otra.conexiones.pop(opp)
+            self._avisar_cambio_conexiones(len(self.conexiones) - antes)
+            otra._avisar_cambio_conexiones(len(otra.conexiones) - antes_otra)
+
+    def _avisar_cambio_conexiones(self, delta: int = 0):
+        """Aviso al mapa de que cambiaron las conexiones; 'delta' = cambio en len(conexiones)."""
+        mapa = self._mapa
+        if mapa is not None:
+            mapa._conexiones_cambiadas(self.pos, delta)
+
+    def _avisar_cambio(self):
+        """Aviso al mapa de que cambió el estado (contenido, visitada) de esta habitación."""
+        mapa = self._mapa
+        if mapa is not None:
+            mapa._marcar_sucia(self.pos)
 
     def posiciones_vecinas(self) -> Dict[str, Tuple[int, int]]:
         x, y = self.pos
-        return {
-            "norte": (x, y - 1),
-            "sur": (x, y + 1),
-            "este": (x + 1, y),
-            "oeste": (x - 1, y),
-        }
+        return {d: (x + dx, y + dy) for d, (dx, dy) in DIR_DELTAS.items()}
 
     def to_dict(self) -> dict:
         conexiones_coords = {dir_: [hab.x, hab.y] for dir_, hab in self.conexiones.items()}
@@ -0,0 +1,59 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterable, Iterator, Optional, Tuple
+from .mapa import Mapa
+
+
+def generar_mapa_serializado(params: dict, seed: int) -> Tuple[int, dict]:
+    """
+    Genera un mapa completo (estructura + contenido) para una seed y lo devuelve como dict.
+    params: {"ancho": int, "alto": int, "n_habitaciones": int, "contenido": bool (opcional),
+             "estrategia": str (opcional, ver Mapa.ESTRATEGIAS)}
+    El resultado solo depende de (params, seed), nunca del proceso que lo ejecuta.
+    """
+    mapa = Mapa(params["ancho"], params["alto"], seed=seed)
+    mapa.generar_estructura(params["n_habitaciones"], params.get("estrategia", "crecimiento"))
+    if params.get("contenido", True):
+        mapa.colocar_contenido()
+    return seed, mapa.to_dict()
+
+
+def generar_lote(
+    params: dict,
+    seeds: Iterable[int],
+    workers: Optional[int] = None,
+    en_vuelo_por_worker: int = 4,
+) -> Iterator[Tuple[int, dict]]:
+    """
+    Genera un mapa por seed repartiendo el trabajo en un pool de procesos.
+    Devuelve un iterador de (seed, mapa_dict) en orden de finalización; para
+    reconstruir un Mapa usar Mapa.from_dict(mapa_dict).
+    - workers=None usa os.cpu_count(); workers<=1 genera en el proceso actual.
+    - Como mucho workers*en_vuelo_por_worker mapas están pendientes a la vez,
+      así que 'seeds' puede ser un generador infinito y la memoria queda acotada.
+    """
+    if workers is not None and workers <= 1:
+        for seed in seeds:
+            yield generar_mapa_serializado(params, seed)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        max_en_vuelo = workers * max(1, en_vuelo_por_worker)
+        pendientes = set()
+        it = iter(seeds)
+        agotado = False
+        while True:
+            while not agotado and len(pendientes) < max_en_vuelo:
+                try:
+                    seed = next(it)
+                except StopIteration:
+                    agotado = True
+                    break
+                pendientes.add(pool.submit(generar_mapa_serializado, params, seed))
+            if not pendientes:
+                break
+            hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for fut in hechos:
+                yield fut.result()
@@ -1,26 +1,169 @@
 from __future__ import annotations
 import random
-from typing import Dict, Tuple, List, Optional
-from .habitacion import Habitacion
-from collections import deque
+from array import array
+from typing import Callable, Dict, Tuple, List, Optional
+from .habitacion import Habitacion, DIRECCIONES, DIR_OPUESTA
 import math
-from .contenido import Tesoro, Monstruo, Jefe, Evento, contenido_from_dict
+from time import perf_counter_ns
+from . import perfil
+from .contenido import Tesoro, Monstruo, Jefe, Evento, contenido_from_dict, codigo_de_contenido, TIPOS_CONTENIDO
 from .objetos import Objeto
+from .rejilla import HabitacionesCompactas
+from .caminos import CacheCaminos
+from .cambios import SeguimientoCambios
+from .conectividad import Conectividad, UnionFind
+from .adyacencia import IndiceAdyacencia, vecinos_rejilla
+from . import estrategias
+from .estadisticas import ContadoresMapa, contar_por_recorrido
+from .texto import frame_de_texto
 
 def manhattan(a: Tuple[int, int], b: Tuple[int, int]) -> int:
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
+_DIST_INF = 1 << 30
+
+
+def derivar_rng(seed: Optional[int], fase: str, base: Optional[random.Random] = None) -> random.Random:
+    """
+    Devuelve un random.Random independiente para una fase ("estructura", "contenido", "combate").
+    Con seed, el substream depende solo de (seed, fase); sin seed se toma una semilla de 'base'.
+    """
+    if seed is not None:
+        return random.Random(f"{seed}:{fase}")
+    base = base if base is not None else random.Random()
+    return random.Random(base.getrandbits(64))
+
+
+class _FronteraPorDistancia:
+    """
+    Frontera de generación (índices de celda y*ancho+x) agrupada en cubetas por distancia a
+    las habitaciones existentes. Cada cubeta es una lista con índice inverso, así que agregar/quitar/actualizar son O(1)
+    y elegir entre la fracción más lejana solo recorre las cubetas (pocas distancias distintas).
+    """
+
+    def __init__(self):
+        self._cubetas: Dict[int, List[int]] = {}
+        self._donde: Dict[int, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._donde)
+
+    def __contains__(self, celda) -> bool:
+        return celda in self._donde
+
+    def __iter__(self):
+        return iter(self._donde)
+
+    def agregar(self, celda: int, distancia: int):
+        cubeta = self._cubetas.setdefault(distancia, [])
+        self._donde[celda] = (distancia, len(cubeta))
+        cubeta.append(celda)
+
+    def quitar(self, celda: int):
+        distancia, i = self._donde.pop(celda)
+        cubeta = self._cubetas[distancia]
+        ultimo = cubeta.pop()
+        if ultimo != celda:
+            cubeta[i] = ultimo
+            self._donde[ultimo] = (distancia, i)
+        if not cubeta:
+            del self._cubetas[distancia]
+
+    def actualizar(self, celda: int, distancia: int):
+        if self._donde[celda][0] != distancia:
+            self.quitar(celda)
+            self.agregar(celda, distancia)
+
+    def elegir_entre_mas_lejanos(self, rng, fraccion: float) -> int:
+        """Elige al azar una celda entre la 'fraccion' de la frontera más alejada."""
+        top_k = max(1, int(len(self._donde) * fraccion))
+        r = rng.randrange(top_k)
+        for distancia in sorted(self._cubetas, reverse=True):
+            cubeta = self._cubetas[distancia]
+            if r < len(cubeta):
+                return cubeta[r]
+            r -= len(cubeta)
+        raise IndexError("frontera vacía")
+
+class _HabitacionesDict(dict):
+    """dict de habitaciones que registra el Mapa dueño en cada Habitacion guardada."""
+
+    def __init__(self, mapa: "Mapa"):
+        super().__init__()
+        self.mapa = mapa
+
+    def __setitem__(self, coord, hab: Habitacion):
+        anterior = self.get(coord)
+        if anterior is hab:
+            return
+        if anterior is not None:
+            self.__delitem__(coord)
+        super().__setitem__(coord, hab)
+        hab._mapa = self.mapa
+        self.mapa._habitacion_agregada(coord, codigo_de_contenido(hab.contenido), len(hab.conexiones))
+
+    def __delitem__(self, coord):
+        hab = self[coord]
+        super().__delitem__(coord)
+        hab._mapa = None
+        self.mapa._habitacion_quitada(coord, codigo_de_contenido(hab.contenido), len(hab.conexiones))
+
+    def clear(self):
+        for hab in self.values():
+            hab._mapa = None
+        super().clear()
+        self.mapa._conexiones_cambiadas(None)
+
+
 class Mapa:
-    def __init__(self, ancho: int, alto: int, seed: Optional[int] = None):
+    BACKENDS = ("dict", "compacto")
+    # nombre -> funcion(mapa, n_habitaciones); se rellena tras la clase (registrar_estrategia)
+    ESTRATEGIAS: Dict[str, Callable[["Mapa", int], None]] = {}
+
+    def __init__(self, ancho: int, alto: int, seed: Optional[int] = None, rng: Optional[random.Random] = None,
+                 backend: str = "dict", max_arboles_camino: int = 8):
+        """
+        Cada mapa lleva sus propios generadores (no toca el módulo global 'random'):
+        - rng_estructura: generar_estructura
+        - rng_contenido: colocar_contenido
+        - rng_combate: combates y eventos (lo usa el Explorador por defecto)
+        Si se pasa 'rng', los substreams se derivan de él; si no, de 'seed'.
+
+        backend="compacto" guarda las habitaciones en buffers planos (ver rejilla.py);
+        self.habitaciones sigue teniendo la interfaz de dict y devuelve vistas Habitacion.
+
+        max_arboles_camino: cuántos árboles BFS por origen guarda self.caminos (LRU).
+        """
         if ancho <= 0 or alto <= 0:
             raise ValueError("Ancho y alto deben ser positivos")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend desconocido: {backend}")
         self.ancho = ancho
         self.alto = alto
-        self.habitaciones: Dict[Tuple[int, int], Habitacion] = {}
+        self.backend = backend
+        self.caminos = CacheCaminos(self, max_arboles=max_arboles_camino)
+        # habitaciones cambiadas (estructura, contenido, visitada) desde el último extraer_sucias()
+        self.cambios = SeguimientoCambios(ancho, alto)
+        self._seguimientos: List[SeguimientoCambios] = [self.cambios]
+        # contadores de obtener_estadisticas_mapa, al día con cada aviso de las habitaciones
+        self.contadores = ContadoresMapa()
+        self._recontar_pendiente = False
+        # comprobador incremental de conectividad; se crea al pedirlo (conectividad())
+        self._conectividad: Optional[Conectividad] = None
+        # grafo en formato CSR para los recorridos; se rehace al pedirlo tras un cambio
+        self._adyacencia: Optional[IndiceAdyacencia] = None
+        self.habitaciones: Dict[Tuple[int, int], Habitacion] = (
+            HabitacionesCompactas(ancho, alto, mapa=self) if backend == "compacto" else _HabitacionesDict(self)
+        )
         self.habitacion_inicial: Optional[Habitacion] = None
         self._next_id = 0
-        if seed is not None:
-            random.seed(seed)
+        # campo de distancias en el grafo desde la habitación inicial: (pos_inicio, array y*ancho+x)
+        self._distancias_grafo: Optional[Tuple[Tuple[int, int], array]] = None
+        self.seed = seed
+        semilla = seed if rng is None else None
+        self.rng_estructura = derivar_rng(semilla, "estructura", rng)
+        self.rng_contenido = derivar_rng(semilla, "contenido", rng)
+        self.rng_combate = derivar_rng(semilla, "combate", rng)
 
     def _coords_en_borde(self) -> List[Tuple[int, int]]:
         bordes = []
@@ -32,64 +175,145 @@ class Mapa:
             bordes.append((self.ancho - 1, y))
         return list(dict.fromkeys(bordes))
 
-    def generar_estructura(self, n_habitaciones: int):
+    def generar_estructura(self, n_habitaciones: int, estrategia: str = "crecimiento"):
         """
-        Genera n_habitaciones conectadas, con el spawn siempre en el borde.
-        Estrategia:
-        - Elegir spawn en borde (_coords_en_borde()).
-        - Mantener frontier de celdas adyacentes a las existentes.
-        - Priorizar candidatos más alejados del conjunto existente para esparcir habitaciones.
-        - Cuando se añade una habitación, intentar conectar con 1 vecino válido y con
-            cierta probabilidad añadir conexiones adicionales para densificar.
-        - Si la frontier se vacía antes de alcanzar n_habitaciones, reconstruir frontier desde existentes.
+        Genera n_habitaciones conectadas, con el spawn siempre en el borde, usando una de las
+        estrategias de Mapa.ESTRATEGIAS:
+        - "crecimiento": crecimiento por frontera (_generar_crecimiento), la de siempre
+        - "kruskal": laberinto, árbol de expansión aleatorio (estrategias.py)
+        - "bsp": salas rectangulares unidas por pasillos (estrategias.py)
+        - "cuevas": cuevas de autómata celular (estrategias.py)
+        Se pueden añadir más con Mapa.registrar_estrategia().
         """
         if n_habitaciones <= 0:
             raise ValueError("n_habitaciones debe ser >= 1")
         max_posibles = self.ancho * self.alto
         if n_habitaciones > max_posibles:
             raise ValueError("Demasiadas habitaciones para el tamaño del mapa")
+        generar = self.ESTRATEGIAS.get(estrategia)
+        if generar is None:
+            raise ValueError(f"Estrategia de generación desconocida: {estrategia}")
+
+        t_total = perf_counter_ns() if perfil.ACTIVO else 0
+        generar(self, n_habitaciones)
+        if estrategia != "crecimiento":
+            # el crecimiento ya lo comprueba con su union-find mientras construye
+            with perfil.seccion("generar/accesible"):
+                accesible = len(self.habitaciones) == n_habitaciones and self.es_todo_accesible()
+            if not accesible:
+                raise RuntimeError("Error: mapa generado no es completamente accesible")
+        if perfil.ACTIVO:
+            perfil.contar("generar/habitaciones", self._next_id)
+            perfil.registrar_seccion("generar_estructura", t_total)
+
+    @classmethod
+    def registrar_estrategia(cls, nombre: str, funcion: Callable[["Mapa", int], None]):
+        """
+        Añade (o reemplaza) una estrategia de generar_estructura. 'funcion(mapa, n)' debe dejar
+        en el mapa n habitaciones conectadas, con habitacion_inicial en el borde y _next_id = n,
+        usando mapa.rng_estructura.
+        """
+        cls.ESTRATEGIAS[nombre] = funcion
 
-        import random
+    def _generar_crecimiento(self, n_habitaciones: int):
+        """
+        Estrategia "crecimiento":
+        - Elegir spawn en borde (_coords_en_borde()).
+        - Mantener frontier de celdas adyacentes a las existentes.
+        - Priorizar candidatos más alejados del conjunto existente para esparcir habitaciones
+            (campo de distancias incremental + cubetas por distancia, sin reordenar la frontier).
+        - Cuando se añade una habitación, intentar conectar con 1 vecino válido y con
+            cierta probabilidad añadir conexiones adicionales para densificar.
+        - Llevar por celda el número de vecinos libres: las habitaciones que aún pueden crecer
+            están siempre a mano, así que reconstruir la frontier (si se vacía antes de alcanzar
+            n_habitaciones) y el relleno final no recorren todas las existentes.
+        """
+        rng = self.rng_estructura
+        # instrumentación (perfil.py): tiempos por fase acumulados en locales y volcados al final
+        medir = perfil.ACTIVO
+        ns_frontera = ns_conexion = ns_repoblar = 0
+        frontera_max = repoblaciones = 0
 
         self.habitaciones.clear()
         self._next_id = 0
 
         # elegir inicio en borde
         posibles_bordes = self._coords_en_borde()
-        inicio_coord = random.choice(posibles_bordes)
+        inicio_coord = rng.choice(posibles_bordes)
         inicio = Habitacion(self._next_id, inicio_coord, inicial=True)
         self._next_id += 1
         self.habitaciones[inicio_coord] = inicio
-        self.habitacion_inicial = inicio
-
-        deltas = {"norte": (0, -1), "sur": (0, 1), "este": (1, 0), "oeste": (-1, 0)}
-        existing = set([inicio_coord])
+        self.habitacion_inicial = self.habitaciones[inicio_coord]
+
+        # todo el bucle trabaja con índices de celda y*ancho+x y las tablas de vecinos
+        # precalculadas (adyacencia.vecinos_rejilla): sin tuplas ni comprobaciones de borde
+        ancho = self.ancho
+        tablas = vecinos_rejilla(ancho, self.alto)
+        # (dirección desde el vecino hacia la celda, tabla que da ese vecino)
+        tablas_hacia = [(d, tablas[DIRECCIONES.index(DIR_OPUESTA[d])]) for d in DIRECCIONES]
+        inicio_idx = inicio_coord[1] * ancho + inicio_coord[0]
+        ocupadas = bytearray(ancho * self.alto)
+        # libres[c]: vecinos libres de la celda ocupada c. 'expandibles' guarda las ocupadas que
+        # tenían vecinos libres al ocuparse; las que llegan a 0 se descartan al encontrarlas
+        # (cada celda entra y sale una vez). Repoblar la frontera y el relleno final salen de
+        # aquí, sin recorrer todas las habitaciones.
+        libres = bytearray(ancho * self.alto)
+        expandibles: List[int] = []
+        # componentes de los pasillos realmente creados (cada habitación entra sola con agregar()
+        # y cada conectar() que funciona hace unir()): sustituye al BFS final de es_todo_accesible()
+        componentes = UnionFind(ancho * self.alto)
+        componentes.agregar(inicio_idx)
+
+        # campo de distancias (Manhattan) a la habitación existente más cercana,
+        # indexado por y*ancho+x. Solo se relaja alrededor de cada habitación nueva:
+        # la frontera son celdas adyacentes a existentes, así que ahí el campo es exacto.
+        dist = [_DIST_INF] * (self.ancho * self.alto)
 
         # frontier = celdas adyacentes libres a las habitaciones existentes
-        frontier = set()
-        for dx, dy in deltas.values():
-            nx, ny = inicio_coord[0] + dx, inicio_coord[1] + dy
-            if 0 <= nx < self.ancho and 0 <= ny < self.alto:
-                frontier.add((nx, ny))
+        frontier = _FronteraPorDistancia()
+
+        def ocupar(celda):
+            """
+            Marca 'celda' (ya fuera de la frontera) como ocupada: actualiza los vecinos libres
+            (suyos y de sus vecinas), el campo de distancias y la frontera.
+            """
+            ocupadas[celda] = 1
+            dist[celda] = 0
+            n_libres = 0
+            for tabla in tablas:
+                vecino = tabla[celda]
+                if vecino < 0:
+                    continue
+                if ocupadas[vecino]:
+                    libres[vecino] -= 1
+                    continue
+                n_libres += 1
+                if dist[vecino] > 1:
+                    dist[vecino] = 1
+                if vecino in frontier:
+                    frontier.actualizar(vecino, dist[vecino])
+                else:
+                    frontier.agregar(vecino, dist[vecino])
+            libres[celda] = n_libres
+            if n_libres:
+                expandibles.append(celda)
+
+        ocupar(inicio_idx)
 
         def repoblar_frontier():
-            """Si frontier se vacía, reconstruirla mirando alrededor de todas las existing."""
-            f = set()
-            for ex in existing:
-                for dx, dy in deltas.values():
-                    nx, ny = ex[0] + dx, ex[1] + dy
-                    if 0 <= nx < self.ancho and 0 <= ny < self.alto:
-                        coord = (nx, ny)
-                        if coord not in existing and coord not in self.habitaciones and coord not in f:
-                            f.add(coord)
-            return f
-
-        def distancia_min_a_existentes(coord):
-            return min(abs(coord[0] - e[0]) + abs(coord[1] - e[1]) for e in existing)
+            """Si frontier se vacía, reconstruirla desde las habitaciones con vecinos libres."""
+            expandibles[:] = [ex for ex in expandibles if libres[ex]]
+            for ex in expandibles:
+                for tabla in tablas:
+                    vecino = tabla[ex]
+                    if vecino >= 0 and not ocupadas[vecino] and vecino not in frontier:
+                        dist[vecino] = 1
+                        frontier.agregar(vecino, 1)
 
         # Probabilidades
         P_ADDITIONAL_CONN = 0.25  
         MAX_ATTEMPT_REPOB = 3     
+        TOP_FRACTION = 0.5
 
         repob_intentos = 0
         while self._next_id < n_habitaciones:
@@ -97,123 +321,266 @@ class Mapa:
                 
                 if repob_intentos >= MAX_ATTEMPT_REPOB:
                     break
-                frontier = repoblar_frontier()
+                if medir:
+                    t0 = perf_counter_ns()
+                    repoblar_frontier()
+                    ns_repoblar += perf_counter_ns() - t0
+                    repoblaciones += 1
+                else:
+                    repoblar_frontier()
                 repob_intentos += 1
                 if not frontier:
                     continue
 
-            dist_list = [(distancia_min_a_existentes(f), f) for f in frontier]
-            dist_list.sort(reverse=True, key=lambda x: x[0])
-            top_fraction = 0.5  
-            top_k = max(1, int(len(dist_list) * top_fraction))
-            candidates = [f for (_, f) in dist_list[:top_k]]
-            candidate = random.choice(candidates)
+            if medir:
+                t0 = perf_counter_ns()
+                if len(frontier) > frontera_max:
+                    frontera_max = len(frontier)
+                candidate = frontier.elegir_entre_mas_lejanos(rng, TOP_FRACTION)
+                t1 = perf_counter_ns()
+                ns_frontera += t1 - t0
+            else:
+                candidate = frontier.elegir_entre_mas_lejanos(rng, TOP_FRACTION)
 
-            new_hab = Habitacion(self._next_id, candidate)
+            new_hab = Habitacion(self._next_id, (candidate % ancho, candidate // ancho))
             vecinos_existentes = []
-            for dir_name, (dx, dy) in deltas.items():
-                neighbor = (candidate[0] - dx, candidate[1] - dy)
-                if neighbor in existing:
-                    vecinos_existentes.append((dir_name, self.habitaciones[neighbor]))
+            for dir_name, tabla in tablas_hacia:
+                neighbor = tabla[candidate]
+                if neighbor >= 0 and ocupadas[neighbor]:
+                    vecinos_existentes.append((dir_name, neighbor))
 
             if not vecinos_existentes:
-                frontier.remove(candidate)
+                frontier.quitar(candidate)
                 continue
 
-            random.shuffle(vecinos_existentes)
-            connected = False
-            for dir_name, neigh_hab in vecinos_existentes:
+            rng.shuffle(vecinos_existentes)
+            connected = -1
+            for dir_name, neighbor in vecinos_existentes:
                 try:
-                    neigh_hab.conectar(dir_name, new_hab)
-                    connected = True
+                    self.habitaciones[(neighbor % ancho, neighbor // ancho)].conectar(dir_name, new_hab)
+                    connected = neighbor
                     break
                 except Exception:
                     continue
 
-            if not connected:
-                frontier.remove(candidate)
+            if connected < 0:
+                frontier.quitar(candidate)
                 continue
 
-            self.habitaciones[candidate] = new_hab
+            self.habitaciones[new_hab.pos] = new_hab
+            componentes.agregar(candidate)
+            componentes.unir(candidate, connected)
             self._next_id += 1
-            existing.add(candidate)
-            frontier.remove(candidate)
-
-            for dx, dy in deltas.values():
-                nx, ny = candidate[0] + dx, candidate[1] + dy
-                if 0 <= nx < self.ancho and 0 <= ny < self.alto:
-                    coord = (nx, ny)
-                    if coord not in existing and coord not in frontier and coord not in self.habitaciones:
-                        frontier.add(coord)
-
-            if random.random() < P_ADDITIONAL_CONN:
-                for dir_name, (dx, dy) in deltas.items():
-                    neighbor = (candidate[0] - dx, candidate[1] - dy)
-                    if neighbor in existing:
-                        neigh_hab = self.habitaciones[neighbor]
+            frontier.quitar(candidate)
+            ocupar(candidate)
+
+            if rng.random() < P_ADDITIONAL_CONN:
+                for dir_name, tabla in tablas_hacia:
+                    neighbor = tabla[candidate]
+                    if neighbor >= 0 and ocupadas[neighbor]:
+                        neigh_hab = self.habitaciones[(neighbor % ancho, neighbor // ancho)]
                         try:
                             neigh_hab.conectar(dir_name, new_hab)
                         except Exception:
-                            pass
-
-        if self._next_id < n_habitaciones:
-            for ex in list(existing):
-                if self._next_id >= n_habitaciones:
+                            continue
+                        componentes.unir(candidate, neighbor)
+            if medir:
+                ns_conexion += perf_counter_ns() - t1
+
+        if medir:
+            perfil.sumar_tiempo("generar/frontera", ns_frontera)
+            perfil.sumar_tiempo("generar/conexion", ns_conexion)
+            if repoblaciones:
+                perfil.sumar_tiempo("generar/repoblar", ns_repoblar, repoblaciones)
+            perfil.contar("generar/repoblar_frontier", repoblaciones)
+            perfil.maximo("generar/frontera_max", frontera_max)
+            t0 = perf_counter_ns()
+
+        # relleno: cada paso toma directamente una habitación con vecinos libres
+        while self._next_id < n_habitaciones and expandibles:
+            ex = expandibles[-1]
+            if not libres[ex]:
+                expandibles.pop()
+                continue
+            for dir_name, tabla in zip(DIRECCIONES, tablas):
+                celda = tabla[ex]
+                if celda >= 0 and not ocupadas[celda]:
                     break
-                for dx, dy in deltas.values():
-                    if self._next_id >= n_habitaciones:
-                        break
-                    nx, ny = ex[0] + dx, ex[1] + dy
-                    coord = (nx, ny)
-                    if not (0 <= nx < self.ancho and 0 <= ny < self.alto):
-                        continue
-                    if coord in existing or coord in self.habitaciones:
-                        continue
-                    new_hab = Habitacion(self._next_id, coord)
-                    for dir_name, (ddx, ddy) in deltas.items():
-                        if ex[0] + ddx == coord[0] and ex[1] + ddy == coord[1]:
-                            try:
-                                self.habitaciones[ex].conectar(dir_name, new_hab)
-                                self.habitaciones[coord] = new_hab
-                                self._next_id += 1
-                                existing.add(coord)
-                            except Exception:
-                                pass
-                            break
+            new_hab = Habitacion(self._next_id, (celda % ancho, celda // ancho))
+            try:
+                self.habitaciones[(ex % ancho, ex // ancho)].conectar(dir_name, new_hab)
+            except Exception:
+                expandibles.pop()
+                continue
+            self.habitaciones[new_hab.pos] = new_hab
+            self._next_id += 1
+            componentes.agregar(celda)
+            componentes.unir(celda, ex)
+            if celda in frontier:
+                frontier.quitar(celda)
+            ocupar(celda)
+
+        if medir:
+            perfil.registrar_seccion("generar/relleno", t0)
 
         if self._next_id < n_habitaciones:
             raise RuntimeError("No se pudieron colocar todas las habitaciones (frontera agotada)")
 
-        if not self.es_todo_accesible():
+        with perfil.seccion("generar/accesible"):
+            accesible = componentes.componentes == 1 and len(self.habitaciones) == self._next_id
+        if not accesible:
             raise RuntimeError("Error: mapa generado no es completamente accesible")
 
+    def _conexiones_cambiadas(self, coord: Optional[Tuple[int, int]], delta: int = 0):
+        """
+        Aviso de Habitacion/backend: cambiaron las conexiones de 'coord' ('delta' = cambio
+        en su len(conexiones)). coord=None significa que se vaciaron las habitaciones.
+        """
+        self.caminos.invalidar()
+        self._distancias_grafo = None
+        self._adyacencia = None
+        if coord is None:
+            self.contadores.reiniciar()
+            if self._conectividad is not None:
+                self._conectividad.invalidar()
+        else:
+            if self._conectividad is not None:
+                self._conectividad.conexiones_cambiadas(coord)
+            self.contadores.conexiones += delta
+            self._marcar_sucia(coord)
+
+    def _contenido_cambiado(self, coord: Tuple[int, int], codigo_antes: int, codigo_despues: int):
+        """Aviso de Habitacion/backend: cambió el contenido (códigos de TIPOS_CONTENIDO)."""
+        por_tipo = self.contadores.por_tipo
+        por_tipo[codigo_antes] -= 1
+        por_tipo[codigo_despues] += 1
+        self._marcar_sucia(coord)
+
+    def _habitacion_agregada(self, coord: Tuple[int, int], codigo: int, n_conexiones: int):
+        self.contadores.sumar(codigo, n_conexiones)
+        self._adyacencia = None
+        self._marcar_sucia(coord)
+        if self._conectividad is not None:
+            self._conectividad.habitacion_agregada(coord)
+
+    def _habitacion_quitada(self, coord: Tuple[int, int], codigo: int, n_conexiones: int):
+        self.contadores.sumar(codigo, n_conexiones, signo=-1)
+        if self._conectividad is not None:
+            self._conectividad.invalidar()
+        self._conexiones_cambiadas(coord)
+
+    def _marcar_sucia(self, coord: Tuple[int, int]):
+        x, y = coord
+        if 0 <= x < self.ancho and 0 <= y < self.alto:
+            idx = y * self.ancho + x
+            for seguimiento in self._seguimientos:
+                seguimiento.marcar(idx)
+
+    def extraer_sucias(self) -> List[Tuple[int, int]]:
+        """Coords de las habitaciones cambiadas desde la última llamada (y vacía el conjunto)."""
+        return self.cambios.extraer()
+
+    def nuevo_seguimiento(self) -> SeguimientoCambios:
+        """Conjunto de cambios independiente para otro consumidor (quitar con quitar_seguimiento)."""
+        seguimiento = SeguimientoCambios(self.ancho, self.alto)
+        self._seguimientos.append(seguimiento)
+        return seguimiento
+
+    def quitar_seguimiento(self, seguimiento: SeguimientoCambios):
+        if seguimiento in self._seguimientos and seguimiento is not self.cambios:
+            self._seguimientos.remove(seguimiento)
+
+    def distancias_grafo(self) -> array:
+        """
+        Distancia (número de pasos por pasillos) de cada celda a la habitación inicial,
+        en un array plano indexado por y*ancho+x; -1 si no hay habitación o no es alcanzable.
+        Se calcula con un único BFS sobre adyacencia() y se guarda hasta el próximo cambio de estructura.
+        """
+        if not self.habitacion_inicial:
+            raise ValueError("El mapa no tiene habitación inicial definida")
+        inicio = tuple(self.habitacion_inicial.pos)
+        if self._distancias_grafo is not None and self._distancias_grafo[0] == inicio:
+            return self._distancias_grafo[1]
+        ady = self.adyacencia()
+        dist = ady.distancias_celda(ady.indice_de(inicio))
+        self._distancias_grafo = (inicio, dist)
+        return dist
+
+    def distancia_grafo(self, coord: Tuple[int, int]) -> int:
+        """Distancia en pasos desde la habitación inicial (O(1) con el campo cacheado); -1 si no alcanzable."""
+        return self.distancias_grafo()[coord[1] * self.ancho + coord[0]]
+
+    def encontrar_camino(self, origen: Tuple[int, int], destino: Tuple[int, int], estrategia: str = "bfs") -> list:
+        """
+        Camino más corto [(direccion, coord), ...].
+        estrategia: "bfs" (árboles cacheados), "a_estrella" o "bidireccional" (ver CacheCaminos).
+        """
+        return self.caminos.camino(origen, destino, estrategia)
+
+    def adyacencia(self) -> IndiceAdyacencia:
+        """
+        Grafo de habitaciones en formato CSR (adyacencia.py) para los recorridos: caminos,
+        distancias, accesibilidad y simulación. Se construye al pedirlo y vale hasta el
+        siguiente cambio de conexiones o de habitaciones.
+        """
+        if self._adyacencia is None:
+            self._adyacencia = IndiceAdyacencia(self)
+        return self._adyacencia
 
+    def conectividad(self) -> Conectividad:
+        """
+        Comprobador incremental de conectividad y puentes (conectividad.py). Se crea con un
+        recorrido completo la primera vez y después se mantiene con los avisos de las habitaciones.
+        """
+        if self._conectividad is None:
+            self._conectividad = Conectividad(self)
+        return self._conectividad
 
     def es_todo_accesible(self) -> bool:
-        """BFS desde la habitación inicial, verifica que alcance todas las habitaciones."""
+        """
+        Verifica que desde la habitación inicial se alcancen todas las habitaciones: con el
+        comprobador de conectividad creado es una consulta casi O(1); si no, un recorrido
+        sobre adyacencia() si ya está construido o sobre las habitaciones.
+        """
         if not self.habitacion_inicial:
             return False
-        visitados = set()
-        q = deque()
-        start = self.habitacion_inicial.pos
-        q.append(start)
-        visitados.add(start)
-
-        while q:
-            coord = q.popleft()
-            hab = self.habitaciones[coord]
-            for otra in hab.conexiones.values():
+        if self._conectividad is not None:
+            return self._conectividad.conexo()
+        ady = self._adyacencia
+        if ady is not None:
+            alcanzables = ady.alcanzables(ady.indice_de(self.habitacion_inicial.pos))
+            perfil.contar("bfs/nodos_expandidos", alcanzables)
+            return alcanzables == len(ady)
+        # sin índice construido, un recorrido directo es más barato que construirlo para una consulta
+        if isinstance(self.habitaciones, HabitacionesCompactas):
+            alcanzables = self.habitaciones.contar_alcanzables(self.habitacion_inicial.pos)
+            perfil.contar("bfs/nodos_expandidos", alcanzables)
+            return alcanzables == len(self.habitaciones)
+        visitados = {self.habitacion_inicial.pos}
+        pendientes = [self.habitacion_inicial.pos]
+        for coord in pendientes:
+            for otra in self.habitaciones[coord].conexiones.values():
                 c = otra.pos
                 if c not in visitados:
                     visitados.add(c)
-                    q.append(c)
-
+                    pendientes.append(c)
+        perfil.contar("bfs/nodos_expandidos", len(visitados))
         return len(visitados) == len(self.habitaciones)
 
-    def imprimir_ascii(self) -> str:
+    # a partir de aquí imprimir_ascii usa el render por símbolos de texto.py (1 byte por celda)
+    MAX_CELDAS_ASCII_IDS = 4096
+
+    def imprimir_ascii(self, ids: Optional[bool] = None) -> str:
         """
-        Representación ASCII del mapa
+        Representación ASCII del mapa.
+        Mapas pequeños: id de cada habitación ('S ' el inicio). Mapas de más de
+        MAX_CELDAS_ASCII_IDS celdas: un símbolo por celda (ver texto.frame_de_texto).
+        ids=True / ids=False fuerza uno u otro formato sea cual sea el tamaño.
         """
+        if ids is None:
+            ids = self.ancho * self.alto <= self.MAX_CELDAS_ASCII_IDS
+        if not ids:
+            return frame_de_texto(self).decode("ascii").rstrip("\n")
         grid = [["  " for _ in range(self.ancho)] for _ in range(self.alto)]
         for (x, y), hab in self.habitaciones.items():
             mark = f"{hab.id:02d}"
@@ -236,9 +603,9 @@ class Mapa:
         }
 
     @staticmethod
-    def from_dict(d: dict) -> "Mapa":
+    def from_dict(d: dict, backend: str = "dict") -> "Mapa":
         """Reconstruye mapa desde dict (reconstruye habitaciones y conexiones)."""
-        mapa = Mapa(d["ancho"], d["alto"])
+        mapa = Mapa(d["ancho"], d["alto"], backend=backend)
         for h in d["habitaciones"]:
             hab = Habitacion.from_dict(h)
             mapa.habitaciones[tuple(hab.pos)] = hab
@@ -260,7 +627,7 @@ class Mapa:
     def __repr__(self):
         return f"Mapa({self.ancho}x{self.alto}, habitaciones={len(self.habitaciones)})"
     
-    def colocar_contenido(self, seed: Optional[int] = None) -> dict:
+    def colocar_contenido(self, seed: Optional[int] = None, distancia: str = "manhattan") -> dict:
         """
         Distribuye contenido en las habitaciones según los porcentajes del enunciado:
         - Jefe 
@@ -269,17 +636,37 @@ class Mapa:
         - Eventos: 5-10%
         - Resto vacío
 
+        Con seed se usa un stream propio derivado de ella; si no, self.rng_contenido.
+
+        La dificultad y el valor escalan con la distancia al inicio:
+        - distancia="manhattan": distancia en línea recta sobre la rejilla
+        - distancia="grafo": pasos reales por los pasillos (distancias_grafo())
+
         Devuelve un dict resumen: {"jefes":X, "monstruos":Y, "tesoros":Z, "eventos":W}
         """
-        if seed is not None:
-            random.seed(seed)
+        rng = derivar_rng(seed, "contenido") if seed is not None else self.rng_contenido
+        t_total = perf_counter_ns() if perfil.ACTIVO else 0
 
         total = len(self.habitaciones)
         if total <= 1:
             return {"jefes": 0, "monstruos": 0, "tesoros": 0, "eventos": 0}
 
         inicio_coord = tuple(self.habitacion_inicial.pos)
+        if distancia == "grafo":
+            campo = self.distancias_grafo()
+
+            def dist_de(coord) -> int:
+                d = campo[coord[1] * self.ancho + coord[0]]
+                return d if d >= 0 else manhattan(coord, inicio_coord)
+        elif distancia == "manhattan":
+            def dist_de(coord) -> int:
+                return manhattan(coord, inicio_coord)
+        else:
+            raise ValueError(f"Fuente de distancia desconocida: {distancia}")
         coords_disponibles = [c for c in self.habitaciones.keys() if c != inicio_coord]
+        if isinstance(self.habitaciones, HabitacionesCompactas):
+            # mismo orden que el backend dict (inserción == id) para que la seed reparta igual
+            coords_disponibles.sort(key=self.habitaciones.id_de)
         n_disp = len(coords_disponibles)
 
         def pct_range(pmin: float, pmax: float) -> Tuple[int, int]:
@@ -293,9 +680,9 @@ class Mapa:
         tes_min, tes_max = pct_range(0.15, 0.25)
         evt_min, evt_max = pct_range(0.05, 0.10)
 
-        n_monstruos = random.randint(mon_min, mon_max) if n_disp > 0 else 0
-        n_tesoros = random.randint(tes_min, tes_max) if n_disp > 0 else 0
-        n_eventos = random.randint(evt_min, evt_max) if n_disp > 0 else 0
+        n_monstruos = rng.randint(mon_min, mon_max) if n_disp > 0 else 0
+        n_tesoros = rng.randint(tes_min, tes_max) if n_disp > 0 else 0
+        n_eventos = rng.randint(evt_min, evt_max) if n_disp > 0 else 0
         n_jefes = 1 if n_disp > 0 else 0  
 
         total_asignado = n_monstruos + n_tesoros + n_eventos + n_jefes
@@ -312,7 +699,7 @@ class Mapa:
             n_tesoros = locals()["n_tesoros"]
             n_eventos = locals()["n_eventos"]
 
-        random.shuffle(coords_disponibles)
+        rng.shuffle(coords_disponibles)
         it = iter(coords_disponibles)
 
         asignadas = {"jefes": [], "monstruos": [], "tesoros": [], "eventos": []}
@@ -337,7 +724,7 @@ class Mapa:
             obj = Objeto(f"Gema(d{dist})", valor=valor, descripcion=f"Tesoro en distancia {dist}")
             return Tesoro(obj)
         def crear_evento_aleatorio(dist: int) -> Evento:
-            tipo_evt = random.choice(["trampa", "fuente", "portal", "buff"])
+            tipo_evt = rng.choice(["trampa", "fuente", "portal", "buff"])
             if tipo_evt == "trampa":
                 efecto = {"tipo": "trampa", "valor": 1 + (dist // 3)}
                 return Evento("Trampa", "Una trampa que hiere al explorador", efecto)
@@ -355,7 +742,7 @@ class Mapa:
 
         if n_jefes > 0:
             coord = next(it)
-            dist = manhattan(coord, inicio_coord)
+            dist = dist_de(coord)
             jefe = crear_jefe_segun_distancia(dist)
             self.habitaciones[coord].contenido = jefe
             asignadas["jefes"].append(coord)
@@ -365,7 +752,7 @@ class Mapa:
                 coord = next(it)
             except StopIteration:
                 break
-            dist = manhattan(coord, inicio_coord)
+            dist = dist_de(coord)
             mon = crear_monstruo_segun_distancia(dist)
             self.habitaciones[coord].contenido = mon
             asignadas["monstruos"].append(coord)
@@ -375,7 +762,7 @@ class Mapa:
                 coord = next(it)
             except StopIteration:
                 break
-            dist = manhattan(coord, inicio_coord)
+            dist = dist_de(coord)
             tes = crear_tesoro_segun_distancia(dist)
             self.habitaciones[coord].contenido = tes
             asignadas["tesoros"].append(coord)
@@ -385,15 +772,21 @@ class Mapa:
                 coord = next(it)
             except StopIteration:
                 break
-            dist = manhattan(coord, inicio_coord)
+            dist = dist_de(coord)
             ev = crear_evento_aleatorio(dist)
             self.habitaciones[coord].contenido = ev
             asignadas["eventos"].append(coord)
 
         
         resumen = {k: len(v) for k, v in asignadas.items()}
+        if t_total:
+            perfil.contar("contenido/colocados", sum(resumen.values()))
+            perfil.registrar_seccion("colocar_contenido", t_total)
         return resumen
-    def obtener_estadisticas_mapa(self) -> dict:
+    # True para que cada obtener_estadisticas_mapa() compruebe los contadores con un recorrido completo
+    VERIFICAR_ESTADISTICAS = False
+
+    def obtener_estadisticas_mapa(self, verificar: bool = False) -> dict:
         """
         Retorna: {
         'total': int,
@@ -404,26 +797,40 @@ class Mapa:
         'eventos': int,
         'promedio_conexiones': float
         }
+        Se lee de self.contadores en O(1). Con verificar=True (o Mapa.VERIFICAR_ESTADISTICAS)
+        se recalcula recorriendo todas las habitaciones y se lanza RuntimeError si no coinciden.
         """
-        total = len(self.habitaciones)
-        conteos = {"vacios": 0, "tesoros": 0, "monstruos": 0, "jefes": 0, "eventos": 0}
-        suma_conex = 0
-        for hab in self.habitaciones.values():
-            suma_conex += len(hab.conexiones)
-            if hab.contenido is None:
-                conteos["vacios"] += 1
-            else:
-                t = getattr(hab.contenido, "tipo", None)
-                if t == "tesoro":
-                    conteos["tesoros"] += 1
-                elif t == "monstruo":
-                    conteos["monstruos"] += 1
-                elif t == "jefe":
-                    conteos["jefes"] += 1
-                elif t == "evento":
-                    conteos["eventos"] += 1
-                else:
-                    conteos["vacios"] += 1
-        promedio = (suma_conex / total) if total > 0 else 0.0
-        resumen = {"Total de habitaciones": total, **conteos, "promedio_conexiones": round(promedio, 2)}
-        return resumen
\ No newline at end of file
+        if self._recontar_pendiente:
+            self.recontar_estadisticas()
+        elif verificar or self.VERIFICAR_ESTADISTICAS:
+            recorrido = self._contar_por_recorrido()
+            if recorrido != self.contadores:
+                raise RuntimeError(f"Estadísticas desincronizadas: {self.contadores} != {recorrido} (recorrido)")
+        return self.contadores.resumen(len(self.habitaciones))
+
+    def _contar_por_recorrido(self) -> ContadoresMapa:
+        if isinstance(self.habitaciones, HabitacionesCompactas):
+            contadores = ContadoresMapa()
+            por_tipo = self.habitaciones.contar_tipos()
+            contadores.por_tipo = [por_tipo[t] for t in TIPOS_CONTENIDO]
+            contadores.conexiones = self.habitaciones.total_conexiones()
+            return contadores
+        return contar_por_recorrido(self.habitaciones.values())
+
+    def recontar_estadisticas(self, perezoso: bool = False):
+        """
+        Rehace self.contadores con un recorrido completo (p. ej. tras cambiar self.habitaciones).
+        Con perezoso=True solo lo apunta y el recorrido se hace en la próxima lectura.
+        """
+        if perezoso:
+            self._recontar_pendiente = True
+            return
+        self.contadores = self._contar_por_recorrido()
+        self._recontar_pendiente = False
+
+Mapa.ESTRATEGIAS.update({
+    "crecimiento": Mapa._generar_crecimiento,
+    "kruskal": estrategias.generar_kruskal,
+    "bsp": estrategias.generar_bsp,
+    "cuevas": estrategias.generar_cuevas,
+})
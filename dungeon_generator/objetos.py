@@ -1,4 +1,6 @@
 class Objeto:
+    __slots__ = ("nombre", "valor", "descripcion", "categoria", "efecto")
+
     def __init__(self, nombre: str, valor: int = 0, descripcion: str = "", categoria: str = "normal", efecto: dict = None):
         self.nombre = nombre
         self.valor = int(valor)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+import os
+import sys
+from typing import List, Optional, Tuple
+from .contenido import codigo_de_contenido
+from .texto import SIMBOLO_DE_CODIGO
+
+# Redibujado diferencial de la consola: se guarda el frame que hay en pantalla y en cada
+# render solo se escriben (con movimientos de cursor ANSI) los trozos de línea que cambian.
+
+CSI = "\x1b["
+
+
+class PantallaDiferencial:
+    """
+    Frame de texto (una str por fila de terminal) y lo último escrito en pantalla.
+    dibujar() compara fila a fila y emite, en una sola escritura, solo el tramo cambiado
+    de cada fila; después deja el cursor bajo el frame y borra lo que hubiera debajo
+    (el prompt y lo tecleado en el comando anterior).
+    """
+
+    def __init__(self, salida=None):
+        self.salida = salida if salida is not None else sys.stdout
+        self._lineas: List[str] = []
+        self._limpiar = True
+        self.ultimos_bytes = 0
+        if os.name == "nt":
+            os.system("")  # activa las secuencias ANSI en la consola de Windows
+
+    def invalidar(self):
+        """La pantalla se ensució por fuera (input, prints): el próximo dibujar() la repinta entera."""
+        self._lineas = []
+        self._limpiar = True
+
+    def dibujar(self, lineas: List[str]) -> int:
+        partes = []
+        if self._limpiar:
+            partes.append(f"{CSI}H{CSI}2J")
+            self._limpiar = False
+        anteriores = self._lineas
+        for fila, nueva in enumerate(lineas):
+            vieja = anteriores[fila] if fila < len(anteriores) else ""
+            if nueva == vieja:
+                continue
+            inicio = _primera_diferencia(vieja, nueva)
+            fin = _fin_diferencia(vieja, nueva, inicio)
+            partes.append(f"{CSI}{fila + 1};{inicio + 1}H{nueva[inicio:fin]}")
+            if len(nueva) < len(vieja):
+                partes.append(f"{CSI}K")
+        # cursor a la fila siguiente al frame y borrar el resto de la pantalla
+        partes.append(f"{CSI}{len(lineas) + 1};1H{CSI}J")
+        salida = "".join(partes)
+        self.salida.write(salida)
+        self.salida.flush()
+        self._lineas = list(lineas)
+        self.ultimos_bytes = len(salida)
+        return self.ultimos_bytes
+
+
+def _primera_diferencia(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _fin_diferencia(a: str, b: str, inicio: int) -> int:
+    """Fin (exclusivo) del tramo de b que hay que reescribir; si cambia la longitud, hasta el final."""
+    if len(a) != len(b):
+        return len(b)
+    j = len(b)
+    while j > inicio and a[j - 1] == b[j - 1]:
+        j -= 1
+    return j
+
+
+class VistaMapa:
+    """
+    Ventana del mapa (a lo sumo ancho x alto celdas) en texto, una fila por fila de mapa.
+    Las filas se cachean; en cada frame solo se rehacen las que contienen habitaciones
+    cambiadas (seguimiento propio en el Mapa) o la posición vieja/nueva del explorador.
+    La ventana salta de página cuando el explorador sale de ella, así el coste por frame
+    depende del tamaño de la ventana y de los cambios, no del tamaño del mapa.
+    Símbolos: '.' sin habitación, 'S' inicio, '0' sin visitar y vacía, '*' recorrida,
+    letras de texto.SIMBOLOS para el contenido y 'X' el explorador.
+    """
+
+    def __init__(self, mapa, ancho: int, alto: int):
+        self.mapa = mapa
+        self.ancho = max(1, min(int(ancho), mapa.ancho))
+        self.alto = max(1, min(int(alto), mapa.alto))
+        self.x0 = -1
+        self.y0 = -1
+        self._seguimiento = mapa.nuevo_seguimiento()
+        self._celdas: List[bytearray] = []
+        self._filas: List[str] = []
+        self._explorador: Optional[Tuple[int, int]] = None
+
+    def cerrar(self):
+        self.mapa.quitar_seguimiento(self._seguimiento)
+
+    def _simbolo(self, coord: Tuple[int, int]) -> int:
+        hab = self.mapa.habitaciones.get(coord)
+        if hab is None:
+            return ord(".")
+        if hab.inicial:
+            return ord("S")
+        contenido = hab.contenido
+        if contenido is None:
+            return ord("*") if hab.visitada else ord("0")
+        return SIMBOLO_DE_CODIGO[codigo_de_contenido(contenido)]
+
+    def _centrar(self, ex: int, ey: int):
+        self.x0 = min(max(0, ex - self.ancho // 2), self.mapa.ancho - self.ancho)
+        self.y0 = min(max(0, ey - self.alto // 2), self.mapa.alto - self.alto)
+        self._celdas = [
+            bytearray(self._simbolo((x, y)) for x in range(self.x0, self.x0 + self.ancho))
+            for y in range(self.y0, self.y0 + self.alto)
+        ]
+        self._filas = [None] * self.alto
+        self._seguimiento.extraer()
+
+    def _dentro(self, coord: Tuple[int, int]) -> bool:
+        x, y = coord
+        return self.x0 <= x < self.x0 + self.ancho and self.y0 <= y < self.y0 + self.alto
+
+    def filas(self, posicion: Tuple[int, int]) -> List[str]:
+        posicion = tuple(posicion)
+        if not self._filas or not self._dentro(posicion):
+            self._centrar(*posicion)
+        sucias = set()
+        for coord in self._seguimiento.extraer():
+            if self._dentro(coord):
+                x, y = coord
+                self._celdas[y - self.y0][x - self.x0] = self._simbolo(coord)
+                sucias.add(y - self.y0)
+        for coord in (self._explorador, posicion):
+            if coord is not None and self._dentro(coord):
+                sucias.add(coord[1] - self.y0)
+        self._explorador = posicion
+        ex, ey = posicion[0] - self.x0, posicion[1] - self.y0
+        for fila in range(self.alto):
+            if fila in sucias or self._filas[fila] is None:
+                celdas = self._celdas[fila]
+                if fila == ey:
+                    celdas = bytearray(celdas)
+                    celdas[ex] = ord("X")
+                self._filas[fila] = " ".join(celdas.decode("ascii"))
+        return self._filas
@@ -0,0 +1,145 @@
+from __future__ import annotations
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Instrumentación opcional: temporizadores y contadores con nombre alrededor de las fases
+# calientes (generación, contenido, caminos, combate, render). Desactivada por defecto;
+# los puntos instrumentados solo consultan perfil.ACTIVO (una lectura de atributo) y, en
+# bucles, acumulan en variables locales que se vuelcan una vez al final.
+
+ACTIVO = False
+
+
+class Perfil:
+    """
+    Datos de una ejecución:
+    - tiempos: nombre -> [llamadas, total_ns, max_ns]
+    - contadores: nombre -> total (contar) o máximo (maximo)
+    - trazas: (nombre, inicio_ns, duracion_ns) de cada seccion(), para el trace de Chrome
+    """
+
+    def __init__(self):
+        self.inicio_ns = time.perf_counter_ns()
+        self.tiempos: Dict[str, List[int]] = {}
+        self.contadores: Dict[str, int] = {}
+        self.trazas: List[Tuple[str, int, int]] = []
+
+    def sumar_tiempo(self, nombre: str, duracion_ns: int, llamadas: int = 1):
+        t = self.tiempos.get(nombre)
+        if t is None:
+            self.tiempos[nombre] = [llamadas, duracion_ns, duracion_ns]
+        else:
+            t[0] += llamadas
+            t[1] += duracion_ns
+            if duracion_ns > t[2]:
+                t[2] = duracion_ns
+
+    def informe(self) -> dict:
+        return {
+            "tiempos": {
+                nombre: {"llamadas": n, "total_ms": total / 1e6, "max_ms": maximo / 1e6}
+                for nombre, (n, total, maximo) in sorted(self.tiempos.items())
+            },
+            "contadores": dict(sorted(self.contadores.items())),
+        }
+
+    def exportar_json(self, ruta: str):
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.informe(), f, indent=2)
+
+    def exportar_chrome(self, ruta: str):
+        """Fichero de trace events (chrome://tracing, Perfetto): una 'X' por sección y los contadores al final."""
+        pid = os.getpid()
+        eventos = [
+            {"name": nombre, "ph": "X", "pid": pid, "tid": 0,
+             "ts": (inicio - self.inicio_ns) / 1000, "dur": duracion / 1000}
+            for nombre, inicio, duracion in self.trazas
+        ]
+        fin = (time.perf_counter_ns() - self.inicio_ns) / 1000
+        eventos.extend({"name": nombre, "ph": "C", "pid": pid, "tid": 0, "ts": fin, "args": {"valor": valor}}
+                       for nombre, valor in sorted(self.contadores.items()))
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f)
+
+
+_perfil: Optional[Perfil] = None
+
+
+def activar(perfil: Optional[Perfil] = None) -> Perfil:
+    """Empieza a registrar (en 'perfil' o en uno nuevo) y lo devuelve."""
+    global ACTIVO, _perfil
+    _perfil = perfil if perfil is not None else Perfil()
+    ACTIVO = True
+    return _perfil
+
+
+def desactivar() -> Optional[Perfil]:
+    """Deja de registrar; devuelve el perfil con lo registrado."""
+    global ACTIVO
+    ACTIVO = False
+    return _perfil
+
+
+def actual() -> Optional[Perfil]:
+    return _perfil
+
+
+def contar(nombre: str, n: int = 1):
+    if ACTIVO:
+        _perfil.contadores[nombre] = _perfil.contadores.get(nombre, 0) + n
+
+
+def maximo(nombre: str, valor: int):
+    if ACTIVO and valor > _perfil.contadores.get(nombre, valor - 1):
+        _perfil.contadores[nombre] = valor
+
+
+def sumar_tiempo(nombre: str, duracion_ns: int, llamadas: int = 1):
+    if ACTIVO:
+        _perfil.sumar_tiempo(nombre, duracion_ns, llamadas)
+
+
+def registrar_seccion(nombre: str, t0_ns: int):
+    """Cierra una sección empezada en t0_ns (time.perf_counter_ns()) sin usar 'with'."""
+    if ACTIVO:
+        duracion = time.perf_counter_ns() - t0_ns
+        _perfil.sumar_tiempo(nombre, duracion)
+        _perfil.trazas.append((nombre, t0_ns, duracion))
+
+
+class _Seccion:
+    __slots__ = ("nombre", "t0")
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        duracion = time.perf_counter_ns() - self.t0
+        if _perfil is not None:
+            _perfil.sumar_tiempo(self.nombre, duracion)
+            _perfil.trazas.append((self.nombre, self.t0, duracion))
+        return False
+
+
+class _SeccionNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULA = _SeccionNula()
+
+
+def seccion(nombre: str):
+    """with perfil.seccion("fase"): ... mide la fase si la instrumentación está activa."""
+    return _Seccion(nombre) if ACTIVO else _NULA
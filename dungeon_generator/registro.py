@@ -0,0 +1,52 @@
+from __future__ import annotations
+from typing import Iterator, List, Tuple
+
+# Registro de combate estructurado: cada golpe se anota como una tupla (código, datos...)
+# y el texto en español solo se compone cuando alguien lo muestra (str(), lineas()).
+
+EV_INICIO, EV_INICIO_JEFE, EV_GOLPE_JUGADOR, EV_GOLPE_ENEMIGO, \
+    EV_VICTORIA, EV_VICTORIA_JEFE, EV_DERROTA, EV_DERROTA_JEFE = range(8)
+
+_PLANTILLAS = {
+    EV_INICIO: "Comienza el combate contra {0} (PV enemigo: {1}).",
+    EV_INICIO_JEFE: "Enfrentas al jefe {0} (PV: {1}).",
+    EV_GOLPE_JUGADOR: "Atacas y haces {0} de daño (enemigo {1} PV).",
+    EV_GOLPE_ENEMIGO: "{0} te golpea por {1} (tus PV {2}).",
+    EV_VICTORIA: "Has derrotado a {0}.",
+    EV_VICTORIA_JEFE: "Has derrotado al jefe {0} y obtienes {1.nombre}!",
+    EV_DERROTA: "Has sido derrotado.",
+    EV_DERROTA_JEFE: "Has sido derrotado por el jefe.",
+}
+
+
+def formatear_evento(evento: Tuple) -> str:
+    """Texto de un evento; las vidas se guardan sin recortar y aquí se muestran como mínimo 0."""
+    datos = [max(0, d) if type(d) is int else d for d in evento[1:]]
+    return _PLANTILLAS[evento[0]].format(*datos)
+
+
+class RegistroCombate:
+    """
+    Eventos de un combate en orden. Es lo que devuelven Monstruo/Jefe.interactuar():
+    se puede imprimir o añadir al log como un texto, pero el formateo ocurre al mostrarlo.
+    """
+
+    __slots__ = ("eventos",)
+
+    def __init__(self):
+        self.eventos: List[Tuple] = []
+
+    def __iter__(self) -> Iterator[Tuple]:
+        return iter(self.eventos)
+
+    def __len__(self) -> int:
+        return len(self.eventos)
+
+    def lineas(self) -> List[str]:
+        return [formatear_evento(e) for e in self.eventos]
+
+    def __str__(self) -> str:
+        return "\n".join(self.lineas())
+
+    def __repr__(self) -> str:
+        return f"RegistroCombate(eventos={len(self.eventos)})"
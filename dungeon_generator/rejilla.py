@@ -0,0 +1,349 @@
+from __future__ import annotations
+from array import array
+from collections import deque
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, Optional, Tuple
+from .habitacion import Habitacion, DIRECCIONES, DIR_DELTAS, DIR_OPUESTA
+from .contenido import ContenidoHabitacion, TIPOS_CONTENIDO, codigo_de_contenido
+
+# Backend compacto de Mapa.habitaciones: todo en buffers planos indexados por y*ancho+x.
+# Las Habitacion se materializan como vistas ligeras solo cuando alguien las pide.
+
+DIR_BITS: Dict[str, int] = {d: 1 << i for i, d in enumerate(DIRECCIONES)}
+
+
+class _ConexionesCompactas(MutableMapping):
+    """Vista dict-like de las conexiones de una celda (bitmask N/S/E/W)."""
+
+    __slots__ = ("_rejilla", "_idx")
+
+    def __init__(self, rejilla: "HabitacionesCompactas", idx: int):
+        self._rejilla = rejilla
+        self._idx = idx
+
+    def __getitem__(self, direccion: str) -> "HabitacionCompacta":
+        bit = DIR_BITS.get(direccion, 0)
+        if not (self._rejilla.conexiones[self._idx] & bit):
+            raise KeyError(direccion)
+        return self._rejilla.vista(self._rejilla.indice_vecino(self._idx, direccion))
+
+    def __setitem__(self, direccion: str, otra: Habitacion):
+        if direccion not in DIR_BITS:
+            raise ValueError(f"Dirección inválida: {direccion}")
+        vecino = self._rejilla.indice_vecino(self._idx, direccion)
+        if vecino is None or self._rejilla.coord(vecino) != tuple(otra.pos):
+            raise ValueError("El backend compacto solo admite conexiones entre celdas adyacentes")
+        self._rejilla._poner_bit(self._idx, DIR_BITS[direccion])
+        self._rejilla._poner_bit(vecino, DIR_BITS[DIR_OPUESTA[direccion]])
+
+    def __delitem__(self, direccion: str):
+        bit = DIR_BITS.get(direccion, 0)
+        if not (self._rejilla.conexiones[self._idx] & bit):
+            raise KeyError(direccion)
+        vecino = self._rejilla.indice_vecino(self._idx, direccion)
+        self._rejilla._quitar_bit(self._idx, bit)
+        self._rejilla._quitar_bit(vecino, DIR_BITS[DIR_OPUESTA[direccion]])
+
+    def __iter__(self) -> Iterator[str]:
+        mask = self._rejilla.conexiones[self._idx]
+        return (d for d, bit in DIR_BITS.items() if mask & bit)
+
+    def __len__(self) -> int:
+        return self._rejilla.conexiones[self._idx].bit_count()
+
+    def __contains__(self, direccion) -> bool:
+        return bool(self._rejilla.conexiones[self._idx] & DIR_BITS.get(direccion, 0))
+
+
+class HabitacionCompacta(Habitacion):
+    """
+    Vista de una celda de HabitacionesCompactas con la misma interfaz que Habitacion.
+    No guarda estado propio: leer o escribir atributos va directo a los buffers.
+    """
+
+    __slots__ = ("_rejilla", "_idx")
+
+    def __init__(self, rejilla: "HabitacionesCompactas", idx: int):
+        self._rejilla = rejilla
+        self._idx = idx
+
+    @property
+    def id(self) -> int:
+        return self._rejilla.ids[self._idx]
+
+    @property
+    def pos(self) -> Tuple[int, int]:
+        return self._rejilla.coord(self._idx)
+
+    @property
+    def inicial(self) -> bool:
+        return self._rejilla.inicio == self._idx
+
+    @inicial.setter
+    def inicial(self, valor: bool):
+        if valor:
+            self._rejilla.inicio = self._idx
+        elif self._rejilla.inicio == self._idx:
+            self._rejilla.inicio = -1
+
+    @property
+    def visitada(self) -> bool:
+        return bool(self._rejilla.visitadas[self._idx])
+
+    @visitada.setter
+    def visitada(self, valor: bool):
+        valor = 1 if valor else 0
+        if self._rejilla.visitadas[self._idx] != valor:
+            self._rejilla.visitadas[self._idx] = valor
+            self._rejilla._avisar_cambio(self._idx)
+
+    @property
+    def contenido(self) -> Optional[ContenidoHabitacion]:
+        return self._rejilla.contenidos.get(self._idx)
+
+    @contenido.setter
+    def contenido(self, valor: Optional[ContenidoHabitacion]):
+        self._rejilla.asignar_contenido(self._idx, valor)
+
+    @property
+    def conexiones(self) -> _ConexionesCompactas:
+        return _ConexionesCompactas(self._rejilla, self._idx)
+
+    @property
+    def _mapa(self):
+        return self._rejilla.mapa
+
+    def _avisar_cambio_conexiones(self, delta: int = 0):
+        # en el backend compacto los avisos salen de los propios bits (_poner_bit/_quitar_bit)
+        pass
+
+    def __eq__(self, otra) -> bool:
+        if isinstance(otra, HabitacionCompacta):
+            return otra._rejilla is self._rejilla and otra._idx == self._idx
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._idx)
+
+
+class HabitacionesCompactas(MutableMapping):
+    """
+    Sustituto de Dict[Tuple[int,int], Habitacion] respaldado por arrays planos:
+    - existe / visitadas: 1 byte por celda
+    - ids: int32 por celda (-1 si no hay habitación)
+    - conexiones: bitmask N/S/E/W (4 bits) por celda
+    - tipos: código de contenido por celda (ver TIPOS_CONTENIDO)
+    Los objetos de contenido viven en una tabla lateral {indice: contenido}.
+    """
+
+    def __init__(self, ancho: int, alto: int, mapa=None):
+        self.ancho = ancho
+        self.alto = alto
+        self.mapa = mapa  # Mapa dueño; recibe los avisos de cambios de conexiones
+        self.clear()
+
+    @classmethod
+    def desde_buffers(cls, ancho: int, alto: int, *, existe, visitadas, conexiones, tipos, ids,
+                      contenidos, inicio: int, n: int, mapa=None, respaldo=None) -> "HabitacionesCompactas":
+        """
+        Crea la rejilla sobre buffers ya existentes (p. ej. memoryviews de un mmap) sin copiarlos.
+        'contenidos' puede ser cualquier MutableMapping {indice: contenido}; 'respaldo' es el
+        objeto que debe seguir vivo mientras se usen los buffers.
+        """
+        rejilla = cls.__new__(cls)
+        rejilla.ancho = ancho
+        rejilla.alto = alto
+        rejilla.mapa = mapa
+        rejilla.existe = existe
+        rejilla.visitadas = visitadas
+        rejilla.conexiones = conexiones
+        rejilla.tipos = tipos
+        rejilla.ids = ids
+        rejilla.contenidos = contenidos
+        rejilla.inicio = inicio
+        rejilla._n = n
+        rejilla._respaldo = respaldo
+        return rejilla
+
+    def clear(self):
+        n = self.ancho * self.alto
+        self.existe = bytearray(n)
+        self.visitadas = bytearray(n)
+        self.conexiones = bytearray(n)
+        self.tipos = bytearray(n)
+        self.ids = array("i", [-1]) * n
+        self.contenidos: Dict[int, ContenidoHabitacion] = {}
+        self.inicio = -1
+        self._n = 0
+        self._respaldo = None
+        if getattr(self, "mapa", None) is not None:
+            self.mapa._conexiones_cambiadas(None)
+
+    def poblar(self, celdas, mascaras):
+        """
+        Vacía la rejilla y crea de golpe una habitación en cada índice de 'celdas' (ids 0..n-1
+        en ese orden; la primera es la inicial) con las conexiones de mascaras[celda].
+        Un aviso al mapa por habitación en lugar de uno por cada lado de cada pasillo.
+        """
+        self.clear()
+        existe, ids = self.existe, self.ids
+        for i, celda in enumerate(celdas):
+            existe[celda] = 1
+            ids[celda] = i
+        self.conexiones = bytearray(mascaras)
+        self.inicio = celdas[0] if celdas else -1
+        self._n = len(celdas)
+        if self.mapa is not None:
+            ancho, conexiones = self.ancho, self.conexiones
+            for celda in celdas:
+                self.mapa._habitacion_agregada((celda % ancho, celda // ancho), 0, conexiones[celda].bit_count())
+
+    # --- indexado ---
+    def indice(self, coord) -> Optional[int]:
+        x, y = coord
+        if 0 <= x < self.ancho and 0 <= y < self.alto:
+            return y * self.ancho + x
+        return None
+
+    def coord(self, idx: int) -> Tuple[int, int]:
+        return (idx % self.ancho, idx // self.ancho)
+
+    def indice_vecino(self, idx: int, direccion: str) -> Optional[int]:
+        dx, dy = DIR_DELTAS[direccion]
+        return self.indice((idx % self.ancho + dx, idx // self.ancho + dy))
+
+    def id_de(self, coord) -> int:
+        return self.ids[self.indice(coord)]
+
+    def vista(self, idx: int) -> HabitacionCompacta:
+        return HabitacionCompacta(self, idx)
+
+    def asignar_contenido(self, idx: int, contenido: Optional[ContenidoHabitacion]):
+        if contenido is None:
+            self.contenidos.pop(idx, None)
+        else:
+            self.contenidos[idx] = contenido
+        antes = self.tipos[idx]
+        codigo = codigo_de_contenido(contenido)
+        self.tipos[idx] = codigo
+        if self.mapa is not None and self.existe[idx]:
+            self.mapa._contenido_cambiado(self.coord(idx), antes, codigo)
+
+    def _poner_bit(self, idx: int, bit: int):
+        if not self.conexiones[idx] & bit:
+            self.conexiones[idx] |= bit
+            if self.mapa is not None and self.existe[idx]:
+                self.mapa._conexiones_cambiadas(self.coord(idx), 1)
+
+    def _quitar_bit(self, idx: int, bit: int):
+        if self.conexiones[idx] & bit:
+            self.conexiones[idx] &= ~bit & 0xF
+            if self.mapa is not None and self.existe[idx]:
+                self.mapa._conexiones_cambiadas(self.coord(idx), -1)
+
+    def _avisar_cambio(self, idx: int):
+        if self.mapa is not None:
+            self.mapa._marcar_sucia(self.coord(idx))
+
+    # --- interfaz de diccionario ---
+    def __getitem__(self, coord) -> HabitacionCompacta:
+        idx = self.indice(coord)
+        if idx is None or not self.existe[idx]:
+            raise KeyError(coord)
+        return HabitacionCompacta(self, idx)
+
+    def __setitem__(self, coord, hab: Habitacion):
+        """Vuelca una Habitacion (normal o vista) en los buffers."""
+        idx = self.indice(coord)
+        if idx is None:
+            raise KeyError(coord)
+        if not self.existe[idx]:
+            self.existe[idx] = 1
+            self._n += 1
+            if self.mapa is not None:
+                self.mapa._habitacion_agregada(coord, self.tipos[idx], self.conexiones[idx].bit_count())
+        else:
+            self._avisar_cambio(idx)
+        self.ids[idx] = hab.id
+        self.visitadas[idx] = 1 if hab.visitada else 0
+        if hab.inicial:
+            self.inicio = idx
+        contenido = hab.contenido
+        if contenido is not None or self.tipos[idx]:
+            self.asignar_contenido(idx, contenido)
+        celda = self.conexiones_de(idx)
+        for direccion, otra in list(hab.conexiones.items()):
+            if direccion not in celda:
+                celda[direccion] = otra
+
+    def __delitem__(self, coord):
+        idx = self.indice(coord)
+        if idx is None or not self.existe[idx]:
+            raise KeyError(coord)
+        celda = self.conexiones_de(idx)
+        for direccion in list(celda):
+            del celda[direccion]
+        self.asignar_contenido(idx, None)
+        self.existe[idx] = 0
+        self.visitadas[idx] = 0
+        if self.mapa is not None:
+            self.mapa._habitacion_quitada(coord, 0, 0)
+        self.ids[idx] = -1
+        if self.inicio == idx:
+            self.inicio = -1
+        self._n -= 1
+
+    def __contains__(self, coord) -> bool:
+        try:
+            idx = self.indice(coord)
+        except (TypeError, ValueError):
+            return False
+        return idx is not None and bool(self.existe[idx])
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        ancho = self.ancho
+        existe = self.existe
+        return ((i % ancho, i // ancho) for i in range(len(existe)) if existe[i])
+
+    def __len__(self) -> int:
+        return self._n
+
+    def conexiones_de(self, idx: int) -> _ConexionesCompactas:
+        return _ConexionesCompactas(self, idx)
+
+    # --- consultas directas sobre los buffers ---
+    def contar_alcanzables(self, coord) -> int:
+        """BFS sobre las bitmasks, sin materializar Habitacion."""
+        inicio = self.indice(coord)
+        if inicio is None or not self.existe[inicio]:
+            return 0
+        ancho = self.ancho
+        pasos = [(DIR_BITS[d], dy * ancho + dx) for d, (dx, dy) in DIR_DELTAS.items()]
+        conexiones = self.conexiones
+        visto = bytearray(len(conexiones))
+        visto[inicio] = 1
+        q = deque([inicio])
+        total = 1
+        while q:
+            idx = q.popleft()
+            mask = conexiones[idx]
+            for bit, paso in pasos:
+                if mask & bit:
+                    otro = idx + paso
+                    if not visto[otro]:
+                        visto[otro] = 1
+                        total += 1
+                        q.append(otro)
+        return total
+
+    def contar_tipos(self) -> Dict[Optional[str], int]:
+        """Número de habitaciones por tipo de contenido (None = vacías)."""
+        conteos = {t: 0 for t in TIPOS_CONTENIDO}
+        for idx in range(len(self.existe)):
+            if self.existe[idx]:
+                conteos[TIPOS_CONTENIDO[self.tipos[idx]]] += 1
+        return conteos
+
+    def total_conexiones(self) -> int:
+        """Suma de len(conexiones) de todas las habitaciones."""
+        return sum(m.bit_count() for m in self.conexiones)
@@ -2,46 +2,121 @@ import json
 from typing import Tuple
 from .mapa import Mapa
 from .explorador import Explorador
+from .habitacion import Habitacion
 from .contenido import contenido_from_dict
 from .objetos import Objeto
 from pathlib import Path
 
+FORMATO_JSONL = "dungeon-jsonl"
+VERSION_JSONL = 1
 
-def guardar_partida(mapa: Mapa, explorador: Explorador, archivo: str) -> None:
-    """
-    Guarda el estado completo (mapa + explorador) en JSON.
-    Ignora entradas None en el inventario para evitar errores.
-    """
+
+FORMATOS = ("json", "jsonl", "bin")
+_EXTENSIONES = {".jsonl": "jsonl", ".bin": "bin"}
+
+
+def _formato_de(archivo: str, formato: str) -> str:
+    if formato == "auto":
+        return _EXTENSIONES.get(Path(archivo).suffix, "json")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de guardado desconocido: {formato}")
+    return formato
+
+
+def _explorador_a_dict(explorador: Explorador) -> dict:
     # Serializar inventario 
     inventario_serializado = []
     for obj in explorador.inventario:
         if obj is None:
             continue
         inventario_serializado.append(obj.to_dict())
+    return {
+        "vida": explorador.vida,
+        "posicion": list(explorador.posicion_actual),
+        "inventario": inventario_serializado
+    }
+
+
+def _explorador_desde_dict(mapa: Mapa, exp_data: dict) -> Explorador:
+    posicion = tuple(exp_data.get("posicion", mapa.habitacion_inicial.pos))
+    explorador = Explorador(mapa, posicion=posicion, vida=int(exp_data.get("vida", 5)))
+
+    invent = []
+    for o in exp_data.get("inventario", []):
+        try:
+            invent.append(Objeto.from_dict(o))
+        except Exception:
+            continue
+    explorador.inventario = invent
+    return explorador
+
+
+def guardar_partida(mapa: Mapa, explorador: Explorador, archivo: str, formato: str = "auto") -> None:
+    """
+    Guarda el estado completo (mapa + explorador) en JSON.
+    Ignora entradas None en el inventario para evitar errores.
+    formato: "json" (un documento), "jsonl" (streaming, ver guardar_partida_jsonl),
+    "bin" (binario con mmap, ver binario.py) o "auto" (según la extensión .jsonl / .bin).
+    """
+    formato = _formato_de(archivo, formato)
+    if formato == "jsonl":
+        guardar_partida_jsonl(mapa, explorador, archivo)
+        return
+    if formato == "bin":
+        from .binario import guardar_partida_binaria
+        guardar_partida_binaria(mapa, explorador, archivo)
+        return
 
     data = {
         "mapa": mapa.to_dict(),
-        "explorador": {
-            "vida": explorador.vida,
-            "posicion": list(explorador.posicion_actual),
-            "inventario": inventario_serializado
-        }
+        "explorador": _explorador_a_dict(explorador)
     }
     p = Path(archivo)
     p.write_text(json.dumps(data, indent=2), encoding="utf-8")
 
 
-def cargar_partida(archivo: str) -> Tuple[Mapa, Explorador]:
+def guardar_partida_jsonl(mapa: Mapa, explorador: Explorador, archivo: str) -> None:
+    """
+    Guarda la partida en JSON Lines sin construir el documento entero en memoria:
+    - línea 1: cabecera {"formato", "version", "ancho", "alto", "inicio", "habitaciones": n, "explorador"}
+    - una línea por habitación (Habitacion.to_dict()).
+    """
+    cabecera = {
+        "formato": FORMATO_JSONL,
+        "version": VERSION_JSONL,
+        "ancho": mapa.ancho,
+        "alto": mapa.alto,
+        "inicio": list(mapa.habitacion_inicial.pos) if mapa.habitacion_inicial else None,
+        "habitaciones": len(mapa.habitaciones),
+        "explorador": _explorador_a_dict(explorador),
+    }
+    with open(archivo, "w", encoding="utf-8") as f:
+        f.write(json.dumps(cabecera, separators=(",", ":")))
+        f.write("\n")
+        for hab in mapa.habitaciones.values():
+            f.write(json.dumps(hab.to_dict(), separators=(",", ":")))
+            f.write("\n")
+
+
+def cargar_partida(archivo: str, formato: str = "auto", backend: str = "dict") -> Tuple[Mapa, Explorador]:
     """
     Carga la partida desde JSON y reconstruye Mapa y Explorador.
     Retorna (mapa, explorador).
+    Las partidas "bin" siempre se abren con el backend compacto (mmap, carga perezosa).
     """
+    formato = _formato_de(archivo, formato)
+    if formato == "jsonl":
+        return cargar_partida_jsonl(archivo, backend=backend)
+    if formato == "bin":
+        from .binario import cargar_partida_binaria
+        return cargar_partida_binaria(archivo)
+
     p = Path(archivo)
     text = p.read_text(encoding="utf-8")
     data = json.loads(text)
 
     mapa_dict = data["mapa"]
-    mapa = Mapa.from_dict(mapa_dict)
+    mapa = Mapa.from_dict(mapa_dict, backend=backend)
 
     for h in mapa_dict.get("habitaciones", []):
         cont = h.get("contenido")
@@ -53,16 +128,47 @@ def cargar_partida(archivo: str) -> Tuple[Mapa, Explorador]:
                 except Exception:
                     mapa.habitaciones[coord].contenido = None
 
-    exp_data = data.get("explorador", {})
-    posicion = tuple(exp_data.get("posicion", mapa.habitacion_inicial.pos))
-    explorador = Explorador(mapa, posicion=posicion, vida=int(exp_data.get("vida", 5)))
+    explorador = _explorador_desde_dict(mapa, data.get("explorador", {}))
+    return mapa, explorador
 
-    invent = []
-    for o in exp_data.get("inventario", []):
-        try:
-            invent.append(Objeto.from_dict(o))
-        except Exception:
-            continue
-    explorador.inventario = invent
 
+def cargar_partida_jsonl(archivo: str, backend: str = "dict") -> Tuple[Mapa, Explorador]:
+    """
+    Carga una partida guardada con guardar_partida_jsonl en una sola pasada:
+    cada habitación se crea al leer su línea y se conecta con los vecinos ya cargados
+    (las conexiones están en ambos extremos, así que el último en llegar cierra el enlace).
+    """
+    with open(archivo, "r", encoding="utf-8") as f:
+        cabecera = json.loads(f.readline())
+        if cabecera.get("formato") != FORMATO_JSONL:
+            raise ValueError(f"{archivo} no es una partida {FORMATO_JSONL}")
+        if cabecera.get("version", 0) > VERSION_JSONL:
+            raise ValueError(f"Versión de partida no soportada: {cabecera.get('version')}")
+
+        mapa = Mapa(cabecera["ancho"], cabecera["alto"], backend=backend)
+        habitaciones = mapa.habitaciones
+        for linea in f:
+            if not linea.strip():
+                continue
+            h = json.loads(linea)
+            coord = tuple(h["pos"])
+            hab = Habitacion.from_dict(h)
+            cont = h.get("contenido")
+            if cont is not None:
+                try:
+                    hab.contenido = contenido_from_dict(cont)
+                except Exception:
+                    hab.contenido = None
+            habitaciones[coord] = hab
+            hab_obj = habitaciones[coord]
+            mapa._next_id = max(mapa._next_id, hab.id + 1)
+            for dir_, coord_other in h.get("conexiones", {}).items():
+                coord_other_t = tuple(coord_other)
+                if coord_other_t in habitaciones and dir_ not in hab_obj.conexiones:
+                    hab_obj.conectar(dir_, habitaciones[coord_other_t])
+
+    inicio_coord = cabecera.get("inicio")
+    if inicio_coord:
+        mapa.habitacion_inicial = habitaciones[tuple(inicio_coord)]
+    explorador = _explorador_desde_dict(mapa, cabecera.get("explorador", {}))
     return mapa, explorador
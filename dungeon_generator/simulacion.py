@@ -0,0 +1,258 @@
+from __future__ import annotations
+import random
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional, Sequence
+from .contenido import Tesoro, Monstruo, Jefe, Evento, codigo_de_contenido
+from .combate import distribucion_jefe, distribucion_monstruo
+
+# Simulación sin interfaz: partidas completas sobre una copia numérica del mapa, sin
+# Habitacion/Explorador, sin formatear textos ni imprimir. Las reglas (daño, turnos,
+# efectos de eventos, buffs por habitación) son las de contenido.py y explorador.py;
+# el inventario solo se suma como valor (no se equipa ni se usa nada).
+
+ResultadoSimulacion = namedtuple(
+    "ResultadoSimulacion", ("sobrevive", "turnos", "danio", "valor_botin", "visitadas", "derrotados")
+)
+
+# códigos de contenido (TIPOS_CONTENIDO)
+_TESORO, _MONSTRUO, _JEFE = 1, 2, 3
+# efectos de evento ya decodificados
+EF_NADA, EF_CURAR, EF_TRAMPA, EF_TELEPORT, EF_BUFF, EF_ATAQUE = range(6)
+
+POLITICAS = ("aleatoria", "tesoro", "limpiar")
+# "turnos": combate golpe a golpe; "muestreo": un resultado de la distribución exacta (combate.py)
+MODOS_COMBATE = ("turnos", "muestreo")
+
+
+def _efecto_numerico(efecto: dict) -> tuple:
+    tipo = efecto.get("tipo")
+    if tipo == "curar":
+        return (EF_CURAR, int(efecto.get("valor", 5)), 0)
+    if tipo == "trampa":
+        return (EF_TRAMPA, int(efecto.get("valor", 2)), 0)
+    if tipo == "teleport":
+        return (EF_TELEPORT, 1 if efecto.get("auto_explore", False) else 0, 0)
+    if tipo == "buff_por_habitaciones":
+        return (EF_BUFF, int(efecto.get("ataque", 1)), int(efecto.get("habitaciones", 1)))
+    if tipo == "modificar_ataque":
+        delta = int(efecto.get("delta", 0))
+        modo = efecto.get("modo", "permanente")
+        if modo == "permanente":
+            return (EF_ATAQUE, delta, 0)
+        if modo == "temporal_habitaciones":
+            return (EF_BUFF, delta, int(efecto.get("habitaciones", 1)))
+    return (EF_NADA, 0, 0)
+
+
+class MapaSimulacion:
+    """
+    Copia numérica de un Mapa: habitaciones numeradas 0..n-1 (las de Mapa.adyacencia()),
+    lista de vecinos por índice y el contenido en listas paralelas (tipo, vida, ataque, valor, efecto).
+    Se construye una vez y se reutiliza en todas las partidas simuladas.
+    """
+
+    __slots__ = ("coords", "vecinos", "tipo", "vida", "ataque", "valor", "efecto", "inicio")
+
+    def __init__(self, mapa):
+        ady = mapa.adyacencia()
+        self.coords = ady.coords
+        n = len(self.coords)
+        inicio, vecinos = ady.inicio, ady.vecinos
+        self.vecinos: List[tuple] = [tuple(vecinos[inicio[i]:inicio[i + 1]]) for i in range(n)]
+        self.tipo = bytearray(n)
+        self.vida = [0] * n
+        self.ataque = [0] * n
+        self.valor = [0] * n
+        self.efecto: List[tuple] = [(EF_NADA, 0, 0)] * n
+        for i, coord in enumerate(self.coords):
+            hab = mapa.habitaciones[coord]
+            contenido = hab.contenido
+            self.tipo[i] = codigo_de_contenido(contenido)
+            if isinstance(contenido, Tesoro):
+                self.valor[i] = int(contenido.recompensa.valor)
+            elif isinstance(contenido, Monstruo):
+                self.vida[i] = contenido.vida
+                self.ataque[i] = contenido.ataque
+                if isinstance(contenido, Jefe):
+                    self.valor[i] = int(contenido.recompensa_especial.valor)
+            elif isinstance(contenido, Evento):
+                self.efecto[i] = _efecto_numerico(contenido.efecto or {})
+        inicio = mapa.habitacion_inicial
+        self.inicio = ady.indice_de(inicio.pos) if inicio is not None else 0
+
+
+def _combate_monstruo(aleatorio: Callable[[], float], ataque: int, vida: int, vida_m: int, ataque_m: int) -> int:
+    """Monstruo.interactuar sin log: devuelve la vida final del jugador (0 si muere)."""
+    minimo = max(1, ataque - 1)
+    rango = ataque + 1 - minimo + 1
+    turno_jugador = aleatorio() < 0.5
+    while vida_m > 0 and vida > 0:
+        if turno_jugador:
+            vida_m -= minimo + int(aleatorio() * rango)
+        else:
+            vida -= 1 + int(aleatorio() * ataque_m)
+        turno_jugador = not turno_jugador
+    return max(0, vida)
+
+
+def _combate_jefe(aleatorio: Callable[[], float], vida: int, vida_m: int, ataque_m: int) -> int:
+    """Jefe.interactuar sin log (el daño del jugador depende solo del ataque del jefe)."""
+    rango_jugador = 2 + int(ataque_m / 2)
+    turno_jugador = aleatorio() < 0.35
+    while vida_m > 0 and vida > 0:
+        if turno_jugador:
+            vida_m -= 1 + int(aleatorio() * rango_jugador)
+        else:
+            vida -= 1 + int(aleatorio() * ataque_m)
+        turno_jugador = not turno_jugador
+    return max(0, vida)
+
+
+def _camino_mas_cercano(vecinos: Sequence[tuple], origen: int, objetivo: bytearray) -> Optional[List[int]]:
+    """BFS hasta la habitación más cercana con objetivo[i]; devuelve el camino al revés (para pop())."""
+    prev = {origen: -1}
+    frontera = [origen]
+    while frontera:
+        siguiente = []
+        for cur in frontera:
+            for otro in vecinos[cur]:
+                if otro in prev:
+                    continue
+                prev[otro] = cur
+                if objetivo[otro]:
+                    camino = []
+                    while otro != origen:
+                        camino.append(otro)
+                        otro = prev[otro]
+                    return camino
+                siguiente.append(otro)
+        frontera = siguiente
+    return None
+
+
+def simular(ms: MapaSimulacion, politica: str = "aleatoria", rng: Optional[random.Random] = None,
+            vida: int = 5, ataque_base: int = 1, max_turnos: int = 200,
+            combate: str = "turnos") -> ResultadoSimulacion:
+    """
+    Una partida completa sobre 'ms' con la política dada:
+    - "aleatoria": cada turno a una habitación vecina al azar
+    - "tesoro": camino más corto al tesoro más cercano que quede
+    - "limpiar": camino más corto a la habitación con contenido más cercana
+    Cada turno es un movimiento; al entrar se explora la habitación (como mover + explorar_habitacion).
+    Termina al morir, cuando la política no tiene objetivo o tras max_turnos.
+    Con combate="muestreo" cada combate es un solo sorteo (mismas probabilidades que "turnos").
+    """
+    if politica not in POLITICAS:
+        raise ValueError(f"Política desconocida: {politica}")
+    if combate not in MODOS_COMBATE:
+        raise ValueError(f"Modo de combate desconocido: {combate}")
+    muestreo = combate == "muestreo"
+    aleatorio = (rng or random.Random()).random
+    vecinos = ms.vecinos
+    n = len(vecinos)
+    presente = bytearray(ms.tipo)
+    if politica == "tesoro":
+        objetivo = bytearray(1 if t == _TESORO else 0 for t in presente)
+    elif politica == "limpiar":
+        objetivo = bytearray(1 if t else 0 for t in presente)
+    else:
+        objetivo = None
+    visitada = bytearray(n)
+    pos = ms.inicio
+    visitada[pos] = 1
+    buffs: List[list] = []
+    turnos = danio = botin = derrotados = 0
+    camino: List[int] = []
+
+    while turnos < max_turnos and vida > 0:
+        if objetivo is None:
+            opciones = vecinos[pos]
+            if not opciones:
+                break
+            pos = opciones[int(aleatorio() * len(opciones))]
+        else:
+            if not camino:
+                camino = _camino_mas_cercano(vecinos, pos, objetivo)
+                if camino is None:
+                    break
+            pos = camino.pop()
+        turnos += 1
+        visitada[pos] = 1
+        if buffs:
+            buffs = [[atk, restantes - 1] for atk, restantes in buffs if restantes > 1]
+
+        profundidad = 0
+        while presente[pos]:
+            tipo = presente[pos]
+            sala = pos
+            seguir = False
+            if tipo == _TESORO:
+                botin += ms.valor[pos]
+            elif tipo == _MONSTRUO or tipo == _JEFE:
+                antes = vida
+                if tipo == _JEFE:
+                    if muestreo:
+                        vida = distribucion_jefe(vida, ms.vida[pos], ms.ataque[pos]).muestrear(aleatorio)[0]
+                    else:
+                        vida = _combate_jefe(aleatorio, vida, ms.vida[pos], ms.ataque[pos])
+                else:
+                    ataque = max(1, ataque_base + sum(atk for atk, _ in buffs))
+                    if muestreo:
+                        vida = distribucion_monstruo(ataque, vida, ms.vida[pos], ms.ataque[pos]).muestrear(aleatorio)[0]
+                    else:
+                        vida = _combate_monstruo(aleatorio, ataque, vida, ms.vida[pos], ms.ataque[pos])
+                danio += antes - vida
+                if vida <= 0:
+                    break  # el monstruo sigue ahí
+                derrotados += 1
+                if tipo == _JEFE:
+                    botin += ms.valor[pos]
+            else:
+                efecto, a, b = ms.efecto[pos]
+                if efecto == EF_CURAR:
+                    vida += a
+                elif efecto == EF_TRAMPA:
+                    nueva = max(0, vida - a)
+                    danio += vida - nueva
+                    vida = nueva
+                elif efecto == EF_BUFF:
+                    buffs.append([a, b])
+                elif efecto == EF_ATAQUE:
+                    ataque_base += a
+                elif efecto == EF_TELEPORT and n > 1:
+                    destino = int(aleatorio() * (n - 1))
+                    pos = destino + 1 if destino >= sala else destino
+                    visitada[pos] = 1
+                    camino = []
+                    # con auto_explore se explora el destino (máximo 3 saltos encadenados)
+                    seguir = bool(a) and profundidad < 3
+            presente[sala] = 0
+            if objetivo is not None:
+                objetivo[sala] = 0
+            if not seguir or vida <= 0:
+                break
+            profundidad += 1
+
+    return ResultadoSimulacion(vida > 0, turnos, danio, botin, sum(visitada), derrotados)
+
+
+def simular_lote(mapa, n: int, politica: str = "aleatoria", seed: Optional[int] = None,
+                 **kwargs) -> List[ResultadoSimulacion]:
+    """n partidas independientes sobre el mismo mapa (se compila una sola vez)."""
+    ms = mapa if isinstance(mapa, MapaSimulacion) else MapaSimulacion(mapa)
+    rng = random.Random(seed)
+    return [simular(ms, politica, rng, **kwargs) for _ in range(n)]
+
+
+def resumir(resultados: Sequence[ResultadoSimulacion]) -> Dict[str, float]:
+    """Medias de un lote: supervivencia (0-1), turnos, daño, botín, visitadas y derrotados."""
+    total = len(resultados) or 1
+    return {
+        "partidas": len(resultados),
+        "supervivencia": sum(r.sobrevive for r in resultados) / total,
+        "turnos": sum(r.turnos for r in resultados) / total,
+        "danio": sum(r.danio for r in resultados) / total,
+        "valor_botin": sum(r.valor_botin for r in resultados) / total,
+        "visitadas": sum(r.visitadas for r in resultados) / total,
+        "derrotados": sum(r.derrotados for r in resultados) / total,
+    }
@@ -0,0 +1,80 @@
+from __future__ import annotations
+import io
+import sys
+from typing import Optional
+from .contenido import TIPOS_CONTENIDO, codigo_de_contenido
+from .rejilla import HabitacionesCompactas
+
+# Render de texto rápido para mapas grandes: un byte de símbolo por celda (índice y*ancho+x)
+# y el frame entero montado con operaciones sobre bytes, sin un str por celda.
+
+SIN_HABITACION = ord(".")
+SIMBOLO_INICIO = ord("S")
+# símbolo por código de contenido (ver TIPOS_CONTENIDO)
+SIMBOLOS = {None: "0", "tesoro": "T", "monstruo": "M", "jefe": "J", "evento": "E", "otro": "?"}
+SIMBOLO_DE_CODIGO = bytes(ord(SIMBOLOS[t]) for t in TIPOS_CONTENIDO)
+
+# tabla para bytes.translate sobre el plano combinado tipos*2 + existe del backend compacto
+_TABLA_COMPACTA = bytearray([SIN_HABITACION]) * 256
+for _codigo, _simbolo in enumerate(SIMBOLO_DE_CODIGO):
+    _TABLA_COMPACTA[_codigo * 2 + 1] = _simbolo
+_TABLA_COMPACTA = bytes(_TABLA_COMPACTA)
+
+
+def simbolos_de_celdas(mapa) -> bytearray:
+    """
+    Un byte ASCII por celda: '.' sin habitación, 'S' inicio y SIMBOLOS según el contenido.
+    En el backend compacto no se recorre ninguna habitación: los planos 'existe' y 'tipos'
+    se combinan como enteros grandes y se traducen con una sola llamada a translate().
+    """
+    habitaciones = mapa.habitaciones
+    celdas = mapa.ancho * mapa.alto
+    if isinstance(habitaciones, HabitacionesCompactas):
+        combinado = (int.from_bytes(habitaciones.tipos, "little") * 2
+                     + int.from_bytes(habitaciones.existe, "little"))
+        plano = bytearray(combinado.to_bytes(celdas, "little").translate(_TABLA_COMPACTA))
+        if habitaciones.inicio >= 0:
+            plano[habitaciones.inicio] = SIMBOLO_INICIO
+        return plano
+    plano = bytearray([SIN_HABITACION]) * celdas
+    ancho = mapa.ancho
+    for (x, y), hab in habitaciones.items():
+        plano[y * ancho + x] = SIMBOLO_DE_CODIGO[codigo_de_contenido(hab.contenido)]
+    inicio = mapa.habitacion_inicial
+    if inicio is not None:
+        x, y = inicio.pos
+        plano[y * ancho + x] = SIMBOLO_INICIO
+    return plano
+
+
+def frame_de_texto(mapa, separador: bytes = b" ", plano: Optional[bytearray] = None) -> bytes:
+    """
+    Mapa completo como bytes ASCII: una línea por fila, celdas separadas por 'separador'
+    (un byte o b""). El intercalado se hace con asignación por slices, no celda a celda.
+    """
+    if plano is None:
+        plano = simbolos_de_celdas(mapa)
+    ancho = mapa.ancho
+    if separador:
+        ancho_fila = ancho * 2
+        filas = bytearray(separador) * (len(plano) * 2)
+        filas[0::2] = plano
+        for i in range(ancho_fila - 1, len(filas), ancho_fila):
+            filas[i] = 10  # '\n' en lugar del separador del final de cada fila
+        return bytes(filas)
+    return b"".join(plano[i:i + ancho] + b"\n" for i in range(0, len(plano), ancho))
+
+
+def escribir_mapa(mapa, salida=None, separador: bytes = b" ") -> int:
+    """Escribe el frame de texto con una única escritura; devuelve los bytes escritos."""
+    frame = frame_de_texto(mapa, separador)
+    if salida is None:
+        salida = sys.stdout
+    salida.flush()
+    destino = getattr(salida, "buffer", salida)
+    if isinstance(destino, io.TextIOBase):
+        destino.write(frame.decode("ascii"))  # stream de texto sin buffer binario (StringIO)
+    else:
+        destino.write(frame)
+    destino.flush()
+    return len(frame)
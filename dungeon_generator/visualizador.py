@@ -1,16 +1,114 @@
 from __future__ import annotations
+from collections import deque
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 from rich.align import Align
 from rich.box import SIMPLE_HEAVY, ROUNDED
-from typing import Tuple
+from typing import List, Optional, Tuple
 from .mapa import Mapa
 from .explorador import Explorador
+from .texto import escribir_mapa, SIMBOLOS
+from . import perfil
 
 console = Console()
 
+
+class _CacheMinimapa:
+    """
+    Viewport del minimapa entre frames: un segmento (texto, estilo) por celda y la Text
+    ya montada de cada fila. Un paso del explorador desplaza el viewport una fila/columna
+    (se calculan solo las celdas que entran); las habitaciones cambiadas llegan por un
+    seguimiento de cambios del mapa y solo se vuelven a estilar esas celdas.
+    """
+
+    def __init__(self, vis: "Visualizador", vw: int, vh: int, show_all: bool):
+        self.vis = vis
+        self.clave = (vw, vh, show_all, vis.cell_w)
+        self.vw = vw
+        self.vh = vh
+        self.show_all = show_all
+        self.x0: Optional[int] = None
+        self.y0: Optional[int] = None
+        self.celdas: deque = deque()
+        self.filas: deque = deque()
+        self.explorador: Optional[Tuple[int, int]] = None
+        self.seguimiento = vis.mapa.nuevo_seguimiento()
+        self.celdas_calculadas = 0  # celdas estiladas en el último frame
+
+    def cerrar(self):
+        self.vis.mapa.quitar_seguimiento(self.seguimiento)
+
+    def _celda(self, coord) -> Tuple[str, str]:
+        self.celdas_calculadas += 1
+        hab = self.vis.mapa.habitaciones.get(coord)
+        if hab is None:
+            return (" ".center(self.vis.cell_w), "dim")
+        if not self.show_all and not hab.visitada:
+            return ("·".center(self.vis.cell_w), "dim")
+        ch, style = self.vis._style_for_coord(coord)
+        return (ch.center(self.vis.cell_w), style)
+
+    def _fila(self, y: int) -> deque:
+        return deque(self._celda((x, y)) for x in range(self.x0, self.x0 + self.vw))
+
+    def mover_a(self, x0: int, y0: int):
+        if self.x0 is None or abs(x0 - self.x0) > 1 or abs(y0 - self.y0) > 1:
+            self.x0, self.y0 = x0, y0
+            self.celdas = deque(self._fila(y) for y in range(y0, y0 + self.vh))
+            self.filas = deque([None] * self.vh)
+            self.seguimiento.extraer()
+            return
+        if y0 > self.y0:
+            self.y0 = y0
+            self.celdas.popleft(); self.filas.popleft()
+            self.celdas.append(self._fila(y0 + self.vh - 1)); self.filas.append(None)
+        elif y0 < self.y0:
+            self.y0 = y0
+            self.celdas.pop(); self.filas.pop()
+            self.celdas.appendleft(self._fila(y0)); self.filas.appendleft(None)
+        if x0 > self.x0:
+            self.x0 = x0
+            for i, fila in enumerate(self.celdas):
+                fila.popleft()
+                fila.append(self._celda((x0 + self.vw - 1, y0 + i)))
+                self.filas[i] = None
+        elif x0 < self.x0:
+            self.x0 = x0
+            for i, fila in enumerate(self.celdas):
+                fila.pop()
+                fila.appendleft(self._celda((x0, y0 + i)))
+                self.filas[i] = None
+
+    def lineas(self, x0: int, y0: int, explorador: Tuple[int, int]) -> List[Text]:
+        """Text de cada fila del viewport (x0, y0) con el explorador marcado."""
+        self.celdas_calculadas = 0
+        self.mover_a(x0, y0)
+        for x, y in self.seguimiento.extraer():
+            if x0 <= x < x0 + self.vw and y0 <= y < y0 + self.vh:
+                self.celdas[y - y0][x - x0] = self._celda((x, y))
+                self.filas[y - y0] = None
+        for coord in (self.explorador, explorador):
+            if coord is not None and y0 <= coord[1] < y0 + self.vh:
+                self.filas[coord[1] - y0] = None
+        self.explorador = explorador
+        ex, ey = explorador
+        for i in range(self.vh):
+            if self.filas[i] is not None:
+                continue
+            segmentos = list(self.celdas[i])
+            if y0 + i == ey and x0 <= ex < x0 + self.vw:
+                segmentos[ex - x0] = ("X".center(self.vis.cell_w), "bold black on white")
+            partes = []
+            for segmento in segmentos:
+                if partes:
+                    partes.append(" ")
+                partes.append(segmento)
+            self.filas[i] = Text.assemble(*partes)
+        return list(self.filas)
+
+
 class Visualizador:
     TYPE_STYLE = {
         "monstruo": ("M", "bold white on red"),
@@ -31,6 +129,7 @@ class Visualizador:
         minimap_box_height: int = 15,
         cell_w: int = 3,
         cell_h: int = 1,
+        max_celdas_tabla: int = 2500,
     ):
         self.mapa = mapa
         self.show_ids = bool(show_ids)
@@ -39,6 +138,9 @@ class Visualizador:
         self.minimap_box_height = max(5, int(minimap_box_height))
         self.cell_w = max(1, int(cell_w))
         self.cell_h = max(1, int(cell_h))
+        # por encima de este número de celdas el mapa completo se escribe como texto plano
+        self.max_celdas_tabla = int(max_celdas_tabla)
+        self._minimapa: Optional[_CacheMinimapa] = None
 
     def _sym_and_style_for_hab(self, hab):
         """
@@ -82,9 +184,18 @@ class Visualizador:
         return ("o", "bold")
 
     def mostrar_mapa_completo(self) -> None:
+        with perfil.seccion("visualizador/mapa"):
+            self._mostrar_mapa_completo()
+        perfil.contar("visualizador/celdas", self.mapa.ancho * self.mapa.alto)
+
+    def _mostrar_mapa_completo(self) -> None:
         ancho = self.mapa.ancho
         alto = self.mapa.alto
 
+        if ancho * alto > self.max_celdas_tabla:
+            self.mostrar_mapa_texto()
+            return
+
         if self.compact:
             lines = []
             header = "   " + "".join(f"{x:2}" for x in range(ancho))
@@ -140,7 +251,19 @@ class Visualizador:
         console.print(t)
         console.print(Panel(leyenda, style="dim", padding=(0,1)))
 
+    def mostrar_mapa_texto(self) -> None:
+        """Mapa completo sin rich: un símbolo por celda, escrito en bloque (mapas grandes)."""
+        leyenda = "  ".join(f"{sym}={tipo or 'vacía'}" for tipo, sym in SIMBOLOS.items())
+        console.print(Text(f"Mapa completo {self.mapa.ancho}x{self.mapa.alto}  (S=inicio  .=sin habitación  {leyenda})", style="bold"))
+        escribir_mapa(self.mapa, console.file)
+
     def mostrar_minimapa(self, explorador: Explorador, *, show_all: bool = False) -> None:
+        with perfil.seccion("visualizador/minimapa"):
+            self._mostrar_minimapa(explorador, show_all)
+        if perfil.ACTIVO:
+            perfil.contar("visualizador/celdas", self._minimapa.celdas_calculadas)
+
+    def _mostrar_minimapa(self, explorador: Explorador, show_all: bool) -> None:
         ancho_map = self.mapa.ancho
         alto_map = self.mapa.alto
         inner_w = self.minimap_box_width - 2
@@ -158,35 +281,14 @@ class Visualizador:
             x0 = max(0, ancho_map - vw)
         if y0 + vh > alto_map:
             y0 = max(0, alto_map - vh)
-        x1 = x0 + vw - 1
-        y1 = y0 + vh - 1
 
-        from rich.text import Text
+        clave = (vw, vh, show_all, self.cell_w)
+        if self._minimapa is None or self._minimapa.clave != clave:
+            if self._minimapa is not None:
+                self._minimapa.cerrar()
+            self._minimapa = _CacheMinimapa(self, vw, vh, show_all)
         lines = []
-        for row in range(y0, y1 + 1):
-            line_cells = []
-            for col in range(x0, x1 + 1):
-                coord = (col, row)
-                if coord in self.mapa.habitaciones:
-                    hab = self.mapa.habitaciones[coord]
-                    visited = getattr(hab, "visitada", False)
-                    if not show_all and not visited and coord != (ex, ey):
-                        ch = "·".center(self.cell_w)
-                        style = "dim"
-                    else:
-                        ch, style = self._style_for_coord(coord)
-                        ch = ch.center(self.cell_w)
-                else:
-                    ch = " ".center(self.cell_w)
-                    style = "dim"
-                if coord == (ex, ey):
-                    ch = "X".center(self.cell_w)
-                    style = "bold black on white"
-                cell_text = Text(ch, style=style)
-                line_cells.append(cell_text)
-                if col != x1:
-                    line_cells.append(Text(" ", style=""))
-            line = Text.assemble(*line_cells)
+        for line in self._minimapa.lineas(x0, y0, (ex, ey)):
             for _ in range(self.cell_h):
                 lines.append(line)
 
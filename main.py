@@ -1,12 +1,16 @@
 import os
 import sys
 import random
+import shutil
+from collections import deque
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from dungeon_generator.mapa import Mapa
 from dungeon_generator.explorador import Explorador
 from dungeon_generator.contenido import Tesoro, Monstruo, Evento
+from dungeon_generator.pantalla import PantallaDiferencial, VistaMapa, CSI
 try:
     from dungeon_generator.visualizador import Visualizador
     HAS_VIS = True
@@ -15,22 +19,36 @@ except Exception:
     HAS_VIS = False
 try:
     from dungeon_generator.serializacion import guardar_partida, cargar_partida
+    from dungeon_generator.diario import DiarioPartida
     HAS_SERIAL = True
 except Exception:
     guardar_partida = None
     cargar_partida = None
+    DiarioPartida = None
     HAS_SERIAL = False
 
-CLEAR_CMD = "cls" if os.name == "nt" else "clear"
+CLEAR_SCREEN = f"{CSI}H{CSI}2J"
 
 class Controller:
-    def __init__(self, ancho=8, alto=6, habitaciones=18, seed=42):
+    MAX_LOGS = 100
+    LINEAS_LOG = 12
+
+    def __init__(self, ancho=8, alto=6, habitaciones=18, seed=42, autoguardado=False, vista="diferencial"):
         self.ancho = ancho
         self.alto = alto
         self.habitaciones = habitaciones
         self.seed = seed
+        # autoguardado: tras 'guardar', cada movimiento añade un delta al diario de esa partida
+        self.autoguardado = autoguardado
+        self.diario = None
+        self._cambios = None  # seguimiento de habitaciones cambiadas desde el último guardado
+        # vista "diferencial": frame de texto redibujado por diferencias; "rich": paneles del Visualizador
+        self.vista = vista if (vista == "diferencial" or HAS_VIS) else "diferencial"
+        self.pantalla = PantallaDiferencial()
+        self._vista_mapa = None
         self._init_game()
-        self.logs: List[str] = []
+        # últimos mensajes (texto o RegistroCombate); se formatean solo al mostrarlos
+        self.logs = deque(maxlen=self.MAX_LOGS)
         self.save_default = "prueba.json"
 
     def _init_game(self):
@@ -41,17 +59,30 @@ class Controller:
         self.visualizador = Visualizador(self.mapa) if HAS_VIS else None
 
     def reset(self):
+        self._cerrar_diario()
         self._init_game()
-        self.logs = []
+        self.logs.clear()
         self.log("Juego reiniciado.")
 
-    def log(self, msg: str):
+    def log(self, msg):
         self.logs.append(msg)
-        if len(self.logs) > 100:
-            self.logs.pop(0)
+
+    def ultimas_lineas(self, n: Optional[int] = None) -> List[str]:
+        """Texto de los últimos mensajes (n líneas); solo se formatean los que se van a ver."""
+        n = self.LINEAS_LOG if n is None else n
+        lineas: List[str] = []
+        for msg in reversed(self.logs):
+            if len(lineas) >= n:
+                break
+            lineas.extend(reversed(str(msg).split("\n")))
+        return list(islice(lineas, n))[::-1]
 
     def render(self):
-        os.system(CLEAR_CMD)
+        if self.vista == "diferencial":
+            self.pantalla.dibujar(self._frame())
+            return
+        self.pantalla.invalidar()
+        print(CLEAR_SCREEN, end="")
         print("=== Dungeon Project — Consola interactiva ===")
         if self.visualizador:
             self.visualizador.mostrar_mapa_completo()
@@ -75,10 +106,61 @@ class Controller:
             inv = ", ".join([f"[{i}] {getattr(o,'nombre',str(o))}" for i,o in enumerate(self.explorador.inventario)]) or "vacío"
             print("  Inventario:", inv)
         print("\n--- Últimos eventos ---")
-        for l in self.logs[-12:]:
+        for l in self.ultimas_lineas():
             print(l)
         print("\nEscribe 'ayuda' para ver comandos.")
 
+    def _frame(self) -> List[str]:
+        """Líneas de la vista diferencial; el mapa es una ventana que cabe en la terminal."""
+        columnas, filas = shutil.get_terminal_size()
+        resto = 22  # cabecera, estado, eventos y prompt
+        if self._vista_mapa is None or self._vista_mapa.mapa is not self.mapa:
+            if self._vista_mapa is not None:
+                self._vista_mapa.cerrar()
+            self._vista_mapa = VistaMapa(self.mapa, (columnas - 1) // 2, max(5, filas - resto))
+        exp = self.explorador
+        lineas = ["=== Dungeon Project — Consola interactiva ==="]
+        lineas.extend(self._vista_mapa.filas(exp.posicion_actual))
+        inv = ", ".join([f"[{i}] {getattr(o,'nombre',str(o))}" for i,o in enumerate(exp.inventario)]) or "vacío"
+        lineas += [
+            "",
+            f"Pos: {exp.posicion_actual}  Vida: {exp.vida}  Ataque: {exp.calcular_ataque()}",
+            f"Inventario: {inv}",
+            "X=tú S=inicio *=recorrida 0=sin visitar T=tesoro M=monstruo J=jefe E=evento",
+            "--- Últimos eventos ---",
+        ]
+        ultimos = self.ultimas_lineas()
+        lineas += ultimos + [""] * (self.LINEAS_LOG - len(ultimos))
+        lineas.append("Escribe 'ayuda' para ver comandos.")
+        return [l[:columnas - 1] for l in lineas]
+
+    def _registrar_cambios(self):
+        """Añade al diario las habitaciones y el explorador cambiados (si los hay)."""
+        explorador_sucio = self.explorador.extraer_sucio()
+        if not self._cambios and not explorador_sucio:
+            return False
+        self.diario.registrar(self.mapa, self.explorador, self._cambios.extraer())
+        return True
+
+    def _autoguardar(self):
+        if self.autoguardado and self.diario is not None:
+            self._registrar_cambios()
+
+    def _abrir_diario(self, ruta):
+        self._cerrar_diario()
+        self.diario = DiarioPartida(ruta)
+        self.diario.checkpoint(self.mapa, self.explorador)
+        self._cambios = self.mapa.nuevo_seguimiento()
+        self.explorador.extraer_sucio()
+
+    def _cerrar_diario(self):
+        if self.diario is not None:
+            self.diario.cerrar()
+            self.diario = None
+        if self._cambios is not None:
+            self.mapa.quitar_seguimiento(self._cambios)
+            self._cambios = None
+
     def cmd_mover(self):
         hab = self.mapa.habitaciones.get(tuple(self.explorador.posicion_actual))
         if not hab:
@@ -98,6 +180,7 @@ class Controller:
         if hab2 and hab2.contenido:
             res = self.explorador.explorar_habitacion()
             self.log(res)
+        self._autoguardar()
 
     def cmd_ir(self, x:int, y:int):
         dest = (int(x), int(y))
@@ -118,6 +201,7 @@ class Controller:
             if hab and hab.contenido:
                 res = self.explorador.explorar_habitacion()
                 self.log(res)
+            self._autoguardar()
 
     def cmd_guardar(self, ruta=None):
         ruta = ruta or self.save_default
@@ -125,17 +209,27 @@ class Controller:
             self.log("Serialización no disponible.")
             return
         try:
-            guardar_partida(self.mapa, self.explorador, ruta)
             abs = Path(ruta).resolve()
+            if self.diario is not None and self.diario.ruta.resolve() == abs:
+                # misma partida: el diario (autoguardado) se compacta en una instantánea nueva,
+                # así el archivo principal está al día para cualquier lector, no solo DiarioPartida
+                explorador_sucio = self.explorador.extraer_sucio()
+                if not self._cambios and not explorador_sucio and not self.diario.entradas:
+                    self.log(f"Sin cambios desde el último guardado: {abs}")
+                    return
+                self._cambios.extraer()
+                self.diario.checkpoint(self.mapa, self.explorador)
+            else:
+                self._abrir_diario(ruta)
             self.log(f"Partida guardada en: {abs}")
         except Exception as e:
             self.log(f"Error guardando: {e}")
 
     def _choose_file_interactive(self, dirpath="."):
         p = Path(dirpath)
-        files = sorted([f for f in p.glob("*.json") if f.is_file()])
+        files = sorted([f for f in [*p.glob("*.json"), *p.glob("*.jsonl"), *p.glob("*.bin")] if f.is_file()])
         if not files:
-            print("No hay archivos .json en", Path(dirpath).resolve())
+            print("No hay partidas (.json/.jsonl/.bin) en", Path(dirpath).resolve())
             return None
         print("\nArchivos guardados disponibles:")
         for i, f in enumerate(files):
@@ -168,17 +262,19 @@ class Controller:
         path_to_load = ruta
         if ruta is None or ruta == "seleccionar":
             chosen = self._choose_file_interactive(".")
+            self.pantalla.invalidar()
             if not chosen:
                 self.log("Carga cancelada o no hay archivos.")
                 return
             path_to_load = chosen
         try:
-            mapa2, exp2 = cargar_partida(path_to_load)
+            mapa2, exp2 = DiarioPartida.cargar(path_to_load)
+            self._cerrar_diario()
             self.mapa = mapa2
             self.explorador = exp2
             if HAS_VIS:
                 self.visualizador = Visualizador(self.mapa)
-            self.logs = []
+            self.logs.clear()
             self.log(f"Partida cargada desde {Path(path_to_load).resolve()}")
         except Exception as e:
             self.log(f"Error cargando: {e}")
@@ -190,6 +286,8 @@ class Controller:
             "  Ir a coord (x,y)          - caminar hasta x,y paso a paso",
             "  Guardar [ruta]            - guardar partida (por defecto prueba.json)",
             "  Cargar [ruta]             - cargar partida (sin args lista archivos y permite seleccionar)",
+            "  Autoguardado on|off       - tras 'guardar', añadir cada movimiento al diario de la partida",
+            "  Vista diferencial|rich    - redibujar solo lo que cambia o usar los paneles de rich",
             "  Reinicio / reset          - reiniciar la partida (nuevo mapa con mismos parámetros)",
             "  Estado                    - mostrar estado (redibuja)",
             "  Ayuda                     - mostrar esta ayuda",
@@ -217,6 +315,7 @@ def repl_loop(controller: Controller):
                 ans = input("¿Seguro que quieres salir? (y/n): ").strip().lower()
             except (KeyboardInterrupt, EOFError):
                 ans = "n"
+            controller.pantalla.invalidar()
             if ans and ans[0] == "y":
                 break
             else:
@@ -235,6 +334,17 @@ def repl_loop(controller: Controller):
             controller.cmd_guardar(args[0] if args else None)
         elif op == "cargar":
             controller.cmd_cargar(args[0] if args else None)
+        elif op == "autoguardado":
+            controller.autoguardado = bool(args) and args[0].lower() in ("on", "si", "sí", "1")
+            controller.log(f"Autoguardado {'activado' if controller.autoguardado else 'desactivado'}.")
+        elif op == "vista":
+            if args and args[0].lower() == "rich" and not HAS_VIS:
+                controller.log("Visualizador rich no disponible.")
+            elif args and args[0].lower() in ("rich", "diferencial"):
+                controller.vista = args[0].lower()
+                controller.log(f"Vista {controller.vista}.")
+            else:
+                controller.log("Formato: vista rich|diferencial")
         elif op in ("reinicio"):
             controller.reset()
         elif op in ("ayuda", "help"):
@@ -1,6 +1,7 @@
 from dungeon_generator.mapa import Mapa
 from dungeon_generator.explorador import Explorador
 from dungeon_generator.contenido import Tesoro, Monstruo
+from dungeon_generator.estadisticas import contar_por_recorrido
 from pathlib import Path
 
 try:
@@ -22,22 +23,8 @@ def mostrar_estadisticas_si_existe(mapa):
     if hasattr(mapa, "obtener_estadisticas_mapa"):
         stats = mapa.obtener_estadisticas_mapa()
     else:
-        total = len(mapa.habitaciones)
-        tipos = {"tesoros": 0, "monstruos": 0, "jefes": 0, "eventos": 0, "vacios": 0}
-        suma_conex = 0
-        for h in mapa.habitaciones.values():
-            suma_conex += len(h.conexiones)
-            if h.contenido is None:
-                tipos["vacios"] += 1
-            else:
-                t = getattr(h.contenido, "tipo", None)
-                if t == "tesoro": tipos["tesoros"] += 1
-                elif t == "monstruo": tipos["monstruos"] += 1
-                elif t == "jefe": tipos["jefes"] += 1
-                elif t == "evento": tipos["eventos"] += 1
-                else: tipos["vacios"] += 1
-        promedio = (suma_conex / total) if total else 0.0
-        stats = {"total": total, **tipos, "promedio_conexiones": round(promedio, 2)}
+        # mapas sin contadores propios: un único recorrido con los mismos contadores que Mapa
+        stats = contar_por_recorrido(mapa.habitaciones.values()).resumen(len(mapa.habitaciones))
     print("Estadísticas del mapa:", stats)
     return stats
 
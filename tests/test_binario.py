@@ -0,0 +1,118 @@
+import pytest
+
+from dungeon_generator.mapa import Mapa
+from dungeon_generator.explorador import Explorador
+from dungeon_generator.contenido import Monstruo, Tesoro
+from dungeon_generator.objetos import Objeto
+from dungeon_generator.serializacion import guardar_partida, cargar_partida
+from dungeon_generator.binario import _CABECERA, guardar_partida_binaria, cargar_partida_binaria
+
+
+def _partida():
+    mapa = Mapa(30, 30, seed=1, backend="compacto")
+    mapa.generar_estructura(300)
+    mapa.colocar_contenido()
+    return mapa, Explorador(mapa)
+
+
+def _estado(mapa: Mapa) -> dict:
+    """to_dict() con las habitaciones por posición (el backend dict las guarda en orden de alta)."""
+    d = mapa.to_dict()
+    d["habitaciones"] = sorted(d["habitaciones"], key=lambda h: h["pos"])
+    return d
+
+
+def _n_contenidos(ruta: str) -> int:
+    with open(ruta, "rb") as f:
+        return _CABECERA.unpack_from(f.read(_CABECERA.size))[8]
+
+
+def test_guardar_sobre_la_partida_cargada(tmp_path):
+    """Guardar en el mismo archivo del que se cargó (mapa apoyado en su mmap) no lo destruye."""
+    ruta = str(tmp_path / "p.bin")
+    mapa, explorador = _partida()
+    guardar_partida(mapa, explorador, ruta)
+    esperado = mapa.to_dict()
+
+    cargado, explorador_cargado = cargar_partida(ruta)
+    guardar_partida(cargado, explorador_cargado, ruta)
+    assert cargado.to_dict() == esperado
+
+    de_nuevo, explorador_nuevo = cargar_partida(ruta)
+    assert de_nuevo.to_dict() == esperado
+    assert explorador_nuevo.posicion_actual == explorador.posicion_actual
+    assert [p.name for p in tmp_path.iterdir()] == ["p.bin"]
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+def test_ida_y_vuelta(tmp_path, backend):
+    mapa = Mapa(12, 12, seed=5, backend=backend)
+    mapa.generar_estructura(90)
+    mapa.colocar_contenido()
+    explorador = Explorador(mapa, vida=7, ataque_base=2)
+    explorador.mover(next(iter(explorador.obtener_habitaciones_adyacentes())))
+    ruta = str(tmp_path / "p.bin")
+    guardar_partida_binaria(mapa, explorador, ruta)
+
+    cargado, explorador_cargado = cargar_partida_binaria(ruta)
+    assert cargado.backend == "compacto"
+    assert _estado(cargado) == _estado(mapa)
+    assert cargado.habitacion_inicial.pos == mapa.habitacion_inicial.pos
+    assert cargado._next_id == mapa._next_id
+    assert cargado.obtener_estadisticas_mapa(verificar=True) == mapa.obtener_estadisticas_mapa()
+    assert explorador_cargado.posicion_actual == explorador.posicion_actual
+    assert explorador_cargado.vida == explorador.vida
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+def test_contenido_repetido_se_guarda_una_vez(tmp_path, backend):
+    mapa = Mapa(6, 6, seed=2, backend=backend)
+    mapa.generar_estructura(20)
+    a, b, c = sorted(mapa.habitaciones)[:3]
+    mapa.habitaciones[a].contenido = Tesoro(Objeto("Moneda", 5))
+    mapa.habitaciones[b].contenido = Tesoro(Objeto("Moneda", 5))
+    mapa.habitaciones[c].contenido = Monstruo("Rata", 3, 1)
+    ruta = str(tmp_path / "p.bin")
+    guardar_partida_binaria(mapa, Explorador(mapa), ruta)
+
+    assert _n_contenidos(ruta) == 2
+    cargado, _ = cargar_partida_binaria(ruta)
+    refs = cargado.habitaciones.contenidos._refs
+    indice = lambda coord: coord[1] * cargado.ancho + coord[0]
+    assert refs[indice(a)] == refs[indice(b)] != refs[indice(c)]
+    # comparten entrada en el archivo, pero cada habitación decodifica su propio objeto
+    assert cargado.habitaciones[a].contenido is not cargado.habitaciones[b].contenido
+    assert _estado(cargado) == _estado(mapa)
+
+
+def test_contenido_retirado_sigue_retirado(tmp_path):
+    """Tesoro recogido, monstruo vencido y contenido nuevo en una partida cargada sobreviven al guardado."""
+    mapa = Mapa(6, 6, seed=2)
+    mapa.generar_estructura(20)
+    tesoro, monstruo, cambiada, vacia = sorted(mapa.habitaciones)[:4]
+    mapa.habitaciones[tesoro].contenido = Tesoro(Objeto("Moneda", 5))
+    mapa.habitaciones[monstruo].contenido = Monstruo("Rata", 1, 1)
+    mapa.habitaciones[cambiada].contenido = Tesoro(Objeto("Gema", 9))
+    ruta = str(tmp_path / "p.bin")
+    guardar_partida_binaria(mapa, Explorador(mapa), ruta)
+
+    cargado, _ = cargar_partida_binaria(ruta)
+    explorador = Explorador(cargado, posicion=tesoro, vida=100, ataque_base=10)
+    explorador.explorar_habitacion()
+    explorador.posicion_actual = monstruo
+    explorador.explorar_habitacion()
+    assert cargado.habitaciones[tesoro].contenido is None
+    assert cargado.habitaciones[monstruo].contenido is None
+    cargado.habitaciones[cambiada].contenido = Monstruo("Lobo", 4, 2)
+    cargado.habitaciones[vacia].contenido = Tesoro(Objeto("Llave", 1))
+    ruta2 = str(tmp_path / "p2.bin")
+    guardar_partida_binaria(cargado, explorador, ruta2)
+
+    de_nuevo, explorador_nuevo = cargar_partida_binaria(ruta2)
+    assert de_nuevo.habitaciones[tesoro].contenido is None
+    assert de_nuevo.habitaciones[monstruo].contenido is None
+    assert de_nuevo.habitaciones[cambiada].contenido.nombre == "Lobo"
+    assert de_nuevo.habitaciones[vacia].contenido.recompensa.nombre == "Llave"
+    assert _estado(de_nuevo) == _estado(cargado)
+    assert de_nuevo.obtener_estadisticas_mapa(verificar=True)["monstruos"] == 1
+    assert any(o.nombre == "Moneda" for o in explorador_nuevo.inventario)
@@ -0,0 +1,83 @@
+import random
+from collections import deque
+
+import pytest
+
+from dungeon_generator.mapa import Mapa
+from dungeon_generator.caminos import CacheCaminos
+
+
+def _distancia(mapa: Mapa, origen, destino) -> int:
+    """BFS simple sobre hab.conexiones; -1 si no hay camino."""
+    vistos = {origen: 0}
+    cola = deque([origen])
+    while cola:
+        coord = cola.popleft()
+        if coord == destino:
+            return vistos[coord]
+        for vecina in mapa.habitaciones[coord].conexiones.values():
+            if vecina.pos not in vistos:
+                vistos[vecina.pos] = vistos[coord] + 1
+                cola.append(vecina.pos)
+    return -1
+
+
+def _comprobar(mapa: Mapa, origen, destino, estrategia: str):
+    """El camino sigue pasillos reales, acaba en el destino y es tan corto como el de un BFS simple."""
+    camino = mapa.encontrar_camino(origen, destino, estrategia)
+    esperado = _distancia(mapa, origen, destino)
+    if esperado <= 0:
+        assert camino == []
+        return camino
+    coord = origen
+    for direccion, siguiente in camino:
+        assert mapa.habitaciones[coord].conexiones[direccion].pos == siguiente
+        coord = siguiente
+    assert coord == destino
+    assert len(camino) == esperado
+    return camino
+
+
+def _editar(mapa: Mapa, rng: random.Random, coords: list):
+    """Abre o cierra un pasillo al azar (puede partir el mapa en varios trozos)."""
+    hab = mapa.habitaciones[rng.choice(coords)]
+    if hab.conexiones and rng.random() < 0.5:
+        hab.desconectar(rng.choice(list(hab.conexiones)))
+    else:
+        direccion, vecina = rng.choice(list(hab.posiciones_vecinas().items()))
+        otra = mapa.habitaciones.get(vecina)
+        if otra is not None:
+            hab.conectar(direccion, otra)
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("estrategia", CacheCaminos.ESTRATEGIAS)
+def test_camino_mas_corto_en_mapas_aleatorios(backend, seed, estrategia):
+    mapa = Mapa(14, 12, seed=seed, backend=backend)
+    estrategias = sorted(Mapa.ESTRATEGIAS)
+    mapa.generar_estructura(120, estrategias[seed % len(estrategias)])
+    rng = random.Random(seed)
+    coords = list(mapa.habitaciones)
+    origenes = rng.sample(coords, 3)  # pocos orígenes: las consultas "bfs" repiten árbol cacheado
+    for paso in range(150):
+        _comprobar(mapa, rng.choice(origenes), rng.choice(coords), estrategia)
+        if paso % 3 == 0:
+            _editar(mapa, rng, coords)
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+@pytest.mark.parametrize("estrategia", CacheCaminos.ESTRATEGIAS)
+def test_cache_invalidada_al_editar_pasillos(backend, estrategia):
+    mapa = Mapa(8, 1, seed=1, backend=backend)
+    mapa.generar_estructura(8)  # un pasillo en línea: (0, 0) ... (7, 0)
+    origen, destino = (0, 0), (7, 0)
+    assert len(_comprobar(mapa, origen, destino, estrategia)) == 7
+    assert len(_comprobar(mapa, origen, (5, 0), estrategia)) == 5
+
+    mapa.habitaciones[(3, 0)].desconectar("este")
+    assert _comprobar(mapa, origen, destino, estrategia) == []
+    assert _comprobar(mapa, origen, (3, 0), estrategia)[-1] == ("este", (3, 0))
+
+    mapa.habitaciones[(3, 0)].conectar("este", mapa.habitaciones[(4, 0)])
+    assert len(_comprobar(mapa, origen, destino, estrategia)) == 7
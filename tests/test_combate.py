@@ -0,0 +1,96 @@
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from dungeon_generator.mapa import Mapa
+from dungeon_generator.explorador import Explorador
+from dungeon_generator.contenido import Monstruo, Jefe
+from dungeon_generator.objetos import Objeto
+from dungeon_generator.combate import (distribucion_monstruo, distribucion_jefe, distribucion_de,
+                                       _tabla_alias)
+
+# (vida, ataque del jugador, vida del enemigo, ataque del enemigo)
+COMBATES = [(5, 1, 3, 2), (10, 3, 8, 3), (6, 2, 12, 1), (20, 5, 15, 4)]
+# (vida, vida del jefe, ataque del jefe)
+JEFES = [(10, 12, 3), (25, 20, 5), (4, 9, 2)]
+
+
+def _distribuciones():
+    return ([distribucion_monstruo(atq, vida, vm, am) for vida, atq, vm, am in COMBATES]
+            + [distribucion_jefe(vida, vj, aj) for vida, vj, aj in JEFES])
+
+
+def _cerca(frecuencias: Counter, n: int, dist) -> None:
+    """Cada frecuencia observada a menos de 5 desviaciones típicas de su probabilidad."""
+    assert set(frecuencias) <= set(dist.resultados)
+    for resultado, p in zip(dist.resultados, dist.probabilidades):
+        sigma = math.sqrt(p * (1.0 - p) / n)
+        assert abs(frecuencias[resultado] / n - p) <= 5 * sigma + 1e-3, resultado
+
+
+@pytest.mark.parametrize("dist", _distribuciones(), ids=repr)
+def test_probabilidades_suman_uno(dist):
+    assert math.isclose(sum(dist.probabilidades), 1.0, rel_tol=1e-12)
+    assert all(p > 0.0 for p in dist.probabilidades)
+    # todo combate termina con uno de los dos a cero
+    assert all((vida == 0) != (enemigo == 0) for vida, enemigo in dist.resultados)
+    assert 0.0 <= dist.prob_victoria <= 1.0
+
+
+@pytest.mark.parametrize("vida,ataque,vida_monstruo,ataque_monstruo", COMBATES)
+def test_monstruo_coincide_con_montecarlo(vida, ataque, vida_monstruo, ataque_monstruo):
+    mapa = Mapa(4, 4, seed=1)
+    mapa.generar_estructura(4)
+    explorador = Explorador(mapa, vida=vida, ataque_base=ataque)
+    dist = distribucion_de(Monstruo("Rata", vida_monstruo, ataque_monstruo), explorador)
+
+    rng = random.Random(vida * 1000 + ataque)
+    n = 20_000
+    frecuencias = Counter()
+    for _ in range(n):
+        explorador.vida = vida
+        monstruo = Monstruo("Rata", vida_monstruo, ataque_monstruo)
+        monstruo.interactuar(explorador, rng, narrar=False)
+        frecuencias[(explorador.vida, monstruo.vida)] += 1
+    _cerca(frecuencias, n, dist)
+
+
+@pytest.mark.parametrize("vida,vida_jefe,ataque_jefe", JEFES)
+def test_jefe_coincide_con_montecarlo(vida, vida_jefe, ataque_jefe):
+    mapa = Mapa(4, 4, seed=1)
+    mapa.generar_estructura(4)
+    explorador = Explorador(mapa, vida=vida)
+    dist = distribucion_de(Jefe("Rey", vida_jefe, ataque_jefe, Objeto("Corona", 50)), explorador)
+
+    rng = random.Random(vida_jefe)
+    n = 20_000
+    frecuencias = Counter()
+    for _ in range(n):
+        explorador.vida = vida
+        jefe = Jefe("Rey", vida_jefe, ataque_jefe, Objeto("Corona", 50))
+        jefe.interactuar(explorador, rng, narrar=False)
+        frecuencias[(explorador.vida, jefe.vida)] += 1
+    _cerca(frecuencias, n, dist)
+
+
+@pytest.mark.parametrize("dist", _distribuciones(), ids=repr)
+def test_tabla_alias_exacta(dist):
+    """La masa que la tabla asigna a cada resultado (propia + la cedida por alias) es su probabilidad."""
+    umbral, alias = _tabla_alias(dist.probabilidades)
+    k = len(umbral)
+    masa = [u / k for u in umbral]
+    for i, (u, j) in enumerate(zip(umbral, alias)):
+        if u < 1.0:
+            masa[j] += (1.0 - u) / k
+    for m, p in zip(masa, dist.probabilidades):
+        assert math.isclose(m, p, rel_tol=1e-9, abs_tol=1e-12)
+
+
+@pytest.mark.parametrize("dist", _distribuciones(), ids=repr)
+def test_muestreo_alias_coincide_con_distribucion(dist):
+    aleatorio = random.Random(len(dist.resultados)).random
+    n = 50_000
+    frecuencias = Counter(dist.muestrear(aleatorio) for _ in range(n))
+    _cerca(frecuencias, n, dist)
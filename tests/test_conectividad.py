@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+from dungeon_generator.mapa import Mapa
+from dungeon_generator.habitacion import Habitacion
+from dungeon_generator.conectividad import UnionFind
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+def test_comprobacion_de_generar_sale_de_los_pasillos(backend, monkeypatch):
+    """El union-find de generar_estructura cuenta componentes a partir de los pasillos creados."""
+    Mapa(12, 12, seed=4, backend=backend).generar_estructura(100)
+    # sin registrar los pasillos cada habitación queda como componente suelto
+    monkeypatch.setattr(UnionFind, "unir", lambda self, a, b: False)
+    with pytest.raises(RuntimeError, match="accesible"):
+        Mapa(12, 12, seed=4, backend=backend).generar_estructura(100)
+
+
+def _componentes(mapa: Mapa, sin=None) -> dict:
+    """coord -> número de componente, con un BFS sobre las habitaciones ('sin': pasillo ignorado)."""
+    habitaciones = mapa.habitaciones
+    componente = {}
+    for origen in habitaciones:
+        if origen in componente:
+            continue
+        componente[origen] = origen
+        pendientes = [origen]
+        for coord in pendientes:
+            for otra in habitaciones[coord].conexiones.values():
+                c = tuple(otra.pos)
+                if c in componente or c not in habitaciones or {coord, c} == sin:
+                    continue
+                componente[c] = origen
+                pendientes.append(c)
+    return componente
+
+
+def _puentes(mapa: Mapa) -> list:
+    """Pasillos cuya eliminación aumenta el número de componentes (fuerza bruta)."""
+    total = len(set(_componentes(mapa).values()))
+    pasillos = {tuple(sorted((coord, tuple(otra.pos))))
+                for coord, hab in mapa.habitaciones.items()
+                for otra in hab.conexiones.values() if tuple(otra.pos) in mapa.habitaciones}
+    return sorted(p for p in pasillos if len(set(_componentes(mapa, sin=set(p)).values())) > total)
+
+
+def _comprobar(mapa: Mapa, conectividad, rng: random.Random, puentes: bool):
+    componente = _componentes(mapa)
+    assert conectividad.componentes == len(set(componente.values()))
+    assert conectividad.conexo() == (len(set(componente.values())) <= 1)
+    assert conectividad.conexo() == mapa.es_todo_accesible()
+    coords = list(mapa.habitaciones)
+    for _ in range(20):
+        a, b = rng.choice(coords), rng.choice(coords)
+        assert conectividad.mismo_componente(a, b) == (componente[a] == componente[b])
+    if puentes:
+        esperados = _puentes(mapa)
+        assert conectividad.puentes() == esperados
+        for a, b in esperados[:5]:
+            assert conectividad.es_puente(a, b) and conectividad.es_puente(b, a)
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+@pytest.mark.parametrize("seed", range(4))
+def test_conectividad_contra_bfs(backend, seed):
+    """Altas y bajas aleatorias de pasillos y habitaciones comparadas con BFS y puentes por fuerza bruta."""
+    rng = random.Random(seed)
+    mapa = Mapa(7, 6, seed=seed, backend=backend)
+    mapa.generar_estructura(30)
+    conectividad = mapa.conectividad()
+    _comprobar(mapa, conectividad, rng, puentes=True)
+    for paso in range(200):
+        coords = list(mapa.habitaciones)
+        hab = mapa.habitaciones[rng.choice(coords)]
+        accion = rng.random()
+        if accion < 0.4 and hab.conexiones:
+            hab.desconectar(rng.choice(list(hab.conexiones)))
+        elif accion < 0.85:
+            direccion, vecina = rng.choice(list(hab.posiciones_vecinas().items()))
+            if vecina in mapa.habitaciones:
+                hab.conectar(direccion, mapa.habitaciones[vecina])
+        elif accion < 0.93 and len(coords) > 2:
+            for direccion in list(hab.conexiones):
+                hab.desconectar(direccion)
+            del mapa.habitaciones[hab.pos]
+        else:
+            libres = [(x, y) for x in range(mapa.ancho) for y in range(mapa.alto) if (x, y) not in mapa.habitaciones]
+            if libres:
+                coord = rng.choice(libres)
+                nueva = Habitacion(mapa._next_id, coord)
+                mapa._next_id += 1
+                mapa.habitaciones[coord] = nueva
+                for direccion, vecina in nueva.posiciones_vecinas().items():
+                    if vecina in mapa.habitaciones and rng.random() < 0.5:
+                        nueva.conectar(direccion, mapa.habitaciones[vecina])
+        # puentes solo a ratos: se prueban tanto el conjunto mantenido como el recalculado
+        _comprobar(mapa, conectividad, rng, puentes=rng.random() < 0.5)
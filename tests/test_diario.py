@@ -0,0 +1,79 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from dungeon_generator.mapa import Mapa
+from dungeon_generator.explorador import Explorador
+from dungeon_generator.diario import DiarioPartida
+from dungeon_generator.serializacion import guardar_partida, cargar_partida, _explorador_a_dict
+from main import Controller
+
+
+def _estado(mapa: Mapa, explorador: Explorador) -> tuple:
+    habitaciones = sorted(mapa.to_dict()["habitaciones"], key=lambda h: h["pos"])
+    return habitaciones, _explorador_a_dict(explorador)
+
+
+def _pasos(mapa: Mapa, explorador: Explorador, rng: random.Random, n: int):
+    """Movimientos con exploración (combates, tesoros) y algún pasillo cambiado."""
+    for i in range(n):
+        explorador.mover(rng.choice(explorador.obtener_habitaciones_adyacentes()))
+        explorador.explorar_habitacion()
+        if i % 5 == 0:
+            hab = mapa.habitaciones[tuple(explorador.posicion_actual)]
+            for direccion, vecina in hab.posiciones_vecinas().items():
+                otra = mapa.habitaciones.get(vecina)
+                if otra is not None and direccion not in hab.conexiones:
+                    hab.conectar(direccion, otra)
+                    break
+        yield
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+def test_diario_con_compactaciones_equivale_a_guardado_completo(tmp_path, backend):
+    mapa = Mapa(15, 15, seed=9, backend=backend)
+    mapa.generar_estructura(150)
+    mapa.colocar_contenido()
+    explorador = Explorador(mapa, vida=10_000)
+    ruta = tmp_path / "p.json"
+    diario = DiarioPartida(str(ruta), compactar_cada=7)
+    diario.checkpoint(mapa, explorador)
+    cambios = mapa.nuevo_seguimiento()
+    explorador.extraer_sucio()
+
+    rng = random.Random(1)
+    for _ in _pasos(mapa, explorador, rng, 40):  # 40 entradas: 5 compactaciones y 5 pendientes
+        diario.registrar(mapa, explorador, cambios.extraer())
+    diario.cerrar()
+    assert diario.entradas == 40 % 7
+    assert len(diario.ruta_diario.read_text(encoding="utf-8").splitlines()) == 40 % 7
+
+    completo = tmp_path / "completo.json"
+    guardar_partida(mapa, explorador, str(completo))
+    esperado = _estado(*cargar_partida(str(completo), backend=backend))
+    assert _estado(*DiarioPartida.cargar(str(ruta), backend=backend)) == esperado
+    assert esperado == _estado(mapa, explorador)
+
+
+def test_guardar_compacta_el_diario(tmp_path, monkeypatch):
+    """Tras 'guardar' el archivo principal está al día sin el diario."""
+    monkeypatch.chdir(tmp_path)
+    random.seed(2)
+    controller = Controller(ancho=10, alto=8, habitaciones=50, seed=3, autoguardado=True)
+    controller.explorador.vida = 10_000
+    ruta = str(tmp_path / "p.json")
+    controller.cmd_guardar(ruta)
+    for _ in range(10):
+        controller.cmd_mover()
+    assert Path(ruta + ".diario").read_text(encoding="utf-8")  # autoguardado: deltas en el diario
+
+    controller.cmd_guardar(ruta)
+    assert Path(ruta + ".diario").read_text(encoding="utf-8") == ""
+    actual = _estado(controller.mapa, controller.explorador)
+    assert _estado(*cargar_partida(ruta)) == actual
+    assert _estado(*DiarioPartida.cargar(ruta)) == actual
+
+    controller.cmd_guardar(ruta)
+    assert controller.logs[-1].startswith("Sin cambios")
+    controller._cerrar_diario()
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from dungeon_generator.mapa import Mapa
+from dungeon_generator.explorador import Explorador
+from dungeon_generator.contenido import Tesoro
+from dungeon_generator.objetos import Objeto
+from dungeon_generator.registro import RegistroCombate
+from dungeon_generator.habitacion import Habitacion, DIR_OPUESTA
+from dungeon_generator.estadisticas import contar_por_recorrido
+
+
+def _comprobar(mapa: Mapa):
+    """Los contadores incrementales coinciden con un recorrido completo de las habitaciones."""
+    assert mapa.contadores == contar_por_recorrido(mapa.habitaciones.values())
+    mapa.obtener_estadisticas_mapa(verificar=True)
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+def test_contadores_al_dia_en_cada_paso(backend):
+    mapa = Mapa(20, 20, seed=7, backend=backend)
+    mapa.generar_estructura(200)
+    _comprobar(mapa)
+    mapa.colocar_contenido()
+    _comprobar(mapa)
+    monstruos_antes = mapa.obtener_estadisticas_mapa()["monstruos"]
+
+    rng = random.Random(3)
+    # movimientos y combates: explorar cambia o retira contenido (monstruo vencido, tesoro recogido)
+    explorador = Explorador(mapa, vida=10_000)
+    combates = 0
+    for _ in range(300):
+        explorador.mover(rng.choice(explorador.obtener_habitaciones_adyacentes()))
+        _comprobar(mapa)
+        combates += isinstance(explorador.explorar_habitacion(), RegistroCombate)
+        _comprobar(mapa)
+    assert combates > 0
+    assert mapa.obtener_estadisticas_mapa()["monstruos"] < monstruos_antes
+
+    # ediciones de pasillos
+    coords = list(mapa.habitaciones)
+    for _ in range(100):
+        hab = mapa.habitaciones[rng.choice(coords)]
+        vecinas = hab.posiciones_vecinas()
+        if hab.conexiones and rng.random() < 0.5:
+            hab.desconectar(rng.choice(list(hab.conexiones)))
+        else:
+            direccion = rng.choice(list(vecinas))
+            otra = mapa.habitaciones.get(vecinas[direccion])
+            if otra is not None:
+                hab.conectar(direccion, otra)
+        _comprobar(mapa)
+
+    # contenido asignado a mano, habitaciones quitadas y añadidas
+    for coord in rng.sample(coords, 20):
+        mapa.habitaciones[coord].contenido = Tesoro(Objeto("Moneda", 1)) if rng.random() < 0.5 else None
+        _comprobar(mapa)
+    for coord in rng.sample(coords, 10):
+        hab = mapa.habitaciones[coord]
+        for direccion in list(hab.conexiones):
+            hab.desconectar(direccion)
+        del mapa.habitaciones[coord]
+        _comprobar(mapa)
+        nueva = Habitacion(mapa._next_id, coord)
+        mapa._next_id += 1
+        mapa.habitaciones[coord] = nueva
+        for direccion, vecina in nueva.posiciones_vecinas().items():
+            otra = mapa.habitaciones.get(vecina)
+            if otra is not None and DIR_OPUESTA[direccion] not in otra.conexiones:
+                nueva.conectar(direccion, otra)
+                break
+        _comprobar(mapa)
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+@pytest.mark.parametrize("estrategia", sorted(Mapa.ESTRATEGIAS))
+def test_contadores_tras_generar(backend, estrategia):
+    mapa = Mapa(16, 12, seed=2, backend=backend)
+    mapa.generar_estructura(150, estrategia)
+    _comprobar(mapa)
+    mapa.colocar_contenido()
+    _comprobar(mapa)
+    mapa.generar_estructura(60, estrategia)
+    _comprobar(mapa)
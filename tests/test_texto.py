@@ -0,0 +1,41 @@
+import pytest
+
+from dungeon_generator.mapa import Mapa
+from dungeon_generator.texto import frame_de_texto
+
+
+def _mapa(ancho: int, alto: int, backend: str) -> Mapa:
+    mapa = Mapa(ancho, alto, seed=4, backend=backend)
+    mapa.generar_estructura(ancho * alto // 4)
+    mapa.colocar_contenido()
+    return mapa
+
+
+def _con_ids(mapa: Mapa, texto: str) -> bool:
+    """Una línea por fila con el id de cada habitación y 'S' en el inicio."""
+    if len(texto.split("\n")) != mapa.alto:
+        return False
+    esperado = sorted(hab.id for hab in mapa.habitaciones.values() if not hab.inicial)
+    marcas = texto.split()
+    return marcas.count("S") == 1 and sorted(int(m) for m in marcas if m != "S") == esperado
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+def test_umbral_de_ids(backend):
+    assert Mapa.MAX_CELDAS_ASCII_IDS == 64 * 64
+    en_el_limite = _mapa(64, 64, backend)
+    assert _con_ids(en_el_limite, en_el_limite.imprimir_ascii())
+
+    grande = _mapa(65, 64, backend)
+    simbolos = frame_de_texto(grande).decode("ascii").rstrip("\n")
+    assert grande.imprimir_ascii() == simbolos
+    assert grande.imprimir_ascii(ids=False) == simbolos
+    assert _con_ids(grande, grande.imprimir_ascii(ids=True))
+
+
+@pytest.mark.parametrize("backend", Mapa.BACKENDS)
+def test_forzar_simbolos_en_mapa_pequeno(backend):
+    mapa = _mapa(10, 8, backend)
+    assert _con_ids(mapa, mapa.imprimir_ascii())
+    assert mapa.imprimir_ascii(ids=True) == mapa.imprimir_ascii()
+    assert mapa.imprimir_ascii(ids=False) == frame_de_texto(mapa).decode("ascii").rstrip("\n")